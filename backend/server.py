@@ -1,273 +1,3884 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends, Request, Query
+from fastapi.responses import StreamingResponse, Response, ORJSONResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pymongo import ReturnDocument, IndexModel, ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
 from bson import ObjectId
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator, Awaitable, Callable, Generic, TypeVar
+from collections import OrderedDict, deque
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
 import httpx
+import numpy as np
 import pdfplumber
+from PIL import Image, ImageOps
 from docx import Document
 import io
 import bcrypt
+import jwt
 import base64
 import json
 import re
+import time
+import hashlib
+import secrets
+import bisect
+import html
+import math
+import asyncio
+import socket
+import smtplib
+from email.message import EmailMessage
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from contextlib import asynccontextmanager
+
+T = TypeVar("T")
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection (Motor connects lazily, so importing needs no running server)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
+db = client[os.environ.get('DB_NAME', 'ats_system')]
+
+# HuggingFace Configuration; HUGGINGFACE_API_URL points the app at another
+# endpoint serving the same API (a dedicated endpoint, or a local fake for load tests)
+HF_API_KEY = os.environ.get('HUGGINGFACE_API_KEY', '')
+HF_MODEL = os.environ.get('HUGGINGFACE_MODEL', 'meta-llama/Llama-3.1-8B-Instruct')
+HF_API_URL = os.environ.get('HUGGINGFACE_API_URL') or f"https://api-inference.huggingface.co/models/{HF_MODEL}"
+if not HF_API_KEY:
+    logging.warning("HUGGINGFACE_API_KEY is not set; inference calls will be unauthenticated")
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment (1/true/yes/on)"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Shared HTTP client for the inference endpoint (created at startup, closed at shutdown)
+HF_CONNECT_TIMEOUT = float(os.environ.get('HF_CONNECT_TIMEOUT', '5'))
+HF_READ_TIMEOUT = float(os.environ.get('HF_READ_TIMEOUT', '30'))
+HF_MAX_CONNECTIONS = int(os.environ.get('HF_MAX_CONNECTIONS', '100'))
+HF_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('HF_MAX_KEEPALIVE_CONNECTIONS', '20'))
+HF_KEEPALIVE_EXPIRY = float(os.environ.get('HF_KEEPALIVE_EXPIRY', '60'))
+HF_HTTP2 = env_flag('HF_HTTP2')
 
-# HuggingFace Configuration
-HF_API_KEY = os.environ['HUGGINGFACE_API_KEY']
-HF_MODEL = os.environ['HUGGINGFACE_MODEL']
-HF_API_URL = f"https://api-inference.huggingface.co/models/{HF_MODEL}"
+http_client: Optional[httpx.AsyncClient] = None
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # ==================== AI Helper Functions ====================
-async def generate_ai_content(prompt: str, max_tokens: int = 500) -> str:
-    """Generate content using Llama model via HuggingFace API"""
-    headers = {"Authorization": f"Bearer {HF_API_KEY}"}
-    payload = {
-        "inputs": prompt,
-        "parameters": {
-            "max_new_tokens": max_tokens,
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "return_full_text": False
+def create_http_client() -> httpx.AsyncClient:
+    """Build the pooled keep-alive client used for all inference calls"""
+    http2 = HF_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logging.warning("HF_HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1")
+            http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        headers={"Authorization": f"Bearer {HF_API_KEY}"},
+        timeout=httpx.Timeout(HF_READ_TIMEOUT, connect=HF_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=HF_MAX_CONNECTIONS,
+            max_keepalive_connections=HF_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HF_KEEPALIVE_EXPIRY
+        )
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared inference client, creating it lazily if startup has not run"""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = create_http_client()
+    return http_client
+
+# ==================== AI Response Cache ====================
+AI_CACHE_ENABLED = env_flag('AI_CACHE_ENABLED', True)
+AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES', '1024'))
+AI_CACHE_TTL_SECONDS = int(os.environ.get('AI_CACHE_TTL_SECONDS', '3600'))
+
+class AIResponseCache:
+    """Two-tier prompt cache: a bounded in-process LRU in front of a shared MongoDB collection"""
+
+    def __init__(self, collection_name: str, max_entries: int, ttl_seconds: int):
+        self.collection_name = collection_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.counters = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bypassed": 0}
+
+    @staticmethod
+    def make_key(model: str, prompt: str, parameters: Dict[str, Any]) -> str:
+        """Content address for a completion: hash of model, prompt and generation parameters"""
+        material = json.dumps({"model": model, "prompt": prompt, "parameters": parameters}, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return value
+            del self._entries[key]
+        
+        try:
+            doc = await db[self.collection_name].find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                {"value": 1, "expires_at": 1}
+            )
+        except Exception as e:
+            logging.warning(f"AI cache lookup failed: {str(e)}")
+            doc = None
+        if doc:
+            expires_at = doc['expires_at']
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            self._remember(key, doc['value'], time.monotonic() + remaining)
+            self.counters["mongo_hits"] += 1
+            return doc['value']
+        
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        self._remember(key, value, time.monotonic() + self.ttl_seconds)
+        self.counters["stores"] += 1
+        try:
+            await db[self.collection_name].update_one(
+                {"_id": key},
+                {"$set": {
+                    "value": value,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logging.warning(f"AI cache write failed: {str(e)}")
+
+    async def clear(self):
+        self._entries.clear()
+        await db[self.collection_name].delete_many({})
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.counters["memory_hits"] + self.counters["mongo_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+ai_cache = AIResponseCache("ai_cache", AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL_SECONDS)
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution
+
+    The first caller (leader) starts the work as its own task; callers that
+    arrive while it runs await the same task and get its result or exception.
+    The task is shielded, so a caller that disconnects does not cancel the
+    work for the others. The key is forgotten once the work finishes, and its
+    exception is retrieved then, since every caller may have gone away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Task] = {}
+        self.counters = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the exception retrieved; callers still waiting get it from the task
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "in_flight": len(self._flights)}
+
+ai_flights = SingleFlight()
+
+AI_UNAVAILABLE_MESSAGE = "Content generation temporarily unavailable."
+
+# ==================== Inference Guard ====================
+AI_CONCURRENCY_INITIAL = int(os.environ.get('AI_CONCURRENCY_INITIAL', '8'))
+AI_CONCURRENCY_MIN = int(os.environ.get('AI_CONCURRENCY_MIN', '1'))
+AI_CONCURRENCY_MAX = int(os.environ.get('AI_CONCURRENCY_MAX', '32'))
+AI_CONCURRENCY_BACKOFF = float(os.environ.get('AI_CONCURRENCY_BACKOFF', '0.5'))
+AI_LATENCY_TARGET_SECONDS = float(os.environ.get('AI_LATENCY_TARGET_SECONDS', '15'))
+AI_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('AI_QUEUE_TIMEOUT_SECONDS', '10'))
+AI_RETRY_BUDGET_SECONDS = float(os.environ.get('AI_RETRY_BUDGET_SECONDS', '20'))
+AI_BREAKER_FAILURES = int(os.environ.get('AI_BREAKER_FAILURES', '5'))
+AI_BREAKER_RESET_SECONDS = float(os.environ.get('AI_BREAKER_RESET_SECONDS', '30'))
+
+# Failures that say the upstream is struggling (count toward opening the
+# circuit), the subset that also shrinks the concurrency limit, and the ones
+# worth waiting out when they come with a retry hint
+AI_FAILURE_REASONS = {"overloaded", "model_loading", "timeout", "upstream_error"}
+AI_OVERLOAD_REASONS = {"overloaded", "timeout"}
+AI_RETRYABLE_REASONS = {"overloaded", "model_loading", "circuit_open"}
+
+class AIUnavailableError(Exception):
+    """The inference backend could not produce a result
+    
+    reason is one of circuit_open, overloaded, model_loading, timeout,
+    upstream_error, rejected or bad_response; retry_after is the number of
+    seconds after which trying again is worthwhile, when known.
+    """
+
+    def __init__(self, reason: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdaptiveLimiter:
+    """AIMD cap on concurrent inference calls
+    
+    A call that finishes within the latency target while the limit was in
+    use grows the limit by 1/limit (about +1 per round of calls); an overload
+    signal or a slow call multiplies it by the backoff factor, at most once
+    per latency target so one burst of failures backs off once. Callers over
+    the limit wait for a slot and are rejected after the queue timeout.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, backoff: float, latency_target: float, queue_timeout: float):
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._last_decrease = float("-inf")
+        self.counters = {"acquired": 0, "queued": 0, "rejected": 0, "increases": 0, "decreases": 0}
+
+    async def acquire(self):
+        deadline = time.monotonic() + self.queue_timeout
+        if self.in_flight >= int(self.limit):
+            self.counters["queued"] += 1
+        while self.in_flight >= int(self.limit):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.counters["rejected"] += 1
+                # Hand a slot freed in the meantime to the next waiter
+                self._wake()
+                raise AIUnavailableError("overloaded", "Too many inference calls waiting for a slot")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        self.counters["acquired"] += 1
+
+    def release(self, latency: float, overloaded: bool = False):
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        now = time.monotonic()
+        if overloaded or latency > self.latency_target:
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._last_decrease = now
+                self.counters["decreases"] += 1
+        elif saturated and self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.counters["increases"] += 1
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "min": self.minimum,
+            "max": self.maximum
+        }
+
+class CircuitBreaker:
+    """Fail fast while the inference backend keeps failing
+    
+    closed: calls pass; the failure threshold of consecutive failures (or a
+    single "model loading" answer) opens the circuit. open: calls fail with
+    circuit_open until the reset timeout, or the upstream's own estimate if
+    longer, has passed. half_open: one probe call goes through; success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_until = 0.0
+        self._probing = False
+        self.counters = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def check(self):
+        """Raise circuit_open unless a call may go through now"""
+        if self.state == "open":
+            now = time.monotonic()
+            if now < self.opened_until:
+                self.counters["rejected"] += 1
+                raise AIUnavailableError("circuit_open", "Inference backend is unavailable", retry_after=self.opened_until - now)
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open":
+            if self._probing:
+                self.counters["rejected"] += 1
+                raise AIUnavailableError("circuit_open", "Inference backend is being probed", retry_after=1.0)
+            self._probing = True
+            self.counters["probes"] += 1
+
+    def succeeded(self):
+        if self.state != "closed":
+            logging.info("Inference circuit closed")
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def failed(self, retry_after: Optional[float] = None, trip: bool = False):
+        self.failures += 1
+        if self.state == "open":
+            # A call started before the circuit opened; it is already being waited out
+            return
+        if trip or self.state == "half_open" or self.failures >= self.failure_threshold:
+            # A loading model says how long it needs; otherwise wait at least the reset timeout
+            hold = (retry_after or self.reset_seconds) if trip else max(self.reset_seconds, retry_after or 0)
+            self.state = "open"
+            self.opened_until = time.monotonic() + hold
+            self._probing = False
+            self.counters["opened"] += 1
+            cause = "while the model loads" if trip else f"after {self.failures} consecutive failures"
+            logging.warning(f"Inference circuit opened for {hold:.1f}s {cause}")
+
+    def abandon(self):
+        """A call ended without an answer either way (e.g. cancelled); let another probe through"""
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": round(max(self.opened_until - time.monotonic(), 0), 1) if self.state == "open" else None
         }
+
+inference_limiter = AdaptiveLimiter(
+    AI_CONCURRENCY_INITIAL, AI_CONCURRENCY_MIN, AI_CONCURRENCY_MAX,
+    AI_CONCURRENCY_BACKOFF, AI_LATENCY_TARGET_SECONDS, AI_QUEUE_TIMEOUT_SECONDS
+)
+inference_breaker = CircuitBreaker(AI_BREAKER_FAILURES, AI_BREAKER_RESET_SECONDS)
+
+class InferenceCall:
+    """Timing of one guarded upstream call; latency stops at the response headers"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.responded_at: Optional[float] = None
+
+    def responded(self):
+        self.responded_at = time.monotonic()
+
+    @property
+    def latency(self) -> float:
+        return (self.responded_at or time.monotonic()) - self.started
+
+@asynccontextmanager
+async def inference_slot() -> AsyncIterator[InferenceCall]:
+    """Run one upstream call under the circuit breaker and the adaptive limit
+    
+    Transport errors are translated to AIUnavailableError; the outcome feeds
+    back into both the limiter and the breaker.
+    """
+    inference_breaker.check()
+    try:
+        await inference_limiter.acquire()
+    except BaseException:
+        inference_breaker.abandon()
+        raise
+    call = InferenceCall()
+    overloaded = False
+    try:
+        yield call
+    except AIUnavailableError as e:
+        overloaded = e.reason in AI_OVERLOAD_REASONS
+        if e.reason in AI_FAILURE_REASONS:
+            inference_breaker.failed(e.retry_after, trip=e.reason == "model_loading")
+        else:
+            inference_breaker.succeeded()
+        raise
+    except httpx.TimeoutException as e:
+        overloaded = True
+        inference_breaker.failed()
+        raise AIUnavailableError("timeout", f"Inference call timed out: {type(e).__name__}") from e
+    except httpx.HTTPError as e:
+        inference_breaker.failed()
+        raise AIUnavailableError("upstream_error", f"Inference call failed: {type(e).__name__}: {str(e)}") from e
+    except GeneratorExit:
+        # The consumer stopped reading a healthy stream
+        inference_breaker.succeeded()
+        raise
+    except BaseException:
+        inference_breaker.abandon()
+        raise
+    else:
+        inference_breaker.succeeded()
+    finally:
+        inference_limiter.release(call.latency, overloaded)
+
+def retry_hint(response: httpx.Response) -> Optional[float]:
+    """estimated_time from a model-loading body, else the Retry-After header"""
+    try:
+        estimated = response.json().get('estimated_time')
+        if estimated is not None:
+            return float(estimated)
+    except (ValueError, AttributeError):
+        pass
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(header) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+def raise_for_inference_status(response: httpx.Response):
+    """Classify an error response from the inference endpoint"""
+    status = response.status_code
+    if status < 400:
+        return
+    if status == 503 and "loading" in response.text.lower():
+        raise AIUnavailableError("model_loading", "Model is loading", retry_after=retry_hint(response))
+    if status in (429, 503):
+        raise AIUnavailableError("overloaded", f"Inference backend answered {status}", retry_after=retry_hint(response))
+    if status >= 500:
+        raise AIUnavailableError("upstream_error", f"Inference backend answered {status}")
+    raise AIUnavailableError("rejected", f"Inference backend rejected the request ({status}): {response.text[:200]}")
+
+def should_retry(error: AIUnavailableError, deadline: float) -> bool:
+    """Whether waiting out the error's retry hint still fits in the retry budget"""
+    return (
+        error.reason in AI_RETRYABLE_REASONS
+        and error.retry_after is not None
+        and time.monotonic() + error.retry_after <= deadline
+    )
+
+async def post_inference(payload: Dict[str, Any]) -> Any:
+    """POST to the inference endpoint, waiting out loading/overload hints within AI_RETRY_BUDGET_SECONDS"""
+    deadline = time.monotonic() + AI_RETRY_BUDGET_SECONDS
+    while True:
+        try:
+            async with inference_slot() as call:
+                response = await get_http_client().post(HF_API_URL, json=payload)
+                call.responded()
+                raise_for_inference_status(response)
+                try:
+                    return response.json()
+                except ValueError as e:
+                    raise AIUnavailableError("bad_response", "Inference backend returned invalid JSON") from e
+        except AIUnavailableError as e:
+            if not should_retry(e, deadline):
+                raise
+            logging.info(f"Inference {e.reason}, retrying in {e.retry_after:.1f}s")
+            await asyncio.sleep(e.retry_after)
+
+def ai_unavailable(error: AIUnavailableError) -> HTTPException:
+    """503 for routes that cannot answer without the model"""
+    retry_after = math.ceil(error.retry_after) if error.retry_after else math.ceil(AI_QUEUE_TIMEOUT_SECONDS)
+    return HTTPException(status_code=503, detail=AI_UNAVAILABLE_MESSAGE, headers={"Retry-After": str(max(retry_after, 1))})
+
+def generation_parameters(max_tokens: int) -> Dict[str, Any]:
+    """Sampling parameters shared by the buffered and streaming generation paths"""
+    return {
+        "max_new_tokens": max_tokens,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "return_full_text": False
     }
+
+async def generate_ai_content(prompt: str, max_tokens: int = 500, use_cache: bool = True) -> str:
+    """Generate content using Llama model via HuggingFace API
+    
+    Identical (model, prompt, parameters) requests are served from ai_cache;
+    pass use_cache=False for prompts whose output should vary between calls.
+    Concurrent identical calls share one cache lookup and upstream request.
+    Raises AIUnavailableError when no content could be generated; failures
+    are never cached.
+    """
+    parameters = generation_parameters(max_tokens)
+    fingerprint = AIResponseCache.make_key(HF_MODEL, prompt, parameters)
+    cached = use_cache and AI_CACHE_ENABLED
+    return await ai_flights.do(f"{fingerprint}:{int(cached)}", lambda: _generate_ai_content(prompt, parameters, fingerprint if cached else None))
+
+async def _generate_ai_content(prompt: str, parameters: Dict[str, Any], cache_key: Optional[str]) -> str:
+    payload = {"inputs": prompt, "parameters": parameters}
+    
+    if cache_key:
+        cached = await ai_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    else:
+        ai_cache.counters["bypassed"] += 1
+    
+    try:
+        result = await post_inference(payload)
+    except AIUnavailableError as e:
+        logging.error(f"AI generation error ({e.reason}): {str(e)}")
+        raise
+    if isinstance(result, list) and len(result) > 0:
+        result = result[0]
+    content = result.get('generated_text', '').strip() if isinstance(result, dict) else ''
+    if not content:
+        logging.error(f"AI generation error: unexpected response {str(result)[:200]}")
+        raise AIUnavailableError("bad_response", "Inference backend returned no generated text")
+    
+    if cache_key:
+        await ai_cache.set(cache_key, content)
+    return content
+
+async def stream_ai_tokens(prompt: str, max_tokens: int = 500) -> AsyncIterator[str]:
+    """Yield generated tokens as the inference endpoint produces them
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    Uses the endpoint's "stream" mode (SSE lines of {"token": {...}}). The
+    upstream response is only read as fast as the caller consumes tokens, and
+    closing this generator closes the upstream connection, which cancels the
+    generation on the inference side. Runs under the inference guard like
+    generate_ai_content; loading/overload hints are waited out only before
+    the first token.
+    """
+    payload = {"inputs": prompt, "parameters": generation_parameters(max_tokens), "stream": True}
+    deadline = time.monotonic() + AI_RETRY_BUDGET_SECONDS
+    emitted = False
+    while True:
         try:
-            response = await client.post(HF_API_URL, headers=headers, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            if isinstance(result, list) and len(result) > 0:
-                return result[0].get('generated_text', '').strip()
-            return str(result)
-        except Exception as e:
-            logging.error(f"AI generation error: {str(e)}")
-            return "Content generation temporarily unavailable."
+            async with inference_slot() as call:
+                async with get_http_client().stream("POST", HF_API_URL, json=payload) as response:
+                    call.responded()
+                    if response.status_code >= 400:
+                        await response.aread()
+                        raise_for_inference_status(response)
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if not data or data == "[DONE]":
+                            continue
+                        try:
+                            event = json.loads(data)
+                        except json.JSONDecodeError as e:
+                            raise AIUnavailableError("bad_response", "Inference stream sent invalid JSON") from e
+                        if event.get("error"):
+                            raise AIUnavailableError("upstream_error", str(event["error"]))
+                        token = event.get("token") or {}
+                        if token.get("special") or not token.get("text"):
+                            continue
+                        emitted = True
+                        yield token["text"]
+            return
+        except AIUnavailableError as e:
+            if emitted or not should_retry(e, deadline):
+                raise
+            logging.info(f"Inference {e.reason}, retrying stream in {e.retry_after:.1f}s")
+            await asyncio.sleep(e.retry_after)
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# ==================== Chat Answer Cache ====================
+CHAT_CACHE_ENABLED = env_flag('CHAT_CACHE_ENABLED', True)
+CHAT_CACHE_THRESHOLD = float(os.environ.get('CHAT_CACHE_THRESHOLD', '0.8'))
+CHAT_CACHE_MAX_ENTRIES = int(os.environ.get('CHAT_CACHE_MAX_ENTRIES', '2048'))
+CHAT_CACHE_NGRAM = int(os.environ.get('CHAT_CACHE_NGRAM', '3'))
+CHAT_CACHE_PERMUTATIONS = int(os.environ.get('CHAT_CACHE_PERMUTATIONS', '64'))
+CHAT_CACHE_BANDS = int(os.environ.get('CHAT_CACHE_BANDS', '16'))
+
+MINHASH_PRIME = (1 << 61) - 1
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+class ChatAnswerCache:
+    """Answers for near-duplicate chat questions, found via MinHash/LSH
+    
+    Questions are reduced to character n-gram shingles and a MinHash
+    signature; banded LSH buckets narrow the lookup to a few candidates whose
+    estimated Jaccard similarity is compared against the threshold. Learned
+    answers live in an in-process LRU; pinned answers are curated by admins,
+    persisted in MongoDB and never evicted.
+    """
+
+    def __init__(self, collection_name: str, max_entries: int, threshold: float, ngram: int, permutations: int, bands: int):
+        if permutations % bands:
+            raise ValueError("CHAT_CACHE_PERMUTATIONS must be a multiple of CHAT_CACHE_BANDS")
+        self.collection_name = collection_name
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ngram = ngram
+        self.bands = bands
+        self.rows = permutations // bands
+        # Shingles use the process-salted str hash; signatures are never persisted
+        # Full-width coefficients so (a * h + b) wraps and each row ranks shingles differently
+        rng = np.random.default_rng(20240611)
+        self._a = rng.integers(1, MINHASH_PRIME, size=permutations, dtype=np.uint64)
+        self._b = rng.integers(0, MINHASH_PRIME, size=permutations, dtype=np.uint64)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], set] = {}
+        self._exact: Dict[str, str] = {}
+        self.counters = {"hits": 0, "exact_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lookup_seconds = 0.0
+
+    def signature(self, normalized: str) -> np.ndarray:
+        padded = f" {normalized} "
+        shingles = {padded[i:i + self.ngram] for i in range(max(len(padded) - self.ngram + 1, 1))}
+        hashes = np.fromiter(
+            (hash(s) & 0xFFFFFFFF for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % np.uint64(MINHASH_PRIME)
+        return (permuted & np.uint64(0xFFFFFFFF)).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _add(self, entry_id: str, question: str, answer: str, pinned: bool):
+        normalized = normalize_question(question)
+        if normalized in self._exact:
+            self._remove(self._exact[normalized])
+        signature = self.signature(normalized)
+        self._entries[entry_id] = {
+            "id": entry_id, "question": question, "answer": answer, "pinned": pinned,
+            "normalized": normalized, "signature": signature, "hits": 0
+        }
+        self._exact[normalized] = entry_id
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(entry_id)
+        self._evict()
+
+    def _remove(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if not entry:
+            return
+        if self._exact.get(entry['normalized']) == entry_id:
+            del self._exact[entry['normalized']]
+        for key in self._band_keys(entry['signature']):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _evict(self):
+        if len(self._entries) <= self.max_entries:
+            return
+        learned = len(self._entries) - self.pinned_count()
+        while learned > self.max_entries:
+            victim = next(entry_id for entry_id, entry in self._entries.items() if not entry['pinned'])
+            self._remove(victim)
+            self.counters["evictions"] += 1
+            learned -= 1
+
+    def pinned_count(self) -> int:
+        return sum(1 for entry in self._entries.values() if entry['pinned'])
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Return a cached answer for a question similar enough to one already answered"""
+        started = time.perf_counter()
+        try:
+            normalized = normalize_question(question)
+            if not normalized:
+                return None
+            entry_id = self._exact.get(normalized)
+            similarity = 1.0
+            if entry_id:
+                self.counters["exact_hits"] += 1
+            else:
+                signature = self.signature(normalized)
+                candidates = set()
+                for key in self._band_keys(signature):
+                    candidates |= self._buckets.get(key, set())
+                similarity = 0.0
+                if candidates:
+                    candidates = list(candidates)
+                    signatures = np.stack([self._entries[candidate]['signature'] for candidate in candidates])
+                    estimates = (signatures == signature).mean(axis=1)
+                    best = int(estimates.argmax())
+                    entry_id, similarity = candidates[best], float(estimates[best])
+            if not entry_id or similarity < self.threshold:
+                self.counters["misses"] += 1
+                return None
+            entry = self._entries[entry_id]
+            entry['hits'] += 1
+            self._entries.move_to_end(entry_id)
+            self.counters["hits"] += 1
+            return entry['answer']
+        finally:
+            self._lookup_seconds += time.perf_counter() - started
+
+    def remember(self, question: str, answer: str):
+        """Store a freshly generated answer; pinned answers for the same question win"""
+        existing = self._exact.get(normalize_question(question))
+        if existing and self._entries[existing]['pinned']:
+            return
+        self._add(str(uuid.uuid4()), question, answer, pinned=False)
+        self.counters["stores"] += 1
+
+    async def load_pins(self):
+        async for pin in db[self.collection_name].find({}, {"_id": 0}):
+            self._add(pin['id'], pin['question'], pin['answer'], pinned=True)
+
+    async def pin(self, pin: Dict[str, Any]):
+        await db[self.collection_name].insert_one(dict(pin))
+        self._add(pin['id'], pin['question'], pin['answer'], pinned=True)
+
+    async def unpin(self, pin_id: str) -> bool:
+        result = await db[self.collection_name].delete_one({"id": pin_id})
+        self._remove(pin_id)
+        return result.deleted_count > 0
+
+    def pins(self) -> List[Dict[str, Any]]:
+        return [
+            {"id": entry['id'], "question": entry['question'], "answer": entry['answer'], "hits": entry['hits']}
+            for entry in self._entries.values() if entry['pinned']
+        ]
+
+    def clear(self):
+        """Drop learned answers; pins stay"""
+        for entry_id in [entry_id for entry_id, entry in self._entries.items() if not entry['pinned']]:
+            self._remove(entry_id)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "pinned": self.pinned_count(),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+            "avg_lookup_us": round(self._lookup_seconds / lookups * 1e6, 1) if lookups else 0.0
+        }
+
+chat_cache = ChatAnswerCache(
+    "chat_pins", CHAT_CACHE_MAX_ENTRIES, CHAT_CACHE_THRESHOLD,
+    CHAT_CACHE_NGRAM, CHAT_CACHE_PERMUTATIONS, CHAT_CACHE_BANDS
+)
+
+# ==================== Document Extraction ====================
+EXTRACTION_WORKERS = max(1, int(os.environ.get('EXTRACTION_WORKERS', '2')))
+EXTRACTION_TIMEOUT_SECONDS = float(os.environ.get('EXTRACTION_TIMEOUT_SECONDS', '20'))
+EXTRACTION_MAX_PAGES = int(os.environ.get('EXTRACTION_MAX_PAGES', '20'))
+MAX_RESUME_BYTES = int(os.environ.get('MAX_RESUME_BYTES', str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file"""
+extraction_pool: Optional[ProcessPoolExecutor] = None
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be extracted within the configured limits"""
+
+def extract_text_from_pdf(file_content: bytes, max_pages: int = EXTRACTION_MAX_PAGES, time_budget: Optional[float] = None) -> str:
+    """Extract text from PDF file, reading at most max_pages pages within time_budget seconds"""
+    deadline = time.monotonic() + time_budget if time_budget else None
     try:
-        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-            text = ''
+        with pdfplumber.open(io.BytesIO(file_content), pages=range(1, max_pages + 1)) as pdf:
+            parts = []
             for page in pdf.pages:
-                text += page.extract_text() or ''
-        return text
+                if deadline and time.monotonic() > deadline:
+                    logging.warning(f"PDF extraction stopped after {len(parts)} pages (time budget exhausted)")
+                    break
+                parts.append(page.extract_text() or '')
+        return '\n'.join(parts)
     except Exception as e:
         logging.error(f"PDF extraction error: {str(e)}")
         return ""
 
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text from DOCX file"""
+def extract_text_from_docx(file_content: bytes, max_pages: int = EXTRACTION_MAX_PAGES, time_budget: Optional[float] = None) -> str:
+    """Extract text from DOCX file (max_pages is accepted for a uniform signature; DOCX has no pages)"""
+    deadline = time.monotonic() + time_budget if time_budget else None
     try:
         doc = Document(io.BytesIO(file_content))
-        text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-        return text
+        parts = []
+        for paragraph in doc.paragraphs:
+            if deadline and time.monotonic() > deadline:
+                logging.warning(f"DOCX extraction stopped after {len(parts)} paragraphs (time budget exhausted)")
+                break
+            parts.append(paragraph.text)
+        return '\n'.join(parts)
     except Exception as e:
         logging.error(f"DOCX extraction error: {str(e)}")
         return ""
 
-# ==================== Models ====================
-class ContactSubmission(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    name: str
-    email: EmailStr
-    subject: Optional[str] = None
-    message: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+class ExtractionPool:
+    """Process pool for document extraction that can be retired without failing work in it
+    
+    A call that overruns its time budget keeps its worker busy, and there is
+    no way to stop just that process. The pool is then retired: new calls go
+    to a fresh pool, calls already submitted here finish normally, and the
+    processes are terminated once no caller is waiting on this pool any more.
+    """
 
-class ContactSubmissionCreate(BaseModel):
-    name: str
-    email: EmailStr
-    subject: Optional[str] = None
-    message: str
+    def __init__(self, workers: int):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.waiting: set = set()
+        self.retired = False
+        self.closed = False
 
-class ATSConfig(BaseModel):
-    """ATS Configuration for job evaluation"""
-    min_accuracy_threshold: int = 85  # Minimum accuracy to be selected (0-100)
-    skill_weight: float = 0.30  # Weight for skills matching (0-1)
-    experience_weight: float = 0.25  # Weight for experience matching (0-1)
-    education_weight: float = 0.20  # Weight for education matching (0-1)
-    qualification_weight: float = 0.15  # Weight for qualification matching (0-1)
-    overall_fit_weight: float = 0.10  # Weight for overall fit (0-1)
-    required_skills: List[str] = []  # Must-have skills
-    preferred_skills: List[str] = []  # Nice-to-have skills
-    min_experience_years: Optional[int] = None  # Minimum years of experience
-    required_education: Optional[str] = None  # Required education level
-    evaluation_criteria: Optional[str] = None  # Custom evaluation instructions
+    async def run(self, func: Callable[..., T], *args: Any, timeout: float) -> T:
+        future = self.executor.submit(func, *args)
+        self.waiting.add(future)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        finally:
+            self.waiting.discard(future)
+            if self.retired:
+                self.close_if_idle()
 
-class JobPosting(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    title: str
-    department: str
-    location: str
-    type: str  # Full-time, Part-time, Contract, Internship
-    description: str
-    qualification: str  # Required qualifications
-    timings: str  # Work timings
-    requirements: List[str]
-    responsibilities: List[str]
-    ats_config: Optional[ATSConfig] = None  # ATS configuration
-    status: str = "active"  # active, closed
-    posted_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    def retire(self):
+        self.retired = True
+        self.close_if_idle()
 
-class JobPostingCreate(BaseModel):
-    title: str
-    department: str
-    location: str
-    type: str
-    description: str
-    qualification: str
-    timings: str
-    requirements: List[str]
-    responsibilities: List[str]
-    ats_config: Optional[ATSConfig] = None  # ATS configuration
+    def close_if_idle(self):
+        if self.closed or self.waiting:
+            return
+        self.closed = True
+        # ProcessPoolExecutor has no public way to stop a running call, so terminate the processes
+        for process in list((getattr(self.executor, '_processes', None) or {}).values()):
+            process.terminate()
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
-class JobApplication(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    job_id: str
-    job_title: str
-    name: str
-    email: EmailStr
-    phone: str
-    resume_text: str
-    resume_file: Optional[str] = None  # Base64 encoded file content
-    resume_filename: Optional[str] = None  # Original filename
-    resume_file_size: Optional[int] = None  # File size in bytes
-    resume_content_type: Optional[str] = None  # MIME type (application/pdf, etc.)
-    cover_letter: Optional[str] = None
-    ai_analysis: Optional[Dict[str, Any]] = None
-    status: str = "pending"  # pending, reviewing, shortlisted, rejected
-    applied_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+def get_extraction_pool() -> ExtractionPool:
+    global extraction_pool
+    if extraction_pool is None:
+        extraction_pool = ExtractionPool(EXTRACTION_WORKERS)
+    return extraction_pool
 
-class BlogPost(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    title: str
-    slug: str
-    content: str
-    excerpt: Optional[str] = None
-    summary: Optional[str] = None  # AI-generated summary
-    author: str
-    tags: List[str] = []
-    featured_image: Optional[str] = None  # Base64 encoded image
-    images: List[str] = []  # Additional images in content (base64 encoded)
-    seo_description: Optional[str] = None
-    published: bool = False
-    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+def retire_extraction_pool(pool: ExtractionPool):
+    """Send new calls to a fresh pool; `pool` closes once its in-flight calls are done"""
+    global extraction_pool
+    if extraction_pool is pool:
+        extraction_pool = None
+    pool.retire()
 
-class BlogPostCreate(BaseModel):
-    title: str
-    content: str
-    author: str
-    tags: List[str] = []
-    featured_image: Optional[str] = None  # Base64 encoded image
-    images: List[str] = []  # Additional images (base64 encoded)
-    published: bool = False
+async def extract_document_text(filename: str, file_content: bytes) -> str:
+    """Extract resume text in the process pool so parsing never blocks the event loop"""
+    if filename.lower().endswith('.pdf'):
+        extractor = extract_text_from_pdf
+    elif filename.lower().endswith(('.docx', '.doc')):
+        extractor = extract_text_from_docx
+    else:
+        raise ValueError(f"Unsupported document type: {filename}")
+    
+    # A worker that died (e.g. out of memory) breaks every call in its pool; retry those once on a fresh pool
+    for attempt in range(2):
+        pool = get_extraction_pool()
+        try:
+            # The worker stops cooperatively at the time budget; the grace period covers a single slow page
+            return await pool.run(
+                extractor, file_content, EXTRACTION_MAX_PAGES, EXTRACTION_TIMEOUT_SECONDS,
+                timeout=EXTRACTION_TIMEOUT_SECONDS + 5
+            )
+        except asyncio.TimeoutError:
+            logging.error(f"Extraction of {filename} timed out, retiring the extraction pool")
+            retire_extraction_pool(pool)
+            raise ExtractionError("Document took too long to process")
+        except BrokenProcessPool:
+            retire_extraction_pool(pool)
+            if attempt:
+                raise ExtractionError("Document processing failed, please try again")
+            logging.warning(f"Extraction pool broke while processing {filename}, retrying on a fresh pool")
 
-class Testimonial(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    company: str
-    position: Optional[str] = None
-    content: str
-    rating: int = 5
-    avatar: Optional[str] = None
-    featured: bool = False
-    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+async def iter_upload(upload: UploadFile, max_bytes: int) -> AsyncIterator[bytes]:
+    """Yield an upload in chunks, refusing anything larger than max_bytes"""
+    size = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File too large (maximum {max_bytes // (1024 * 1024)} MB)")
+        yield chunk
+
+# ==================== Blob Storage ====================
+BLOB_STORE_BACKEND = os.environ.get('BLOB_STORE_BACKEND', 'gridfs')  # gridfs or local
+BLOB_STORE_PATH = Path(os.environ.get('BLOB_STORE_PATH', str(ROOT_DIR / 'uploads')))
+BLOB_READ_CHUNK_SIZE = 256 * 1024
+
+class BlobStore:
+    """Binary file storage addressed by id; files are written and read back in chunks"""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    async def save(self, blob_id: str, chunks: AsyncIterator[bytes], filename: str, content_type: str) -> Dict[str, Any]:
+        """Store the chunks and return {id, length, sha256, filename, content_type}"""
+        raise NotImplementedError
+
+    async def stat(self, blob_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def iter_range(self, blob_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive)"""
+        raise NotImplementedError
+
+    async def delete(self, blob_id: str):
+        raise NotImplementedError
+
+class GridFSBlobStore(BlobStore):
+    """Blob store backed by a GridFS bucket in the application database"""
+
+    @property
+    def bucket(self) -> AsyncIOMotorGridFSBucket:
+        return AsyncIOMotorGridFSBucket(db, bucket_name=self.namespace)
+
+    async def save(self, blob_id, chunks, filename, content_type):
+        digest = hashlib.sha256()
+        grid_in = self.bucket.open_upload_stream_with_id(
+            blob_id, filename, metadata={"content_type": content_type}
+        )
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                await grid_in.write(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        await db[f"{self.namespace}.files"].update_one(
+            {"_id": blob_id}, {"$set": {"metadata.sha256": digest.hexdigest()}}
+        )
+        return {
+            "id": blob_id,
+            "length": grid_in.length,
+            "sha256": digest.hexdigest(),
+            "filename": filename,
+            "content_type": content_type
+        }
+
+    async def stat(self, blob_id):
+        doc = await db[f"{self.namespace}.files"].find_one({"_id": blob_id})
+        if not doc:
+            return None
+        metadata = doc.get('metadata') or {}
+        return {
+            "id": blob_id,
+            "length": doc['length'],
+            "sha256": metadata.get('sha256'),
+            "filename": doc.get('filename'),
+            "content_type": metadata.get('content_type')
+        }
+
+    async def iter_range(self, blob_id, start, end):
+        grid_out = await self.bucket.open_download_stream(blob_id)
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(BLOB_READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, blob_id):
+        await self.bucket.delete(blob_id)
+
+class LocalBlobStore(BlobStore):
+    """Blob store on the local filesystem (single-host deployments and tests)"""
+
+    def _path(self, blob_id: str) -> Path:
+        safe_id = re.sub(r'[^A-Za-z0-9_-]', '', blob_id)
+        return BLOB_STORE_PATH / self.namespace / safe_id[:2] / safe_id
+
+    async def save(self, blob_id, chunks, filename, content_type):
+        path = self._path(blob_id)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        length = 0
+        handle = await asyncio.to_thread(open, path.with_suffix('.part'), 'wb')
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                length += len(chunk)
+                await asyncio.to_thread(handle.write, chunk)
+        except BaseException:
+            handle.close()
+            path.with_suffix('.part').unlink(missing_ok=True)
+            raise
+        handle.close()
+        info = {
+            "id": blob_id,
+            "length": length,
+            "sha256": digest.hexdigest(),
+            "filename": filename,
+            "content_type": content_type
+        }
+        await asyncio.to_thread(path.with_suffix('.json').write_text, json.dumps(info))
+        await asyncio.to_thread(path.with_suffix('.part').replace, path)
+        return info
+
+    async def stat(self, blob_id):
+        meta_path = self._path(blob_id).with_suffix('.json')
+        if not self._path(blob_id).exists() or not meta_path.exists():
+            return None
+        return json.loads(await asyncio.to_thread(meta_path.read_text))
+
+    async def iter_range(self, blob_id, start, end):
+        handle = await asyncio.to_thread(open, self._path(blob_id), 'rb')
+        try:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(handle.read, min(BLOB_READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            handle.close()
+
+    async def delete(self, blob_id):
+        path = self._path(blob_id)
+        path.unlink(missing_ok=True)
+        path.with_suffix('.json').unlink(missing_ok=True)
+
+def create_blob_store(namespace: str) -> BlobStore:
+    if BLOB_STORE_BACKEND == 'local':
+        return LocalBlobStore(namespace)
+    return GridFSBlobStore(namespace)
+
+resume_store = create_blob_store("resumes")
+
+async def iter_bytes(data: bytes, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    for offset in range(0, len(data), chunk_size):
+        yield data[offset:offset + chunk_size]
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=start-end' range; None means the whole file, ValueError means unsatisfiable"""
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start_text, _, end_text = range_header[len('bytes='):].strip().partition('-')
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+            if end_text and end < start:
+                # Syntactically invalid (RFC 9110 14.1.1): ignore the header
+                return None
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(end_text), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+def blob_response(request: Request, info: Dict[str, Any], store: BlobStore, disposition: Optional[str] = None, cache_control: str = "private, no-cache"):
+    """Stream a stored blob honouring If-None-Match, Range and If-Range"""
+    etag = f'"{info["sha256"]}"' if info.get('sha256') else None
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": cache_control}
+    if etag:
+        headers["ETag"] = etag
+    if disposition:
+        headers["Content-Disposition"] = disposition
+    
+    if etag and etag in [tag.strip() for tag in request.headers.get('if-none-match', '').split(',')]:
+        return Response(status_code=304, headers=headers)
+    
+    size = info['length']
+    range_header = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    if if_range and if_range != etag:
+        range_header = None
+    try:
+        byte_range = parse_range_header(range_header, size) if size else None
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    body = store.iter_range(info['id'], start, end) if size else iter_bytes(b'')
+    return StreamingResponse(
+        body,
+        status_code=206 if byte_range else 200,
+        media_type=info.get('content_type') or "application/octet-stream",
+        headers=headers
+    )
+
+# ==================== Media Store ====================
+MEDIA_MAX_BYTES = int(os.environ.get('MEDIA_MAX_BYTES', str(10 * 1024 * 1024)))
+MEDIA_VARIANT_WIDTHS = sorted(int(width) for width in os.environ.get('MEDIA_VARIANT_WIDTHS', '320,960').split(',') if width.strip())
+MEDIA_WEBP_QUALITY = int(os.environ.get('MEDIA_WEBP_QUALITY', '80'))
+MEDIA_URL_PREFIX = "/api/media/"
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "GIF": "image/gif", "WEBP": "image/webp"}
+
+# Image fields that hold media URLs, per collection ("[]" marks a list field)
+MEDIA_FIELDS: Dict[str, List[str]] = {
+    "blog_posts": ["featured_image", "images[]"],
+    "projects": ["image"],
+    "case_studies": ["image"],
+    "testimonials": ["avatar"],
+    "resumes": ["photo"]
+}
+
+media_store = create_blob_store("media")
+
+class InvalidImageError(ValueError):
+    pass
+
+def render_media_variants(data: bytes, widths: List[int], quality: int) -> Tuple[Dict[str, Any], Dict[int, bytes]]:
+    """Validate an image and render downscaled WebP variants (runs in a worker thread)"""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format = image.format
+            if image_format not in MEDIA_FORMATS:
+                raise InvalidImageError(f"Unsupported image format: {image_format}")
+            image = ImageOps.exif_transpose(image)
+            width, height = image.size
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.mode or "transparency" in image.info else "RGB")
+            variants = {}
+            for target in widths:
+                if target >= width:
+                    break
+                variant = image.copy()
+                variant.thumbnail((target, max(1, round(height * target / width))), Image.LANCZOS)
+                buffer = io.BytesIO()
+                variant.save(buffer, "WEBP", quality=quality, method=4)
+                variants[target] = buffer.getvalue()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(f"Not a readable image: {str(e)}")
+    return {"content_type": MEDIA_FORMATS[image_format], "width": width, "height": height}, variants
+
+def media_url(sha256: str) -> str:
+    return f"{MEDIA_URL_PREFIX}{sha256}"
+
+async def store_media(data: bytes, filename: str = "image") -> Dict[str, Any]:
+    """Store an image once by SHA-256, with its WebP variants; returns the media document"""
+    if len(data) > MEDIA_MAX_BYTES:
+        raise InvalidImageError(f"Image too large (maximum {MEDIA_MAX_BYTES // (1024 * 1024)} MB)")
+    sha256 = hashlib.sha256(data).hexdigest()
+    existing = await db.media.find_one({"sha256": sha256}, {"_id": 0})
+    if existing:
+        return existing
+    
+    info, rendered = await asyncio.to_thread(render_media_variants, data, MEDIA_VARIANT_WIDTHS, MEDIA_WEBP_QUALITY)
+    await media_store.save(sha256, iter_bytes(data), filename, info['content_type'])
+    variants = []
+    for width, content in rendered.items():
+        blob = await media_store.save(f"{sha256}_{width}w", iter_bytes(content), f"{width}w.webp", "image/webp")
+        variants.append({"id": blob['id'], "width": width, "length": blob['length']})
+    doc = {
+        "sha256": sha256,
+        "url": media_url(sha256),
+        "length": len(data),
+        **info,
+        "variants": variants,
+        "created_date": datetime.now(timezone.utc)
+    }
+    try:
+        await db.media.insert_one(dict(doc))
+    except DuplicateKeyError:
+        pass  # stored concurrently by another request; the blobs are identical
+    return doc
+
+def decode_image_value(value: str) -> bytes:
+    """Bytes of a data: URL or bare base64 string"""
+    payload = value.split(',', 1)[1] if value.startswith('data:') else value
+    try:
+        return base64.b64decode(payload, validate=False)
+    except (ValueError, TypeError):
+        raise InvalidImageError("Image is not valid base64")
+
+async def externalize_image(value: Optional[str]) -> Optional[str]:
+    """Replace inline image data with a media URL; URLs and empty values pass through"""
+    if not value or value.startswith((MEDIA_URL_PREFIX, 'http://', 'https://')):
+        return value
+    media = await store_media(decode_image_value(value))
+    return media['url']
+
+async def externalize_media_fields(collection: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Externalize every image field of a document about to be written (see MEDIA_FIELDS)"""
+    try:
+        for field in MEDIA_FIELDS[collection]:
+            if field.endswith('[]'):
+                name = field[:-2]
+                if doc.get(name):
+                    doc[name] = [await externalize_image(value) for value in doc[name]]
+            elif field in doc:
+                doc[field] = await externalize_image(doc[field])
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return doc
+
+# ==================== Background Task Queue ====================
+TASK_WORKER_CONCURRENCY = int(os.environ.get('TASK_WORKER_CONCURRENCY', '4'))
+TASK_QUEUE_MAX_DEPTH = int(os.environ.get('TASK_QUEUE_MAX_DEPTH', '1000'))
+TASK_MAX_ATTEMPTS = int(os.environ.get('TASK_MAX_ATTEMPTS', '3'))
+TASK_RETRY_BACKOFF_SECONDS = float(os.environ.get('TASK_RETRY_BACKOFF_SECONDS', '5'))
+TASK_POLL_INTERVAL = float(os.environ.get('TASK_POLL_INTERVAL', '1.0'))
+TASK_LEASE_SECONDS = int(os.environ.get('TASK_LEASE_SECONDS', '300'))
+TASK_MAX_PER_MINUTE = int(os.environ.get('TASK_MAX_PER_MINUTE', '0'))  # 0 = unlimited
+TASK_RETENTION_DAYS = int(os.environ.get('TASK_RETENTION_DAYS', '7'))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+class QueueFullError(Exception):
+    """Raised when the task queue is at TASK_QUEUE_MAX_DEPTH"""
+
+class TaskQueue:
+    """Persistent task queue stored in a MongoDB collection and drained by a bounded worker pool
+    
+    Tasks are claimed atomically with a lease, so several uvicorn workers can share the
+    queue and a crashed worker's tasks become claimable again once the lease expires.
+    """
+
+    def __init__(self, collection_name: str):
+        self.collection_name = collection_name
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {}
+        self.failure_handlers: Dict[str, Callable[[Dict[str, Any], str], Awaitable[None]]] = {}
+        self.concurrency = TASK_WORKER_CONCURRENCY
+        self.counters = {"enqueued": 0, "completed": 0, "failed": 0, "retried": 0}
+        self._durations: deque = deque(maxlen=200)
+        self._completions: deque = deque(maxlen=1000)
+        self._in_flight = 0
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._next_slot = 0.0
+        self._rate_lock = asyncio.Lock()
+
+    @property
+    def collection(self):
+        return db[self.collection_name]
+
+    def handler(self, kind: str, on_failure: Optional[Callable[[Dict[str, Any], str], Awaitable[None]]] = None):
+        """Register the coroutine that processes tasks of the given kind"""
+        def decorator(func):
+            self.handlers[kind] = func
+            if on_failure:
+                self.failure_handlers[kind] = on_failure
+            return func
+        return decorator
+
+    async def depth(self) -> int:
+        return await self.collection.count_documents({"status": {"$in": ["queued", "running"]}})
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        if await self.depth() >= TASK_QUEUE_MAX_DEPTH:
+            raise QueueFullError(f"Task queue is full ({TASK_QUEUE_MAX_DEPTH} pending tasks)")
+        now = datetime.now(timezone.utc)
+        task_id = str(uuid.uuid4())
+        await self.collection.insert_one({
+            "id": task_id,
+            "kind": kind,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "available_at": now,
+            "created_date": now
+        })
+        self.counters["enqueued"] += 1
+        self._wakeup.set()
+        return task_id
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                # A worker that died mid-task counts as a failed attempt
+                {"status": "running", "lease_until": {"$lt": now}, "attempts": {"$lt": TASK_MAX_ATTEMPTS}}
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker": WORKER_ID,
+                    "started_date": now,
+                    "lease_until": now + timedelta(seconds=TASK_LEASE_SECONDS)
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """Claim a task once TASK_MAX_PER_MINUTE allows another start
+        
+        The wait happens before the claim, so the lease only starts when the
+        task can run; a poll that finds nothing does not use up a slot.
+        """
+        if TASK_MAX_PER_MINUTE <= 0:
+            return await self._claim()
+        async with self._rate_lock:
+            wait = self._next_slot - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            task = await self._claim()
+            if task is not None:
+                self._next_slot = time.monotonic() + 60.0 / TASK_MAX_PER_MINUTE
+            return task
+
+    async def _fail_abandoned(self):
+        """Fail tasks whose last allowed attempt died with its worker (lease expired)"""
+        while True:
+            now = datetime.now(timezone.utc)
+            task = await self.collection.find_one_and_update(
+                {"status": "running", "lease_until": {"$lt": now}, "attempts": {"$gte": TASK_MAX_ATTEMPTS}},
+                {"$set": {
+                    "status": "failed",
+                    "last_error": "Worker stopped before finishing the task (lease expired)",
+                    "finished_date": now
+                }, "$unset": {"lease_until": ""}},
+                return_document=ReturnDocument.AFTER
+            )
+            if task is None:
+                return
+            self.counters["failed"] += 1
+            logging.error(f"Task {task['id']} ({task['kind']}) failed permanently after {task['attempts']} attempts: {task['last_error']}")
+            await self._on_failure(task, task['last_error'])
+
+    async def _on_failure(self, task: Dict[str, Any], error: str):
+        on_failure = self.failure_handlers.get(task['kind'])
+        if on_failure:
+            try:
+                await on_failure(task['payload'], error)
+            except Exception as hook_error:
+                logging.error(f"Failure handler for task {task['id']} raised: {str(hook_error)}")
+
+    async def _finish(self, task: Dict[str, Any], update: Dict[str, Any]) -> bool:
+        """Record this attempt's outcome unless the lease was lost to another worker meanwhile"""
+        result = await self.collection.update_one(
+            {"id": task['id'], "worker": WORKER_ID, "attempts": task['attempts']},
+            update
+        )
+        if not result.matched_count:
+            logging.warning(f"Task {task['id']} ({task['kind']}) was reclaimed after its lease expired; dropping the result of attempt {task['attempts']}")
+        return bool(result.matched_count)
+
+    async def _run(self, task: Dict[str, Any]):
+        kind = task['kind']
+        started = time.monotonic()
+        self._in_flight += 1
+        try:
+            handler = self.handlers.get(kind)
+            if handler is None:
+                raise RuntimeError(f"No handler registered for task kind '{kind}'")
+            await handler(task['payload'])
+        except asyncio.CancelledError:
+            # Leave the task leased; another worker reclaims it when the lease expires
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            if task['attempts'] < TASK_MAX_ATTEMPTS:
+                delay = TASK_RETRY_BACKOFF_SECONDS * (2 ** (task['attempts'] - 1))
+                # Don't come back before the failing dependency said it would be ready
+                delay = max(delay, getattr(e, 'retry_after', None) or 0)
+                if await self._finish(task, {"$set": {
+                    "status": "queued",
+                    "last_error": error,
+                    "available_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+                }}):
+                    self.counters["retried"] += 1
+                    logging.warning(f"Task {task['id']} ({kind}) failed on attempt {task['attempts']}, retrying in {delay}s: {error}")
+            elif await self._finish(task, {"$set": {"status": "failed", "last_error": error, "finished_date": datetime.now(timezone.utc)}}):
+                self.counters["failed"] += 1
+                logging.error(f"Task {task['id']} ({kind}) failed permanently after {task['attempts']} attempts: {error}")
+                await self._on_failure(task, error)
+        else:
+            if await self._finish(
+                task,
+                {"$set": {"status": "done", "finished_date": datetime.now(timezone.utc)}, "$unset": {"lease_until": ""}}
+            ):
+                self.counters["completed"] += 1
+            self._durations.append(time.monotonic() - started)
+            self._completions.append(time.monotonic())
+        finally:
+            self._in_flight -= 1
+
+    async def _worker(self, number: int):
+        while True:
+            try:
+                task = await self._claim_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Task worker {number} could not claim a task: {str(e)}")
+                task = None
+            if task is None:
+                try:
+                    await self._fail_abandoned()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Task worker {number} could not fail abandoned tasks: {str(e)}")
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=TASK_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Task worker {number} could not record the result of {task['id']}: {str(e)}")
+
+    def start(self, concurrency: Optional[int] = None):
+        if self._workers:
+            return
+        self.concurrency = concurrency or self.concurrency
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(self.concurrency)]
+        logging.info(f"Task queue started with {self.concurrency} workers ({WORKER_ID})")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def stats(self) -> Dict[str, Any]:
+        by_status = {}
+        async for row in self.collection.aggregate([
+            {"$match": {"status": {"$in": ["queued", "running", "failed"]}}},
+            {"$group": {"_id": {"kind": "$kind", "status": "$status"}, "count": {"$sum": 1}}}
+        ]):
+            by_status.setdefault(row['_id']['kind'], {})[row['_id']['status']] = row['count']
+        window_start = time.monotonic() - 60
+        durations = list(self._durations)
+        return {
+            "worker_id": WORKER_ID,
+            "concurrency": self.concurrency,
+            "in_flight": self._in_flight,
+            "max_depth": TASK_QUEUE_MAX_DEPTH,
+            "max_per_minute": TASK_MAX_PER_MINUTE or None,
+            "queue": by_status,
+            "completed_last_minute": sum(1 for t in self._completions if t >= window_start),
+            "avg_duration_seconds": round(sum(durations) / len(durations), 3) if durations else None,
+            **self.counters
+        }
+
+task_queue = TaskQueue("task_queue")
+
+# ==================== Email Outbox ====================
+EMAIL_TRANSPORT = os.environ.get('EMAIL_TRANSPORT', 'log')  # log, file or smtp
+EMAIL_FROM = os.environ.get('EMAIL_FROM', 'MasterSolis InfoTech <no-reply@mastersolis.com>')
+EMAIL_FILE_DIR = Path(os.environ.get('EMAIL_FILE_DIR', str(ROOT_DIR / 'outbox')))
+SMTP_HOST = os.environ.get('SMTP_HOST', 'localhost')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '25'))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_STARTTLS = env_flag('SMTP_STARTTLS')
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', '10'))
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '20'))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '5'))
+EMAIL_RETRY_BACKOFF_SECONDS = float(os.environ.get('EMAIL_RETRY_BACKOFF_SECONDS', '30'))
+EMAIL_POLL_INTERVAL = float(os.environ.get('EMAIL_POLL_INTERVAL', '5'))
+EMAIL_LEASE_SECONDS = int(os.environ.get('EMAIL_LEASE_SECONDS', '120'))
+EMAIL_RETENTION_DAYS = int(os.environ.get('EMAIL_RETENTION_DAYS', '30'))
+OUTBOX_TRANSACTIONS = env_flag('OUTBOX_TRANSACTIONS')  # needs a replica set
+
+# Acknowledgment emails. The model writes each template once (the prompt is
+# cached in ai_cache); placeholders are filled per message, so a batch of any
+# size costs at most one generation per kind. `fallback` is used when the
+# model is unavailable or drops a placeholder.
+EMAIL_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "contact_ack": {
+        "subject": "We received your message: {subject}",
+        "placeholders": ["name", "subject"],
+        "prompt": """Write a professional acknowledgment email for a contact form submission to MasterSolis InfoTech.
+    Address the sender with the literal placeholder {name} and refer to their topic with the literal placeholder {subject}.
+    Keep it brief, professional, and assure them we'll respond within 24-48 hours.
+    Return only the email body, no subject line.""",
+        "fallback": "Dear {name},\n\nThank you for contacting MasterSolis InfoTech about \"{subject}\". "
+                    "We have received your message and will respond within 24-48 hours.\n\n"
+                    "Best regards,\nMasterSolis InfoTech"
+    },
+    "application_ack": {
+        "subject": "Your application for {job_title}",
+        "placeholders": ["name", "job_title"],
+        "prompt": """Write a professional job application acknowledgment email from MasterSolis InfoTech.
+    Address the candidate with the literal placeholder {name} and name the position with the literal placeholder {job_title}.
+    Thank them for applying and inform them we'll review their application.
+    Return only the email body, no subject line.""",
+        "fallback": "Dear {name},\n\nThank you for applying for the {job_title} position at MasterSolis InfoTech. "
+                    "We have received your application and our team will review it shortly.\n\n"
+                    "Best regards,\nMasterSolis InfoTech"
+    }
+}
+
+def fill_placeholders(template: str, context: Dict[str, Any]) -> str:
+    # Plain replacement: model-written text may contain other braces
+    for key, value in context.items():
+        template = template.replace("{" + key + "}", str(value))
+    return template
+
+class EmailTransport:
+    """Delivers one rendered message ({to, subject, body})"""
+
+    async def send(self, message: Dict[str, Any]):
+        raise NotImplementedError
+
+def build_email(message: Dict[str, Any]) -> EmailMessage:
+    email = EmailMessage()
+    email['From'] = EMAIL_FROM
+    email['To'] = message['to']
+    email['Subject'] = message['subject']
+    email['Message-ID'] = f"<{message['id']}@mastersolis.com>"
+    email.set_content(message['body'])
+    return email
+
+class LogTransport(EmailTransport):
+    """Logs messages instead of sending them (default, for development)"""
+
+    async def send(self, message: Dict[str, Any]):
+        logging.info(f"Email to {message['to']}: {message['subject']}")
+
+class FileTransport(EmailTransport):
+    """Writes each message as an .eml file into EMAIL_FILE_DIR (local stand-in for SMTP)"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    async def send(self, message: Dict[str, Any]):
+        path = self.directory / f"{message['id']}.eml"
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        await asyncio.to_thread(path.write_bytes, bytes(build_email(message)))
+
+class SMTPTransport(EmailTransport):
+    """Sends through an SMTP relay; smtplib runs on a worker thread"""
+
+    def _send(self, email: EmailMessage):
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT) as smtp:
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if SMTP_USERNAME:
+                smtp.login(SMTP_USERNAME, SMTP_PASSWORD or '')
+            smtp.send_message(email)
+
+    async def send(self, message: Dict[str, Any]):
+        await asyncio.to_thread(self._send, build_email(message))
+
+def create_email_transport() -> EmailTransport:
+    if EMAIL_TRANSPORT == 'smtp':
+        return SMTPTransport()
+    if EMAIL_TRANSPORT == 'file':
+        return FileTransport(EMAIL_FILE_DIR)
+    return LogTransport()
+
+class EmailOutbox:
+    """Outgoing email stored in MongoDB and delivered by a background sender
+
+    Routes only insert a message ({kind, to, context}) next to the record
+    that caused it; the sender claims queued messages in batches with a
+    lease (so several workers can share the outbox), renders them from the
+    kind's template and hands them to the transport, retrying failures
+    with exponential backoff.
+    """
+
+    def __init__(self, collection_name: str, transport: EmailTransport):
+        self.collection_name = collection_name
+        self.transport = transport
+        self.counters = {"queued": 0, "sent": 0, "retried": 0, "failed": 0}
+        self._sender: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def collection(self):
+        return db[self.collection_name]
+
+    def message(self, kind: str, to: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        return {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "to": to,
+            "context": context,
+            "status": "queued",
+            "attempts": 0,
+            "available_at": now,
+            "created_date": now
+        }
+
+    async def insert_with(self, collection, doc: Dict[str, Any], message: Dict[str, Any]):
+        """Insert `doc` and its outbox message together
+
+        With OUTBOX_TRANSACTIONS both inserts commit atomically; otherwise the
+        message is written right after the document, and failing to write it
+        is logged rather than failing the submission.
+        """
+        if OUTBOX_TRANSACTIONS:
+            async with await client.start_session() as session:
+                async with session.start_transaction():
+                    await collection.insert_one(doc, session=session)
+                    await self.collection.insert_one(message, session=session)
+        else:
+            await collection.insert_one(doc)
+            try:
+                await self.collection.insert_one(message)
+            except Exception as e:
+                # The submission itself is stored; only its acknowledgment is lost
+                logging.error(f"Could not queue {message['kind']} email to {message['to']}: {str(e)}")
+                return
+        self.counters["queued"] += 1
+        self._wakeup.set()
+
+    async def _claim_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        now = datetime.now(timezone.utc)
+        while len(batch) < EMAIL_BATCH_SIZE:
+            message = await self.collection.find_one_and_update(
+                {"$or": [
+                    {"status": "queued", "available_at": {"$lte": now}},
+                    {"status": "sending", "lease_until": {"$lt": now}}
+                ]},
+                {
+                    "$set": {"status": "sending", "worker": WORKER_ID, "lease_until": now + timedelta(seconds=EMAIL_LEASE_SECONDS)},
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("available_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if message is None:
+                break
+            batch.append(message)
+        return batch
+
+    async def _template(self, kind: str) -> str:
+        spec = EMAIL_TEMPLATES[kind]
+        try:
+            template = await generate_ai_content(spec['prompt'], 250)
+        except Exception as e:
+            logging.warning(f"Using the fallback {kind} email template: {str(e)}")
+            return spec['fallback']
+        if not template or any("{" + key + "}" not in template for key in spec['placeholders']):
+            return spec['fallback']
+        return template.strip()
+
+    async def render(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Subject and body for each message, one template lookup per kind"""
+        kinds = sorted({message['kind'] for message in batch})
+        templates = dict(zip(kinds, await asyncio.gather(*(self._template(kind) for kind in kinds))))
+        rendered = []
+        for message in batch:
+            spec = EMAIL_TEMPLATES[message['kind']]
+            rendered.append({
+                **message,
+                "subject": fill_placeholders(spec['subject'], message['context']),
+                "body": fill_placeholders(templates[message['kind']], message['context'])
+            })
+        return rendered
+
+    async def _deliver(self, message: Dict[str, Any]):
+        try:
+            await self.transport.send(message)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            if message['attempts'] < EMAIL_MAX_ATTEMPTS:
+                delay = EMAIL_RETRY_BACKOFF_SECONDS * (2 ** (message['attempts'] - 1))
+                update = {"status": "queued", "last_error": error, "available_at": datetime.now(timezone.utc) + timedelta(seconds=delay)}
+                self.counters["retried"] += 1
+                logging.warning(f"Email {message['id']} ({message['kind']}) failed on attempt {message['attempts']}, retrying in {delay}s: {error}")
+            else:
+                update = {"status": "failed", "last_error": error, "finished_date": datetime.now(timezone.utc)}
+                self.counters["failed"] += 1
+                logging.error(f"Email {message['id']} ({message['kind']}) failed permanently: {error}")
+            await self.collection.update_one({"id": message['id']}, {"$set": update, "$unset": {"lease_until": ""}})
+            return
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"id": message['id']},
+            {"$set": {"status": "sent", "subject": message['subject'], "sent_date": now, "finished_date": now}, "$unset": {"lease_until": ""}}
+        )
+        self.counters["sent"] += 1
+
+    async def drain_once(self) -> int:
+        """Claim, render and deliver one batch; returns the number of messages handled"""
+        batch = await self._claim_batch()
+        if not batch:
+            return 0
+        for message in batch:
+            if message['kind'] not in EMAIL_TEMPLATES:
+                await self.collection.update_one(
+                    {"id": message['id']},
+                    {"$set": {"status": "failed", "last_error": f"Unknown email kind '{message['kind']}'", "finished_date": datetime.now(timezone.utc)}}
+                )
+                self.counters["failed"] += 1
+        rendered = await self.render([message for message in batch if message['kind'] in EMAIL_TEMPLATES])
+        await asyncio.gather(*(self._deliver(message) for message in rendered))
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                handled = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Email sender failed: {str(e)}")
+                handled = 0
+            if handled < EMAIL_BATCH_SIZE:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=EMAIL_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if self._sender is None:
+            self._wakeup = asyncio.Event()
+            self._sender = asyncio.create_task(self._run())
+            logging.info(f"Email sender started ({EMAIL_TRANSPORT} transport, {WORKER_ID})")
+
+    async def stop(self):
+        if self._sender is not None:
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+            self._sender = None
+
+    async def stats(self) -> Dict[str, Any]:
+        by_status = {}
+        async for row in self.collection.aggregate([
+            {"$match": {"status": {"$in": ["queued", "sending", "failed"]}}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]):
+            by_status[row['_id']] = row['count']
+        return {"worker_id": WORKER_ID, "transport": EMAIL_TRANSPORT, "outbox": by_status, **self.counters}
+
+email_outbox = EmailOutbox("email_outbox", create_email_transport())
+
+# ==================== Models ====================
+class ContactSubmission(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    email: EmailStr
+    subject: Optional[str] = None
+    message: str
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ContactSubmissionCreate(BaseModel):
+    name: str
+    email: EmailStr
+    subject: Optional[str] = None
+    message: str
+
+class ATSConfig(BaseModel):
+    """ATS Configuration for job evaluation"""
+    min_accuracy_threshold: int = 85  # Minimum accuracy to be selected (0-100)
+    skill_weight: float = 0.30  # Weight for skills matching (0-1)
+    experience_weight: float = 0.25  # Weight for experience matching (0-1)
+    education_weight: float = 0.20  # Weight for education matching (0-1)
+    qualification_weight: float = 0.15  # Weight for qualification matching (0-1)
+    overall_fit_weight: float = 0.10  # Weight for overall fit (0-1)
+    required_skills: List[str] = []  # Must-have skills
+    preferred_skills: List[str] = []  # Nice-to-have skills
+    min_experience_years: Optional[int] = None  # Minimum years of experience
+    required_education: Optional[str] = None  # Required education level
+    evaluation_criteria: Optional[str] = None  # Custom evaluation instructions
+    prescore_reject_below: Optional[float] = None  # Local score below which the LLM is skipped (default PRESCORE_REJECT_BELOW)
+    prescore_accept_above: Optional[float] = None  # Local score above which the LLM is skipped (default PRESCORE_ACCEPT_ABOVE)
+
+class JobPosting(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    department: str
+    location: str
+    type: str  # Full-time, Part-time, Contract, Internship
+    description: str
+    qualification: str  # Required qualifications
+    timings: str  # Work timings
+    requirements: List[str]
+    responsibilities: List[str]
+    ats_config: Optional[ATSConfig] = None  # ATS configuration
+    status: str = "active"  # active, closed
+    posted_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class JobPostingCreate(BaseModel):
+    title: str
+    department: str
+    location: str
+    type: str
+    description: str
+    qualification: str
+    timings: str
+    requirements: List[str]
+    responsibilities: List[str]
+    ats_config: Optional[ATSConfig] = None  # ATS configuration
+
+class JobApplication(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    job_id: str
+    job_title: str
+    name: str
+    email: EmailStr
+    phone: str
+    resume_text: str
+    resume_file: Optional[str] = None  # Legacy base64 file content (see migrate_resume_blobs)
+    resume_file_id: Optional[str] = None  # Blob id in resume_store
+    resume_sha256: Optional[str] = None  # Content hash, used as the download ETag
+    resume_filename: Optional[str] = None  # Original filename
+    resume_file_size: Optional[int] = None  # File size in bytes
+    resume_content_type: Optional[str] = None  # MIME type (application/pdf, etc.)
+    cover_letter: Optional[str] = None
+    ai_analysis: Optional[Dict[str, Any]] = None
+    status: str = "pending"  # pending, reviewing, shortlisted, rejected
+    status_source: Optional[str] = None  # "ats" when the analysis set the status, "admin" when set by hand
+    applied_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ApplicationSummary(BaseModel):
+    """List view of an application: no resume file, resume text or cover letter"""
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    job_id: str
+    job_title: str
+    name: str
+    email: str
+    phone: str
+    resume_filename: Optional[str] = None
+    resume_file_size: Optional[int] = None
+    resume_content_type: Optional[str] = None
+    ai_analysis: Optional[Dict[str, Any]] = None  # accuracy, raw_analysis and error only
+    status: str
+    status_source: Optional[str] = None
+    applied_date: datetime
+
+APPLICATION_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "job_id": 1,
+    "job_title": 1,
+    "name": 1,
+    "email": 1,
+    "phone": 1,
+    "resume_filename": 1,
+    "resume_file_size": 1,
+    "resume_content_type": 1,
+    "ai_analysis.accuracy": 1,
+    "ai_analysis.raw_analysis": 1,
+    "ai_analysis.error": 1,
+    "status": 1,
+    "status_source": 1,
+    "applied_date": 1
+}
+
+class BlogPost(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    slug: str
+    content: str
+    excerpt: Optional[str] = None
+    summary: Optional[str] = None  # AI-generated summary
+    author: str
+    tags: List[str] = []
+    featured_image: Optional[str] = None  # Media URL (/api/media/<sha256>)
+    images: List[str] = []  # Additional images in content (media URLs)
+    seo_description: Optional[str] = None
+    published: bool = False
+    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class BlogPostCreate(BaseModel):
+    title: str
+    content: str
+    author: str
+    tags: List[str] = []
+    featured_image: Optional[str] = None  # Base64/data URL or media URL; stored as a media URL
+    images: List[str] = []  # Additional images (base64/data URLs or media URLs)
+    published: bool = False
+
+class Testimonial(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    client_name: str
+    company: str
+    position: Optional[str] = None
+    content: str
+    rating: int = 5
+    avatar: Optional[str] = None
+    featured: bool = False
+    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class TestimonialCreate(BaseModel):
+    client_name: str
+    company: str
+    position: Optional[str] = None
+    content: str
+    rating: int = 5
+    avatar: Optional[str] = None
+
+class Project(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    description: str
+    technologies: List[str]
+    category: str
+    image: Optional[str] = None
+    client: Optional[str] = None
+    completion_date: Optional[str] = None
+    featured: bool = False
+    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ProjectCreate(BaseModel):
+    title: str
+    description: str
+    technologies: List[str]
+    category: str
+    image: Optional[str] = None
+    client: Optional[str] = None
+    completion_date: Optional[str] = None
+
+class CaseStudy(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    client: str
+    challenge: str
+    solution: str
+    results: str
+    ai_summary: Optional[str] = None
+    technologies: List[str]
+    image: Optional[str] = None
+    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class CaseStudyCreate(BaseModel):
+    title: str
+    client: str
+    challenge: str
+    solution: str
+    results: str
+    technologies: List[str]
+    image: Optional[str] = None
+
+class AdminUser(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    username: str
+    email: EmailStr
+    password_hash: str
+    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class AdminLogin(BaseModel):
+    username: str
+    password: str
+
+class ChatPin(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    question: str
+    answer: str
+    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ChatPinCreate(BaseModel):
+    question: str
+    answer: str
+
+class ChatMessage(BaseModel):
+    message: str
+
+class AIRequest(BaseModel):
+    prompt: str
+    context: Optional[str] = None
+
+# ==================== Local ATS Pre-Scoring ====================
+PRESCORE_ENABLED = env_flag('PRESCORE_ENABLED', True)
+PRESCORE_REJECT_BELOW = float(os.environ.get('PRESCORE_REJECT_BELOW', '35'))
+PRESCORE_ACCEPT_ABOVE = float(os.environ.get('PRESCORE_ACCEPT_ABOVE', '92'))
+PRESCORE_VOCABULARY_CACHE_SIZE = 256
+
+EDUCATION_LEVELS = [
+    (5, ("phd", "ph.d", "doctorate", "doctoral")),
+    (4, ("master", "masters", "m.tech", "mtech", "m.sc", "msc", "mba", "m.e", "mca", "postgraduate")),
+    (3, ("bachelor", "bachelors", "b.tech", "btech", "b.sc", "bsc", "b.e", "bca", "b.com", "undergraduate", "graduate", "degree")),
+    (2, ("diploma", "associate")),
+    (1, ("high school", "secondary", "12th", "hsc"))
+]
+EDUCATION_NAMES = {5: "Doctorate", 4: "Master's", 3: "Bachelor's", 2: "Diploma", 1: "High school", 0: "Not found"}
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or our the to we will with you your
+ability able experience years year strong good knowledge work working skills skill using etc
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+EXPERIENCE_PATTERN = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)", re.IGNORECASE)
+YEAR_SPAN_PATTERN = re.compile(r"\b((?:19|20)\d{2})\s*(?:-|–|to)\s*((?:19|20)\d{2}|present|current|now)\b", re.IGNORECASE)
+
+def tokenize(text: str) -> List[str]:
+    return [token.rstrip('.') for token in TOKEN_PATTERN.findall((text or '').lower())]
+
+def normalize_term(term: str) -> str:
+    return ' '.join(tokenize(term))
+
+def resume_terms(text: str) -> np.ndarray:
+    """Unique uni-, bi- and tri-grams of a resume, as a sorted array for vectorized membership tests"""
+    tokens = tokenize(text)
+    grams = set(tokens)
+    grams.update(' '.join(tokens[i:i + 2]) for i in range(len(tokens) - 1))
+    grams.update(' '.join(tokens[i:i + 3]) for i in range(len(tokens) - 2))
+    return np.array(sorted(grams), dtype=object)
+
+def keyword_terms(*texts: str) -> np.ndarray:
+    terms = {token for text in texts for token in tokenize(text) if len(token) > 2 and token not in STOPWORDS}
+    return np.array(sorted(terms), dtype=object)
+
+def education_level(text: str) -> int:
+    lowered = f" {(text or '').lower()} "
+    for level, names in EDUCATION_LEVELS:
+        if any(re.search(rf"(?<![a-z]){re.escape(name)}(?![a-z])", lowered) for name in names):
+            return level
+    return 0
+
+def experience_years(text: str) -> float:
+    """Largest explicit 'N years' mention or the span covered by year ranges, whichever is larger"""
+    explicit = [float(match) for match in EXPERIENCE_PATTERN.findall(text or '')]
+    current_year = datetime.now(timezone.utc).year
+    starts, ends = [], []
+    for start, end in YEAR_SPAN_PATTERN.findall(text or ''):
+        start_year = int(start)
+        end_year = current_year if not end.isdigit() else int(end)
+        if start_year <= end_year <= current_year:
+            starts.append(start_year)
+            ends.append(end_year)
+    span = float(max(ends) - min(starts)) if starts else 0.0
+    return max(explicit + [span]) if explicit or span else 0.0
+
+class JobVocabulary:
+    """Term arrays for one job posting and ATS configuration, compiled once and reused per applicant"""
+
+    def __init__(self, job_posting: Optional[Dict[str, Any]], ats_config: ATSConfig):
+        job_posting = job_posting or {}
+        # Without configured skills, only short requirement entries ("Python", "AWS Lambda")
+        # can be matched as terms; sentences never appear verbatim in a resume
+        self.skills_configured = bool(ats_config.required_skills)
+        required = ats_config.required_skills or [
+            requirement for requirement in job_posting.get('requirements', [])
+            if len(tokenize(requirement)) <= 3
+        ]
+        self.required_skills = [skill for skill in required if normalize_term(skill)]
+        self.preferred_skills = [skill for skill in ats_config.preferred_skills if normalize_term(skill)]
+        self.required = np.array([normalize_term(skill) for skill in self.required_skills], dtype=object)
+        self.preferred = np.array([normalize_term(skill) for skill in self.preferred_skills], dtype=object)
+        self.qualification = keyword_terms(job_posting.get('qualification', ''))
+        self.description = keyword_terms(
+            job_posting.get('description', ''),
+            ' '.join(job_posting.get('requirements', [])),
+            ' '.join(job_posting.get('responsibilities', []))
+        )
+        self.required_education = education_level(ats_config.required_education or job_posting.get('qualification', ''))
+        self.min_experience_years = ats_config.min_experience_years
+
+_vocabulary_cache: "OrderedDict[str, JobVocabulary]" = OrderedDict()
+
+def get_job_vocabulary(job_posting: Optional[Dict[str, Any]], ats_config: ATSConfig) -> JobVocabulary:
+    material = json.dumps([job_posting or {}, ats_config.model_dump()], sort_keys=True, default=str)
+    key = hashlib.sha1(material.encode('utf-8')).hexdigest()
+    vocabulary = _vocabulary_cache.get(key)
+    if vocabulary is None:
+        vocabulary = JobVocabulary(job_posting, ats_config)
+        _vocabulary_cache[key] = vocabulary
+        while len(_vocabulary_cache) > PRESCORE_VOCABULARY_CACHE_SIZE:
+            _vocabulary_cache.popitem(last=False)
+    else:
+        _vocabulary_cache.move_to_end(key)
+    return vocabulary
+
+def coverage(terms: np.ndarray, candidate_terms: np.ndarray) -> Tuple[float, np.ndarray]:
+    """Share of terms present in the resume (0-100) and the boolean match mask"""
+    if terms.size == 0:
+        return 100.0, np.zeros(0, dtype=bool)
+    mask = np.isin(terms, candidate_terms)
+    return float(mask.mean() * 100), mask
+
+def weighted_accuracy(scores: Dict[str, Any], ats_config: ATSConfig) -> float:
+    """Combine 0-100 sub-scores with the job's ATSConfig weights"""
+    skills = scores.get('skills_match')
+    if skills is None:
+        required = float(scores.get('required_skills_match') or 0)
+        preferred = scores.get('preferred_skills_match')
+        skills = required if preferred is None else 0.8 * required + 0.2 * float(preferred)
+    components = np.array([
+        float(skills),
+        float(scores.get('experience_match') or 0),
+        float(scores.get('education_match') or 0),
+        float(scores.get('qualification_match') or 0),
+        float(scores.get('overall_fit') or 0)
+    ])
+    weights = np.array([
+        ats_config.skill_weight,
+        ats_config.experience_weight,
+        ats_config.education_weight,
+        ats_config.qualification_weight,
+        ats_config.overall_fit_weight
+    ])
+    total_weight = weights.sum()
+    if total_weight <= 0:
+        return 0.0
+    return float(np.clip(components @ weights / total_weight, 0, 100))
+
+def prescore_resume(resume_text: str, job_posting: Optional[Dict[str, Any]], ats_config: ATSConfig) -> Dict[str, Any]:
+    """Deterministic ATS sub-scores computed locally with the same weights the LLM is asked to use"""
+    vocabulary = get_job_vocabulary(job_posting, ats_config)
+    terms = resume_terms(resume_text)
+    
+    required_match, required_mask = coverage(vocabulary.required, terms)
+    preferred_match, preferred_mask = coverage(vocabulary.preferred, terms)
+    skills_match = required_match if vocabulary.preferred.size == 0 else 0.8 * required_match + 0.2 * preferred_match
+    
+    years = experience_years(resume_text)
+    if vocabulary.min_experience_years:
+        experience_match = min(100.0, years / vocabulary.min_experience_years * 100)
+    else:
+        experience_match = min(100.0, 40.0 + 12.0 * years)
+    
+    level = education_level(resume_text)
+    if vocabulary.required_education:
+        education_match = 100.0 if level >= vocabulary.required_education else level / vocabulary.required_education * 100
+    else:
+        education_match = 100.0 if level else 50.0
+    
+    qualification_match, _ = coverage(vocabulary.qualification, terms)
+    description_match, _ = coverage(vocabulary.description, terms)
+    # Resumes rarely repeat most of a job description, so scale keyword overlap up before capping
+    overall_fit = min(100.0, description_match * 1.5)
+    
+    scores = {
+        "required_skills_match": round(required_match, 1),
+        "preferred_skills_match": round(preferred_match, 1),
+        "skills_match": round(skills_match, 1),
+        "experience_years": years,
+        "experience_match": round(experience_match, 1),
+        "education": EDUCATION_NAMES[level],
+        "education_match": round(education_match, 1),
+        "qualification_match": round(qualification_match, 1),
+        "overall_fit": round(overall_fit, 1),
+        "matched_skills": [skill for skill, hit in zip(vocabulary.required_skills + vocabulary.preferred_skills, np.concatenate([required_mask, preferred_mask])) if hit],
+        "missing_required_skills": [skill for skill, hit in zip(vocabulary.required_skills, required_mask) if not hit],
+        "skills_configured": vocabulary.skills_configured
+    }
+    scores["weighted_accuracy"] = round(weighted_accuracy(scores, ats_config), 1)
+    return scores
+
+def prescore_decision(scores: Dict[str, Any], ats_config: ATSConfig) -> Optional[str]:
+    """'selected' / 'rejected' when the local score is confidently outside the band, else None (ask the LLM)
+    
+    Jobs without configured required_skills always go to the LLM: their
+    skills score is only a guess from the free-text requirements.
+    """
+    if not PRESCORE_ENABLED or not scores.get('skills_configured'):
+        return None
+    reject_below = ats_config.prescore_reject_below if ats_config.prescore_reject_below is not None else PRESCORE_REJECT_BELOW
+    accept_above = ats_config.prescore_accept_above if ats_config.prescore_accept_above is not None else PRESCORE_ACCEPT_ABOVE
+    accuracy = scores['weighted_accuracy']
+    if accuracy < min(reject_below, ats_config.min_accuracy_threshold):
+        return "rejected"
+    if accuracy >= max(accept_above, ats_config.min_accuracy_threshold):
+        return "selected"
+    return None
+
+def describe_prescore(scores: Dict[str, Any]) -> str:
+    matched = len(scores['matched_skills'])
+    missing = scores['missing_required_skills']
+    summary = (
+        f"Local pre-screen: weighted accuracy {scores['weighted_accuracy']}%. "
+        f"Matched skills: {', '.join(scores['matched_skills']) if matched else 'none'}. "
+        f"Experience: {scores['experience_years']:g} years. Education: {scores['education']}."
+    )
+    if missing:
+        summary += f" Missing required skills: {', '.join(missing)}."
+    return summary
+
+# ==================== ATS Analysis Pipeline ====================
+def resolve_ats_config(job_posting: Optional[Dict[str, Any]]) -> ATSConfig:
+    """ATS configuration for a job posting, falling back to the defaults"""
+    ats_config_data = (job_posting or {}).get('ats_config')
+    if ats_config_data:
+        try:
+            return ATSConfig(**ats_config_data)
+        except Exception as e:
+            logging.warning(f"Error parsing ATS config: {str(e)}, using defaults")
+    return ATSConfig()
+
+def build_ats_prompt(job_title: str, job_posting: Optional[Dict[str, Any]], ats_config: ATSConfig, resume_text: str) -> str:
+    """Build the weighted ATS analysis prompt for a resume against a job posting"""
+    job_posting = job_posting or {}
+    job_requirements = ", ".join(job_posting.get('requirements', []))
+    job_qualification = job_posting.get('qualification', '')
+    job_description = job_posting.get('description', '')
+    
+    # Build ATS evaluation criteria
+    ats_criteria = f"""
+    ATS EVALUATION CRITERIA:
+    - Minimum Accuracy Threshold: {ats_config.min_accuracy_threshold}%
+    - Skill Weight: {ats_config.skill_weight * 100}%
+    - Experience Weight: {ats_config.experience_weight * 100}%
+    - Education Weight: {ats_config.education_weight * 100}%
+    - Qualification Weight: {ats_config.qualification_weight * 100}%
+    - Overall Fit Weight: {ats_config.overall_fit_weight * 100}%
+    - Required Skills (Must Have): {', '.join(ats_config.required_skills) if ats_config.required_skills else 'None specified'}
+    - Preferred Skills (Nice to Have): {', '.join(ats_config.preferred_skills) if ats_config.preferred_skills else 'None specified'}
+    - Minimum Experience Years: {ats_config.min_experience_years if ats_config.min_experience_years else 'Not specified'}
+    - Required Education: {ats_config.required_education if ats_config.required_education else 'Not specified'}
+    - Custom Evaluation Instructions: {ats_config.evaluation_criteria if ats_config.evaluation_criteria else 'Standard evaluation'}
+    """
+    
+    # Enhanced ATS Analysis with job-specific configuration
+    analysis_prompt = f"""You are a highly sophisticated ATS (Applicant Tracking System) analyzer. Analyze this resume against the job position using the specified evaluation criteria.
+    
+    JOB POSITION: {job_title}
+    JOB REQUIREMENTS: {job_requirements}
+    JOB QUALIFICATION: {job_qualification}
+    JOB DESCRIPTION: {job_description[:500]}
+    {ats_criteria}
+    
+    RESUME CONTENT: {resume_text[:2500]}
+    
+    Perform a comprehensive analysis and calculate a WEIGHTED ACCURACY PERCENTAGE (0-100) based on the specified weights:
+    
+    1. SKILLS MATCH ({ats_config.skill_weight * 100}% weight):
+       - Check if required skills are present: {', '.join(ats_config.required_skills) if ats_config.required_skills else 'All job requirements'}
+       - Check preferred skills: {', '.join(ats_config.preferred_skills) if ats_config.preferred_skills else 'None'}
+       - Calculate skills match percentage
+    
+    2. EXPERIENCE RELEVANCE ({ats_config.experience_weight * 100}% weight):
+       - Extract years of experience from resume
+       - Compare with minimum requirement: {ats_config.min_experience_years if ats_config.min_experience_years else 'Not specified'}
+       - Evaluate relevance of experience to job role
+    
+    3. EDUCATION MATCH ({ats_config.education_weight * 100}% weight):
+       - Check education level in resume
+       - Compare with required education: {ats_config.required_education if ats_config.required_education else 'Not specified'}
+       - Evaluate qualification match
+    
+    4. QUALIFICATION MATCH ({ats_config.qualification_weight * 100}% weight):
+       - Check if resume meets qualification requirements: {job_qualification[:200]}
+       - Evaluate qualification relevance
+    
+    5. OVERALL FIT ({ats_config.overall_fit_weight * 100}% weight):
+       - General fit for the position
+       - Cultural fit indicators
+       - Career progression alignment
+    
+    IMPORTANT: Calculate a WEIGHTED ACCURACY SCORE using the specified weights. The final accuracy must be between 0-100.
+    
+    Return ONLY a valid JSON object with these exact fields:
+    {{
+        "skills": ["skill1", "skill2", ...],
+        "required_skills_match": number (0-100),
+        "preferred_skills_match": number (0-100),
+        "experience_years": number,
+        "experience_match": number (0-100),
+        "education": "education level",
+        "education_match": number (0-100),
+        "qualification_match": number (0-100),
+        "overall_fit": number (0-100),
+        "weighted_accuracy": number (0-100),
+        "match_score": number (1-10),
+        "summary": "2-sentence summary",
+        "strengths": ["strength1", "strength2"],
+        "weaknesses": ["weakness1", "weakness2"],
+        "recommendation": "selected" or "rejected"
+    }}
+    
+    Calculate weighted_accuracy using the formula:
+    weighted_accuracy = (skills_match * {ats_config.skill_weight}) + 
+                        (experience_match * {ats_config.experience_weight}) + 
+                        (education_match * {ats_config.education_weight}) + 
+                        (qualification_match * {ats_config.qualification_weight}) + 
+                        (overall_fit * {ats_config.overall_fit_weight})
+    
+    If weighted_accuracy >= {ats_config.min_accuracy_threshold}, recommendation should be "selected", else "rejected".
+    Return ONLY the JSON, no other text."""
+    
+    return analysis_prompt
+
+ATS_MAX_TOKENS = 600
+
+# Documented output fields: name -> (kind, bounds). Scores are clamped to their bounds.
+ATS_SCHEMA: Dict[str, Tuple[str, Any]] = {
+    "skills": ("list", None),
+    "required_skills_match": ("number", (0, 100)),
+    "preferred_skills_match": ("number", (0, 100)),
+    "experience_years": ("number", (0, 60)),
+    "experience_match": ("number", (0, 100)),
+    "education": ("string", None),
+    "education_match": ("number", (0, 100)),
+    "qualification_match": ("number", (0, 100)),
+    "overall_fit": ("number", (0, 100)),
+    "weighted_accuracy": ("number", (0, 100)),
+    "match_score": ("number", (1, 10)),
+    "summary": ("string", None),
+    "strengths": ("list", None),
+    "weaknesses": ("list", None),
+    "recommendation": ("choice", ("selected", "rejected"))
+}
+# Sub-scores weighted_accuracy() and re-scoring depend on; anything else is optional
+ATS_REQUIRED_FIELDS = ["required_skills_match", "experience_match", "education_match", "qualification_match", "overall_fit"]
+
+class JSONObjectScanner:
+    """Find the end of the first top-level JSON object in streamed text
+    
+    Tracks brace depth outside of string literals so generation can be stopped
+    as soon as the object closes, without waiting for trailing prose.
+    """
+    def __init__(self):
+        self.chars: List[str] = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.complete = False
+    
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once the object is complete"""
+        for ch in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if ch != '{':
+                    continue
+                self.started = True
+            self.chars.append(ch)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+        return self.complete
+    
+    @property
+    def text(self) -> str:
+        return "".join(self.chars)
+
+def coerce_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.match(r'\s*(-?\d+(?:\.\d+)?)\s*%?\s*$', value)
+        if match:
+            return float(match.group(1))
+    return None
+
+def validate_ats_analysis(obj: Any) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Check a parsed ATS object against ATS_SCHEMA, coercing and clamping values
+    
+    Returns (analysis, errors); analysis is None when a required field is
+    missing or not numeric. Invalid optional fields are dropped.
+    """
+    if not isinstance(obj, dict):
+        return None, ["output is not a JSON object"]
+    analysis: Dict[str, Any] = {}
+    errors = []
+    for field, (kind, bounds) in ATS_SCHEMA.items():
+        if field not in obj or obj[field] is None:
+            if field in ATS_REQUIRED_FIELDS:
+                errors.append(f'"{field}" is missing')
+            continue
+        value = obj[field]
+        if kind == "number":
+            number = coerce_number(value)
+            if number is None:
+                if field in ATS_REQUIRED_FIELDS:
+                    errors.append(f'"{field}" must be a number')
+                continue
+            analysis[field] = float(min(max(number, bounds[0]), bounds[1]))
+        elif kind == "list":
+            if isinstance(value, str):
+                value = [value]
+            if isinstance(value, list):
+                analysis[field] = [str(item) for item in value if item is not None]
+        elif kind == "choice":
+            if str(value).strip().lower() in bounds:
+                analysis[field] = str(value).strip().lower()
+        else:
+            analysis[field] = str(value)
+    if errors:
+        return None, errors
+    return analysis, errors
+
+async def stream_json_object(prompt: str, max_tokens: int) -> Tuple[str, Optional[str]]:
+    """Stream a completion until its first JSON object closes
+    
+    Returns (raw_text, object_text); object_text is None when no complete
+    object was produced. Closing the token stream early cancels the rest of
+    the generation upstream.
+    """
+    scanner = JSONObjectScanner()
+    parts = []
+    tokens = stream_ai_tokens(prompt, max_tokens)
+    try:
+        async for token in tokens:
+            parts.append(token)
+            if scanner.feed(token):
+                break
+    finally:
+        await tokens.aclose()
+    return "".join(parts), (scanner.text if scanner.complete else None)
+
+def parse_ats_object(object_text: Optional[str]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    if object_text is None:
+        return None, ["no complete JSON object in the output"]
+    try:
+        obj = json.loads(object_text)
+    except json.JSONDecodeError as e:
+        return None, [f"invalid JSON: {e.msg}"]
+    return validate_ats_analysis(obj)
+
+def build_ats_repair_prompt(object_text: str, errors: List[str]) -> str:
+    fields = ", ".join(f'"{field}"' for field in ATS_SCHEMA)
+    return f"""The following ATS analysis JSON is invalid: {'; '.join(errors)}.
+    
+    {object_text[:2000]}
+    
+    Return ONLY the corrected JSON object with these fields: {fields}.
+    All *_match fields, overall_fit and weighted_accuracy are numbers from 0 to 100."""
+
+async def request_ats_analysis(prompt: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Run the ATS prompt and return (raw_output, validated analysis or None)
+    
+    Valid results are cached like generate_ai_content. Invalid output gets one
+    targeted retry: a repair prompt when a closed object failed validation, or
+    a re-run when no object was produced. Inference errors propagate so the
+    task queue can retry.
+    """
+    cache_key = None
+    if AI_CACHE_ENABLED:
+        cache_key = AIResponseCache.make_key(HF_MODEL, prompt, generation_parameters(ATS_MAX_TOKENS))
+        cached = await ai_cache.get(cache_key)
+        if cached is not None:
+            analysis, _ = parse_ats_object(cached)
+            if analysis:
+                return cached, analysis
+    
+    raw, object_text = await stream_json_object(prompt, ATS_MAX_TOKENS)
+    analysis, errors = parse_ats_object(object_text)
+    if analysis is None:
+        logging.warning(f"ATS output rejected ({'; '.join(errors)}), retrying once")
+        retry_prompt = build_ats_repair_prompt(object_text, errors) if object_text else prompt
+        raw, object_text = await stream_json_object(retry_prompt, ATS_MAX_TOKENS)
+        analysis, errors = parse_ats_object(object_text)
+        if analysis is None:
+            logging.warning(f"ATS output still invalid after retry: {'; '.join(errors)}")
+            return raw, None
+    
+    if cache_key:
+        await ai_cache.set(cache_key, object_text)
+    return raw, analysis
+
+async def analyze_application(payload: Dict[str, Any]):
+    """Task handler: run the ATS analysis for a stored application and record the outcome"""
+    app_id = payload['application_id']
+    application = await db.job_applications.find_one(
+        {"id": app_id},
+        {"_id": 0, "job_id": 1, "job_title": 1, "name": 1, "resume_text": 1}
+    )
+    if not application:
+        logging.warning(f"ATS analysis skipped, application {app_id} no longer exists")
+        return
+    
+    job_posting = await db.job_postings.find_one({"id": application['job_id']}, {"_id": 0})
+    ats_config = resolve_ats_config(job_posting)
+    resume_text = application['resume_text']
+    
+    local_scores = prescore_resume(resume_text, job_posting, ats_config)
+    decision = prescore_decision(local_scores, ats_config)
+    
+    if decision:
+        # Clear-cut case: skip the LLM entirely
+        accuracy = int(round(local_scores['weighted_accuracy']))
+        status = decision
+        summary = describe_prescore(local_scores)
+        ai_analysis = {
+            "raw_analysis": summary,
+            "resume_length": len(resume_text),
+            "accuracy": accuracy,
+            "parsed_analysis": summary,
+            "source": "local",
+            "scores": local_scores
+        }
+    else:
+        analysis_prompt = build_ats_prompt(application['job_title'], job_posting, ats_config, resume_text)
+        try:
+            ai_analysis_raw, ats_analysis = await request_ats_analysis(analysis_prompt)
+        except Exception as e:
+            raise RuntimeError(f"Inference backend unavailable: {str(e)}")
+        
+        if ats_analysis:
+            source = "llm"
+            scores = ats_analysis
+            accuracy_value = ats_analysis.get('weighted_accuracy')
+            if accuracy_value is None:
+                accuracy_value = weighted_accuracy(ats_analysis, ats_config)
+        else:
+            # Unusable model output even after the repair attempt: keep the local scores
+            source = "local_fallback"
+            scores = local_scores
+            accuracy_value = local_scores['weighted_accuracy']
+        accuracy = int(round(accuracy_value))
+        
+        # Auto-assign status based on ATS configuration threshold
+        status = "selected" if accuracy >= ats_config.min_accuracy_threshold else "rejected"
+        
+        ai_analysis = {
+            "raw_analysis": ai_analysis_raw,
+            "resume_length": len(resume_text),
+            "accuracy": accuracy,
+            "parsed_analysis": ai_analysis_raw,
+            "source": source,
+            "scores": scores,
+            "local_scores": local_scores
+        }
+    
+    # Only overwrite applications still waiting on analysis (an admin may have changed the status)
+    await db.job_applications.update_one(
+        {"id": app_id, "status": "pending_analysis"},
+        {"$set": {"ai_analysis": ai_analysis, "status": status, "status_source": "ats", "analyzed_date": datetime.now(timezone.utc)}}
+    )
+    logging.info(f"ATS analysis complete: ID={app_id}, accuracy={accuracy}%, status={status}, source={ai_analysis['source']}")
+
+async def mark_analysis_failed(payload: Dict[str, Any], error: str):
+    await db.job_applications.update_one(
+        {"id": payload['application_id'], "status": "pending_analysis"},
+        {"$set": {"status": "analysis_failed", "ai_analysis": {"error": error}}}
+    )
+
+task_queue.handler("ats_analysis", on_failure=mark_analysis_failed)(analyze_application)
+
+# ==================== ATS Re-scoring ====================
+RESCORE_CONCURRENCY = int(os.environ.get('RESCORE_CONCURRENCY', '4'))
+RESCORE_BATCH_SIZE = int(os.environ.get('RESCORE_BATCH_SIZE', '500'))
+AUTO_STATUSES = ["selected", "rejected"]
+# Only statuses the ATS assigned itself are re-scored; an admin's decision is never overwritten.
+# Applications analyzed before status_source existed never match: their status may have been
+# set by an admin, and nothing recorded which
+RESCORE_FILTER = {"status": {"$in": AUTO_STATUSES}, "status_source": "ats"}
+
+_rescore_tasks: Dict[str, asyncio.Task] = {}
+
+async def rescore_application(app: Dict[str, Any], job_posting: Dict[str, Any], ats_config: ATSConfig, semaphore: asyncio.Semaphore) -> Optional[UpdateOne]:
+    """Recompute one application's accuracy under a new ATSConfig
+    
+    Only applications matching RESCORE_FILTER get here, and those always
+    carry sub-scores (from the LLM or the local pre-scorer), so they only need
+    a new weighted sum. Sub-scores that turn out not to be numeric are
+    replaced by a local scoring of resume_text.
+    """
+    analysis = app.get('ai_analysis') or {}
+    scores = analysis.get('scores') or analysis.get('local_scores')
+    source = analysis.get('source', 'llm')
+    accuracy = None
+    if scores:
+        try:
+            accuracy = weighted_accuracy(scores, ats_config)
+        except (TypeError, ValueError):
+            logging.warning(f"Stored sub-scores for application {app['id']} are not numeric, scoring locally")
+    if accuracy is None:
+        async with semaphore:
+            full = await db.job_applications.find_one({"id": app['id']}, {"_id": 0, "resume_text": 1})
+            if not full or not full.get('resume_text'):
+                return None
+            scores = await asyncio.to_thread(prescore_resume, full['resume_text'], job_posting, ats_config)
+            accuracy = scores['weighted_accuracy']
+            source = "local"
+    
+    # The stored weighted_accuracy was computed with the old weights
+    scores = {**scores, "weighted_accuracy": round(accuracy, 1)}
+    accuracy = int(round(accuracy))
+    status = "selected" if accuracy >= ats_config.min_accuracy_threshold else "rejected"
+    return UpdateOne(
+        {"id": app['id'], **RESCORE_FILTER},
+        {"$set": {
+            "status": status,
+            "ai_analysis.accuracy": accuracy,
+            "ai_analysis.scores": scores,
+            "ai_analysis.source": source,
+            "ai_analysis.rescored_date": datetime.now(timezone.utc)
+        }}
+    )
+
+async def run_rescore(run_id: str, job_id: str):
+    runs = db.rescore_runs
+    started = time.monotonic()
+    try:
+        job_posting = await db.job_postings.find_one({"id": job_id}, {"_id": 0})
+        if not job_posting:
+            raise RuntimeError("Job not found")
+        ats_config = resolve_ats_config(job_posting)
+        query = {"job_id": job_id, **RESCORE_FILTER}
+        total = await db.job_applications.count_documents(query)
+        await runs.update_one({"id": run_id}, {"$set": {"total": total}})
+        
+        semaphore = asyncio.Semaphore(RESCORE_CONCURRENCY)
+        processed = 0
+        updated = 0
+        batch = []
+        
+        async def flush(batch):
+            nonlocal processed, updated
+            operations = [op for op in await asyncio.gather(
+                *(rescore_application(app, job_posting, ats_config, semaphore) for app in batch)
+            ) if op is not None]
+            if operations:
+                result = await db.job_applications.bulk_write(operations, ordered=False)
+                updated += result.modified_count
+            processed += len(batch)
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed > 0 else 0.0
+            await runs.update_one({"id": run_id}, {"$set": {
+                "processed": processed,
+                "updated": updated,
+                "rate_per_second": round(rate, 1),
+                "eta_seconds": round((total - processed) / rate, 1) if rate else None
+            }})
+        
+        projection = {"_id": 0, "id": 1, "ai_analysis.scores": 1, "ai_analysis.local_scores": 1, "ai_analysis.source": 1}
+        async for app in db.job_applications.find(query, projection):
+            batch.append(app)
+            if len(batch) >= RESCORE_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+        
+        await runs.update_one({"id": run_id}, {"$set": {
+            "status": "completed",
+            "eta_seconds": 0,
+            "finished_date": datetime.now(timezone.utc)
+        }})
+        logging.info(f"Re-scored job {job_id}: processed={processed}, updated={updated} in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        logging.error(f"Re-scoring job {job_id} failed: {str(e)}")
+        await runs.update_one({"id": run_id}, {"$set": {
+            "status": "failed",
+            "error": str(e),
+            "finished_date": datetime.now(timezone.utc)
+        }})
+    finally:
+        _rescore_tasks.pop(run_id, None)
+
+async def start_rescore(job_id: str) -> Dict[str, Any]:
+    """Start a background re-score of a job's applications, or return the run already in progress"""
+    for run_id, task in _rescore_tasks.items():
+        run = await db.rescore_runs.find_one({"id": run_id, "job_id": job_id}, {"_id": 0})
+        if run and not task.done():
+            return run
+    run = {
+        "id": str(uuid.uuid4()),
+        "job_id": job_id,
+        "status": "running",
+        "total": None,
+        "processed": 0,
+        "updated": 0,
+        "eta_seconds": None,
+        "started_date": datetime.now(timezone.utc)
+    }
+    await db.rescore_runs.insert_one(dict(run))
+    _rescore_tasks[run['id']] = asyncio.create_task(run_rescore(run['id'], job_id))
+    return run
+
+# ==================== Pagination ====================
+# The default matches the 1000-item cap lists had before pagination, so
+# clients that do not follow X-Next-Cursor see the same results as before
+PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', '1000'))
+PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', '1000'))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value: Any, doc_id: str) -> str:
+    """Opaque keyset cursor: the sort key and id of the last item on a page"""
+    if isinstance(sort_value, datetime):
+        sort_value = {"$date": sort_value.isoformat()}
+    raw = json.dumps({"v": sort_value, "id": doc_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        sort_value = data['v']
+        if isinstance(sort_value, dict) and '$date' in sort_value:
+            sort_value = datetime.fromisoformat(sort_value['$date'])
+        return sort_value, str(data['id'])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+async def paginate(
+    collection,
+    query: Dict[str, Any],
+    projection: Dict[str, Any],
+    sort_field: str,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Read one page (newest first) using keyset pagination on (sort_field, id)
+    
+    Documents are streamed from the Motor cursor, so memory stays bounded by the
+    page size. When more documents follow, the cursor for the next page is
+    returned in the X-Next-Cursor response header.
+    """
+    page_size = min(max(limit or PAGE_SIZE_DEFAULT, 1), PAGE_SIZE_MAX)
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        query = {"$and": [query, {"$or": [
+            {sort_field: {"$lt": last_value}},
+            {sort_field: last_value, "id": {"$lt": last_id}}
+        ]}]}
+    
+    items = []
+    has_more = False
+    mongo_cursor = collection.find(query, projection).sort([(sort_field, -1), ("id", -1)]).limit(page_size + 1)
+    async for doc in mongo_cursor:
+        if len(items) == page_size:
+            has_more = True
+            break
+        items.append(doc)
+    
+    if has_more:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.get(sort_field), last['id'])
+    return items
+
+# ==================== Serialization ====================
+@lru_cache(maxsize=None)
+def model_projection(model: type) -> Dict[str, int]:
+    """MongoDB projection returning exactly a response model's fields"""
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+def fast_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> ORJSONResponse:
+    """Serialize documents read from our own collections with orjson
+    
+    Skips response_model validation: the documents were validated on write and
+    projected with model_projection(). Headers already set on the injected
+    Response (next-page cursor, ETag) are carried over.
+    """
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"} if response else None
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+# ==================== Indexes ====================
+ENSURE_INDEXES_ON_STARTUP = env_flag('ENSURE_INDEXES_ON_STARTUP', True)
+
+def keyset_index(*prefix: Tuple[str, int], sort_field: str) -> IndexModel:
+    """Index that serves paginate() for an equality prefix followed by (sort_field, id)"""
+    keys = list(prefix) + [(sort_field, DESCENDING), ("id", DESCENDING)]
+    name = "_".join(f"{field}_{direction}" for field, direction in keys)
+    return IndexModel(keys, name=name)
+
+def unique_index(field: str) -> IndexModel:
+    return IndexModel([(field, ASCENDING)], unique=True, name=f"{field}_unique")
+
+# Every query the routes issue should be served by one of these indexes (see verify_query_plans)
+INDEX_MANIFEST: Dict[str, List[IndexModel]] = {
+    "contact_submissions": [
+        unique_index("id"),
+        keyset_index(sort_field="timestamp")
+    ],
+    "job_postings": [
+        unique_index("id"),
+        keyset_index(sort_field="posted_date"),
+        keyset_index(("status", ASCENDING), sort_field="posted_date")
+    ],
+    "job_applications": [
+        unique_index("id"),
+        keyset_index(sort_field="applied_date"),
+        keyset_index(("job_id", ASCENDING), sort_field="applied_date"),
+        keyset_index(("status", ASCENDING), sort_field="applied_date"),
+        keyset_index(("job_id", ASCENDING), ("status", ASCENDING), sort_field="applied_date"),
+        keyset_index(("email", ASCENDING), sort_field="applied_date")
+    ],
+    "blog_posts": [
+        unique_index("id"),
+        unique_index("slug"),
+        keyset_index(sort_field="created_date"),
+        keyset_index(("published", ASCENDING), sort_field="created_date")
+    ],
+    "testimonials": [
+        unique_index("id"),
+        keyset_index(sort_field="created_date"),
+        keyset_index(("featured", ASCENDING), sort_field="created_date")
+    ],
+    "projects": [
+        unique_index("id"),
+        keyset_index(sort_field="created_date"),
+        keyset_index(("category", ASCENDING), sort_field="created_date"),
+        keyset_index(("technologies", ASCENDING), sort_field="created_date")
+    ],
+    "case_studies": [
+        unique_index("id"),
+        keyset_index(sort_field="created_date")
+    ],
+    "resumes": [
+        unique_index("id"),
+        keyset_index(sort_field="created_at"),
+        keyset_index(("email", ASCENDING), sort_field="created_at")
+    ],
+    "admin_users": [
+        unique_index("username")
+    ],
+    "rescore_runs": [
+        unique_index("id"),
+        IndexModel([("job_id", ASCENDING)], name="job_id_1")
+    ],
+    "media": [
+        unique_index("sha256")
+    ],
+    "chat_pins": [
+        unique_index("id")
+    ],
+    "blog_slug_history": [
+        unique_index("slug"),
+        IndexModel([("post_id", ASCENDING)], name="post_id_1")
+    ],
+    "ai_cache": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl")
+    ],
+    "email_outbox": [
+        unique_index("id"),
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available_at"),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease_until"),
+        IndexModel([("finished_date", ASCENDING)], expireAfterSeconds=EMAIL_RETENTION_DAYS * 86400, name="finished_date_ttl")
+    ],
+    "task_queue": [
+        unique_index("id"),
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available_at"),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease_until"),
+        IndexModel([("payload.application_id", ASCENDING), ("kind", ASCENDING)], name="payload_application_id_kind"),
+        IndexModel([("finished_date", ASCENDING)], expireAfterSeconds=TASK_RETENTION_DAYS * 86400, name="finished_date_ttl")
+    ]
+}
+
+async def ensure_indexes() -> Dict[str, List[str]]:
+    """Create every index in INDEX_MANIFEST (idempotent); failures are logged per collection"""
+    created = {}
+    for collection_name, indexes in INDEX_MANIFEST.items():
+        try:
+            created[collection_name] = await db[collection_name].create_indexes(indexes)
+        except Exception as e:
+            # Typically a unique index over existing duplicates; the rest of the manifest still applies
+            logging.error(f"Could not create indexes on {collection_name}: {str(e)}")
+    return created
+
+def keyset_sort(field: str) -> List[Tuple[str, int]]:
+    return [(field, DESCENDING), ("id", DESCENDING)]
+
+# Representative query shapes for each route: (route, collection, filter, sort)
+QUERY_SHAPES: List[Tuple[str, str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("GET /contact", "contact_submissions", {}, keyset_sort("timestamp")),
+    ("GET /jobs", "job_postings", {}, keyset_sort("posted_date")),
+    ("GET /jobs?status", "job_postings", {"status": "active"}, keyset_sort("posted_date")),
+    ("GET /jobs/{job_id}", "job_postings", {"id": "x"}, None),
+    ("GET /applications", "job_applications", {}, keyset_sort("applied_date")),
+    ("GET /applications?job_id", "job_applications", {"job_id": "x"}, keyset_sort("applied_date")),
+    ("GET /applications?status", "job_applications", {"status": "selected"}, keyset_sort("applied_date")),
+    ("GET /applications?job_id&status", "job_applications", {"job_id": "x", "status": "selected"}, keyset_sort("applied_date")),
+    ("GET /applications/{app_id}", "job_applications", {"id": "x"}, None),
+    ("GET /applications/by-email/{email}", "job_applications", {"email": "a@b.c"}, keyset_sort("applied_date")),
+    ("GET /blog", "blog_posts", {}, keyset_sort("created_date")),
+    ("GET /blog?published", "blog_posts", {"published": True}, keyset_sort("created_date")),
+    ("GET /blog/{slug}", "blog_posts", {"slug": "x"}, None),
+    ("POST /blog (slug allocation)", "blog_posts", {"slug": {"$regex": "^x(-[0-9]+)?$"}}, None),
+    ("GET /blog/{slug} (renamed)", "blog_slug_history", {"slug": "x"}, None),
+    ("GET /testimonials?featured", "testimonials", {"featured": True}, keyset_sort("created_date")),
+    ("GET /projects?category", "projects", {"category": "x"}, keyset_sort("created_date")),
+    ("GET /projects/search?tech", "projects", {"technologies": {"$in": ["x"]}}, keyset_sort("created_date")),
+    ("GET /case-studies", "case_studies", {}, keyset_sort("created_date")),
+    ("GET /resumes?email", "resumes", {"email": "a@b.c"}, keyset_sort("created_at")),
+    ("GET /resumes/{resume_id}", "resumes", {"id": "x"}, None),
+    ("POST /admin/login", "admin_users", {"username": "x"}, None),
+    ("task queue claim", "task_queue", {"$or": [
+        {"status": "queued", "available_at": {"$lte": datetime(2000, 1, 1, tzinfo=timezone.utc)}},
+        {"status": "running", "lease_until": {"$lt": datetime(2000, 1, 1, tzinfo=timezone.utc)}}
+    ]}, [("available_at", ASCENDING)]),
+    ("email outbox claim", "email_outbox", {"$or": [
+        {"status": "queued", "available_at": {"$lte": datetime(2000, 1, 1, tzinfo=timezone.utc)}},
+        {"status": "sending", "lease_until": {"$lt": datetime(2000, 1, 1, tzinfo=timezone.utc)}}
+    ]}, [("available_at", ASCENDING)]),
+    ("GET /applications/{app_id}/status", "task_queue", {"payload.application_id": "x", "kind": "ats_analysis"}, None)
+]
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the stage names of an explain() winning plan"""
+    stages = [plan['stage']] if 'stage' in plan else []
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        stages += _plan_stages(child)
+    return stages
+
+async def verify_query_plans() -> List[Dict[str, Any]]:
+    """Explain each route's query shape and flag collection scans and in-memory sorts"""
+    report = []
+    for route, collection_name, query, sort in QUERY_SHAPES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explain = await cursor.explain()
+            stages = _plan_stages(explain['queryPlanner']['winningPlan'])
+        except Exception as e:
+            report.append({"route": route, "collection": collection_name, "error": str(e), "ok": False})
+            continue
+        report.append({
+            "route": route,
+            "collection": collection_name,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+            "ok": "COLLSCAN" not in stages
+        })
+    return report
+
+# ==================== Conditional GET ====================
+PUBLIC_CACHE_CONTROL = os.environ.get('PUBLIC_CACHE_CONTROL', 'public, no-cache')
+COLLECTION_VERSION_REFRESH_SECONDS = float(os.environ.get('COLLECTION_VERSION_REFRESH_SECONDS', '1'))
+
+class CollectionVersions:
+    """Monotonic per-collection version counters, bumped by every write route
+    
+    Versions live in MongoDB so all workers agree; each process keeps a copy
+    refreshed at most every COLLECTION_VERSION_REFRESH_SECONDS, so validating
+    an ETag usually needs no database round trip. A write in another process
+    becomes visible here within that interval.
+    """
+
+    def __init__(self, collection_name: str, refresh_seconds: float):
+        self.collection_name = collection_name
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[str, Tuple[int, datetime]] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self):
+        async with self._lock:
+            if time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            versions = {}
+            async for doc in db[self.collection_name].find({}):
+                updated = doc['updated_date']
+                # Normalise to datetime.timezone.utc (tz-aware reads carry bson's own UTC tzinfo)
+                updated = updated.replace(tzinfo=timezone.utc) if updated.tzinfo is None else updated.astimezone(timezone.utc)
+                versions[doc['_id']] = (doc['version'], updated)
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+
+    async def get(self, name: str) -> Tuple[int, datetime]:
+        if time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            await self._refresh()
+        return self._versions.get(name, (0, SERVER_STARTED))
+
+    async def bump(self, *names: str):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        for name in names:
+            doc = await db[self.collection_name].find_one_and_update(
+                {"_id": name},
+                {"$inc": {"version": 1}, "$set": {"updated_date": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self._versions[name] = (doc['version'], now)
+
+SERVER_STARTED = datetime.now(timezone.utc).replace(microsecond=0)
+collection_versions = CollectionVersions("collection_versions", COLLECTION_VERSION_REFRESH_SECONDS)
+
+async def conditional_get(request: Request, response: Response, *collections: str) -> Optional[Response]:
+    """Set ETag/Last-Modified/Cache-Control for a read of `collections`
+    
+    Returns a 304 response when the client's validators still match, before
+    the route queries anything. Call it before reading so a concurrent write
+    can only make the ETag older than the body, never newer.
+    """
+    versions = [await collection_versions.get(name) for name in collections]
+    material = f"{request.url.path}?{sorted(request.query_params.multi_items())}|{[version for version, _ in versions]}"
+    etag = f'W/"{hashlib.sha1(material.encode()).hexdigest()[:20]}"'
+    last_modified = max(updated for _, updated in versions)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": PUBLIC_CACHE_CONTROL
+    }
+    
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get('if-modified-since'):
+        try:
+            since = parsedate_to_datetime(request.headers['if-modified-since'])
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            if last_modified <= since:
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+    response.headers.update(headers)
+    return None
+
+# ==================== Catalog Cache ====================
+CATALOG_CACHE_ENABLED = env_flag('CATALOG_CACHE_ENABLED', True)
+CATALOG_CACHE_TTL_SECONDS = float(os.environ.get('CATALOG_CACHE_TTL_SECONDS', '300'))
+CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', '1024'))
+CATALOG_CACHE_CHANGE_STREAMS = env_flag('CATALOG_CACHE_CHANGE_STREAMS', False)
+CATALOG_COLLECTIONS = ("job_postings", "projects", "testimonials", "case_studies", "blog_posts")
+
+class CatalogCache(Generic[T]):
+    """Read-through cache for the rarely written catalog collections
+
+    Entries are keyed by (collection, key) - a document key or a normalised
+    query - and remember the collection version they were loaded under. A
+    write bumps that version, so every worker drops the entry once its
+    CollectionVersions copy refreshes; invalidate() drops it locally at once.
+    TTL and an LRU bound keep memory in check either way.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], float, T]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def _stamp(self, collection: str) -> Tuple[int, int]:
+        version, _ = await collection_versions.get(collection)
+        return version, self._generations.get(collection, 0)
+
+    async def get_or_load(self, collection: str, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        # Stamp before loading: a write landing mid-load makes the entry stale, not wrong
+        stamp = await self._stamp(collection)
+        entry = self._entries.get((collection, key))
+        if entry is not None:
+            entry_stamp, expires_at, value = entry
+            if entry_stamp == stamp and expires_at > time.monotonic():
+                self._entries.move_to_end((collection, key))
+                self.hits += 1
+                return value
+            self.expired += 1
+            del self._entries[(collection, key)]
+        self.misses += 1
+        value = await loader()
+        self._entries[(collection, key)] = (stamp, time.monotonic() + self.ttl_seconds, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def invalidate(self, *collections: str):
+        for collection in collections:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            for key in [key for key in self._entries if key[0] == collection]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        self.invalidate(*{collection for collection, _ in self._entries})
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        by_collection: Dict[str, int] = {}
+        for collection, _ in self._entries:
+            by_collection[collection] = by_collection.get(collection, 0) + 1
+        return {
+            "enabled": CATALOG_CACHE_ENABLED,
+            "worker_id": WORKER_ID,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "entries_by_collection": by_collection,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "change_stream": catalog_watcher is not None and not catalog_watcher.done()
+        }
+
+CachedBody = Tuple[bytes, Optional[str]]
+catalog_cache: CatalogCache[CachedBody] = CatalogCache(CATALOG_CACHE_MAX_ENTRIES, CATALOG_CACHE_TTL_SECONDS)
+catalog_watcher: Optional[asyncio.Task] = None
+
+async def catalog_changed(*collections: str):
+    """Record a write to catalog collections: bump their versions (seen by
+    other workers on their next refresh) and drop this worker's entries"""
+    await collection_versions.bump(*collections)
+    catalog_cache.invalidate(*collections)
+
+async def cached_json(request: Request, response: Response, collection: str, loader: Callable[[Response], Awaitable[Any]]) -> Response:
+    """Serve a catalog read through catalog_cache
+
+    `loader` receives a scratch Response for paginate() to set the next-page
+    cursor on; the encoded body and cursor are cached per path and query
+    string. HTTPExceptions raised by the loader (404s) are not cached.
+    """
+    async def load() -> CachedBody:
+        page = Response()
+        body = fast_json(await loader(page)).body
+        return body, page.headers.get(NEXT_CURSOR_HEADER)
+
+    if CATALOG_CACHE_ENABLED:
+        key = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+        body, next_cursor = await catalog_cache.get_or_load(collection, key, load)
+    else:
+        body, next_cursor = await load()
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(body, media_type="application/json", headers=headers)
+
+async def watch_catalog_changes():
+    """Invalidate catalog entries from a MongoDB change stream
+
+    Catches writes that bypass the API (shell, scripts, other services).
+    Change streams need a replica set; on a standalone server this logs once
+    and exits, leaving version refresh and TTL to bound staleness.
+    """
+    pipeline = [{"$match": {"ns.coll": {"$in": list(CATALOG_COLLECTIONS)}}}]
+    while True:
+        try:
+            async with db.watch(pipeline) as stream:
+                logging.info("Catalog cache is following the change stream")
+                async for change in stream:
+                    catalog_cache.invalidate(change['ns']['coll'])
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            logging.warning(f"Catalog change stream unavailable, relying on version refresh: {str(e)}")
+            return
+        except Exception as e:
+            logging.error(f"Catalog change stream failed, reconnecting: {str(e)}")
+            # Anything may have changed while disconnected
+            catalog_cache.invalidate(*CATALOG_COLLECTIONS)
+            await asyncio.sleep(5)
+
+# ==================== Search ====================
+SEARCH_PAGE_SIZE_DEFAULT = int(os.environ.get('SEARCH_PAGE_SIZE_DEFAULT', '10'))
+SEARCH_PAGE_SIZE_MAX = int(os.environ.get('SEARCH_PAGE_SIZE_MAX', '50'))
+SEARCH_BM25_K1 = float(os.environ.get('SEARCH_BM25_K1', '1.2'))
+SEARCH_BM25_B = float(os.environ.get('SEARCH_BM25_B', '0.75'))
+SEARCH_PREFIX_EXPANSIONS = int(os.environ.get('SEARCH_PREFIX_EXPANSIONS', '30'))
+SEARCH_SNIPPET_CHARS = int(os.environ.get('SEARCH_SNIPPET_CHARS', '180'))
+
+# Searchable types: source collection, which documents are public, field weights
+# (the first field is the title) and the fields returned with each hit
+SEARCH_SOURCES: Dict[str, Dict[str, Any]] = {
+    "blog": {
+        "collection": "blog_posts",
+        "filter": {"published": True},
+        "fields": {"title": 3.0, "tags": 2.0, "excerpt": 1.5, "seo_description": 1.0, "content": 1.0},
+        "display": ["id", "slug", "title", "excerpt", "featured_image", "created_date"],
+        "date": "created_date"
+    },
+    "project": {
+        "collection": "projects",
+        "filter": {},
+        "fields": {"title": 3.0, "technologies": 2.0, "category": 2.0, "client": 1.5, "description": 1.0},
+        "display": ["id", "title", "category", "technologies", "image", "created_date"],
+        "date": "created_date"
+    },
+    "case_study": {
+        "collection": "case_studies",
+        "filter": {},
+        "fields": {"title": 3.0, "client": 2.0, "technologies": 2.0, "challenge": 1.0, "solution": 1.0, "results": 1.0},
+        "display": ["id", "title", "client", "technologies", "image", "created_date"],
+        "date": "created_date"
+    },
+    "job": {
+        "collection": "job_postings",
+        "filter": {"status": "active"},
+        "fields": {
+            "title": 3.0, "department": 2.0, "location": 1.5, "type": 1.0, "description": 1.0,
+            "qualification": 1.0, "requirements": 1.0, "responsibilities": 1.0
+        },
+        "display": ["id", "title", "department", "location", "type", "posted_date"],
+        "date": "posted_date"
+    }
+}
+SEARCH_COLLECTIONS = tuple(spec['collection'] for spec in SEARCH_SOURCES.values())
+SEARCH_STOPWORDS = frozenset("a an and are as at be by for from has in is it of on or that the to was were will with".split())
+SEARCH_TOKEN_RE = re.compile(r"[^\W_]+")
+SEARCH_MARKUP_RE = re.compile(r"<[^>]+>")
+
+def search_terms(text: str) -> List[str]:
+    return [term for term in SEARCH_TOKEN_RE.findall(text.casefold()) if term not in SEARCH_STOPWORDS]
+
+def search_field_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        value = " ".join(str(item) for item in value)
+    return " ".join(SEARCH_MARKUP_RE.sub(" ", str(value)).split())
+
+class SearchSource:
+    """Inverted index over the public documents of one search type
+
+    Postings map a term to {document number: field-weighted term frequency};
+    the sorted term list serves prefix expansion by bisection.
+    """
+
+    def __init__(self, kind: str, docs: List[Dict[str, Any]]):
+        spec = SEARCH_SOURCES[kind]
+        self.kind = kind
+        self.docs: List[Dict[str, Any]] = []
+        self.texts: List[Dict[str, str]] = []
+        self.lengths: List[float] = []
+        self.postings: Dict[str, Dict[int, float]] = {}
+        for doc in docs:
+            number = len(self.docs)
+            texts = {field: search_field_text(doc.get(field)) for field in spec['fields']}
+            frequencies: Dict[str, float] = {}
+            length = 0.0
+            for field, weight in spec['fields'].items():
+                terms = search_terms(texts[field])
+                length += weight * len(terms)
+                for term in terms:
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+            for term, frequency in frequencies.items():
+                self.postings.setdefault(term, {})[number] = frequency
+            self.docs.append({field: doc.get(field) for field in spec['display']})
+            self.texts.append(texts)
+            self.lengths.append(length)
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 1.0
+        self.terms = sorted(self.postings)
+
+    def completions(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + "\U0010ffff")
+        return self.terms[start:end]
+
+    def score(self, term: str, idf: float) -> Dict[int, float]:
+        scores = {}
+        for number, frequency in self.postings.get(term, {}).items():
+            norm = 1 - SEARCH_BM25_B + SEARCH_BM25_B * self.lengths[number] / (self.avg_length or 1.0)
+            scores[number] = idf * frequency * (SEARCH_BM25_K1 + 1) / (frequency + SEARCH_BM25_K1 * norm)
+        return scores
+
+def highlight_text(text: str, matches: Callable[[str], bool]) -> str:
+    """HTML-escape `text`, wrapping query matches in <mark>"""
+    parts = []
+    last = 0
+    for match in SEARCH_TOKEN_RE.finditer(text):
+        if matches(match.group().casefold()):
+            parts.append(html.escape(text[last:match.start()]))
+            parts.append(f"<mark>{html.escape(match.group())}</mark>")
+            last = match.end()
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
+
+def best_snippet(texts: Dict[str, str], fields: List[str], matches: Callable[[str], bool]) -> str:
+    """The SEARCH_SNIPPET_CHARS window holding the most query matches"""
+    best = (0, "", 0)
+    for field in fields:
+        text = texts[field]
+        positions = [m.start() for m in SEARCH_TOKEN_RE.finditer(text) if matches(m.group().casefold())]
+        for i, position in enumerate(positions):
+            count = bisect.bisect_left(positions, position + SEARCH_SNIPPET_CHARS, lo=i) - i
+            if count > best[0]:
+                best = (count, text, position)
+        if not best[1] and text:
+            best = (0, text, 0)
+    _, text, position = best
+    start = max(0, position - SEARCH_SNIPPET_CHARS // 4)
+    if start:
+        space = text.rfind(" ", 0, start + 1)
+        start = space + 1 if space >= 0 else start
+    end = min(len(text), start + SEARCH_SNIPPET_CHARS)
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        end = space if space > start else end
+    snippet = highlight_text(text[start:end], matches)
+    return ("…" if start else "") + snippet + ("…" if end < len(text) else "")
+
+class SearchIndex:
+    """BM25 search over blog posts, projects, case studies and active jobs
+
+    Each type is indexed separately and rebuilt when its collection version
+    changes, so a write re-indexes only that type, on the next search, in
+    every worker. Scores use corpus-wide document frequencies so types are
+    ranked against each other. With `prefix`, the last query word also
+    matches indexed terms it begins (typeahead).
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, SearchSource] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self.rebuilds = 0
+
+    async def refresh(self):
+        for kind, spec in SEARCH_SOURCES.items():
+            version, _ = await collection_versions.get(spec['collection'])
+            if self._versions.get(kind) == version:
+                continue
+            async with self._lock:
+                # Stamp before reading: a write during the rebuild triggers another one
+                version, _ = await collection_versions.get(spec['collection'])
+                if self._versions.get(kind) == version:
+                    continue
+                projection = {"_id": 0, **{field: 1 for field in [*spec['fields'], *spec['display']]}}
+                docs = await db[spec['collection']].find(spec['filter'], projection).to_list(None)
+                self._sources[kind] = await asyncio.to_thread(SearchSource, kind, docs)
+                self._versions[kind] = version
+                self.rebuilds += 1
+
+    def search(self, query: str, kind: Optional[str], limit: int, offset: int, prefix: bool = True) -> Dict[str, Any]:
+        started = time.perf_counter()
+        sources = list(self._sources.values())
+        terms = list(dict.fromkeys(search_terms(query)))
+        partial = None
+        if prefix and terms and SEARCH_TOKEN_RE.match(query[-1:]):
+            partial = terms.pop()
+
+        total_docs = sum(len(source.docs) for source in sources) or 1
+        def idf(term: str) -> float:
+            df = sum(len(source.postings.get(term, ())) for source in sources)
+            return math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+
+        completions: List[str] = []
+        if partial:
+            candidates = {term for source in sources for term in source.completions(partial)}
+            completions = sorted(candidates, key=lambda term: -sum(len(s.postings.get(term, ())) for s in sources))[:SEARCH_PREFIX_EXPANSIONS]
+        exact = set(terms)
+        def matches(token: str) -> bool:
+            return token in exact or (partial is not None and token.startswith(partial))
+
+        hits = []
+        facets = {name: 0 for name in SEARCH_SOURCES}
+        for source in sources:
+            scores: Dict[int, float] = {}
+            for term in terms:
+                for number, score in source.score(term, idf(term)).items():
+                    scores[number] = scores.get(number, 0.0) + score
+            # A partial word counts once, by its best completion in each document
+            best_completion: Dict[int, float] = {}
+            for term in completions:
+                for number, score in source.score(term, idf(term)).items():
+                    best_completion[number] = max(best_completion.get(number, 0.0), score)
+            for number, score in best_completion.items():
+                scores[number] = scores.get(number, 0.0) + score
+            facets[source.kind] = len(scores)
+            if kind is None or kind == source.kind:
+                date_field = SEARCH_SOURCES[source.kind]['date']
+                hits.extend((score, source.docs[number].get(date_field), source, number) for number, score in scores.items())
+
+        minimum_date = datetime.min.replace(tzinfo=timezone.utc)
+        hits.sort(key=lambda hit: (hit[0], hit[1] or minimum_date), reverse=True)
+        results = []
+        for score, _, source, number in hits[offset:offset + limit]:
+            fields = list(SEARCH_SOURCES[source.kind]['fields'])
+            texts = source.texts[number]
+            results.append({
+                "type": source.kind,
+                "score": round(score, 4),
+                "document": source.docs[number],
+                "title_highlight": highlight_text(texts[fields[0]], matches),
+                "snippet": best_snippet(texts, fields[1:], matches)
+            })
+        return {
+            "query": query,
+            "total": len(hits),
+            "offset": offset,
+            "limit": limit,
+            "next_offset": offset + limit if offset + limit < len(hits) else None,
+            "facets": facets,
+            "results": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": WORKER_ID,
+            "rebuilds": self.rebuilds,
+            "types": {
+                kind: {"documents": len(source.docs), "terms": len(source.terms), "version": self._versions.get(kind)}
+                for kind, source in self._sources.items()
+            }
+        }
+
+search_index = SearchIndex()
+
+# ==================== Blog Slugs ====================
+SLUG_ALLOCATION_ATTEMPTS = int(os.environ.get('SLUG_ALLOCATION_ATTEMPTS', '5'))
+
+def slugify(title: str) -> str:
+    """URL slug for a blog title: lowercase, hyphens for spaces and slashes"""
+    slug = title.lower().replace(' ', '-').replace('/', '-')
+    return re.sub(r'[^a-z0-9-]', '', slug) or "post"
+
+async def free_slug(base: str) -> str:
+    """`base`, or `base-N` with the smallest free N
+
+    One anchored regex query, served by the unique slug index, returns every
+    slug in the family instead of probing `base-1`, `base-2`, ... in turn.
+    """
+    taken = set()
+    async for doc in db.blog_posts.find({"slug": {"$regex": f"^{re.escape(base)}(-[0-9]+)?$"}}, {"_id": 0, "slug": 1}):
+        taken.add(doc['slug'])
+    if base not in taken:
+        return base
+    counter = 1
+    while f"{base}-{counter}" in taken:
+        counter += 1
+    return f"{base}-{counter}"
+
+async def write_with_free_slug(base: str, write: Callable[[str], Awaitable[Any]]) -> str:
+    """Call `write(slug)` with a free slug derived from `base`
+
+    The unique slug index arbitrates concurrent writers: whoever loses gets a
+    DuplicateKeyError and allocates again.
+    """
+    for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+        slug = await free_slug(base)
+        try:
+            await write(slug)
+            return slug
+        except DuplicateKeyError as e:
+            if 'slug' not in str(e):
+                raise
+            logging.info(f"Slug {slug} was taken concurrently, allocating again")
+    raise HTTPException(status_code=409, detail="Could not allocate a unique slug, please retry")
+
+async def record_slug_change(post_id: str, old_slug: str, new_slug: str):
+    """Remember that `old_slug` now lives at `new_slug` so old links redirect"""
+    await db.blog_slug_history.update_many({"post_id": post_id}, {"$set": {"current_slug": new_slug}})
+    await db.blog_slug_history.update_one(
+        {"slug": old_slug},
+        {"$set": {"post_id": post_id, "current_slug": new_slug, "renamed_date": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    await forget_slug(new_slug)
+
+async def forget_slug(slug: str):
+    """Drop the redirect for a slug that a live post now owns"""
+    await db.blog_slug_history.delete_many({"slug": slug})
+
+async def moved_slug(slug: str) -> Optional[str]:
+    entry = await db.blog_slug_history.find_one({"slug": slug}, {"_id": 0, "current_slug": 1})
+    return entry['current_slug'] if entry else None
+
+# ==================== Admin Auth ====================
+BCRYPT_THREADS = int(os.environ.get('BCRYPT_THREADS', '2'))
+BCRYPT_MAX_WAITING = int(os.environ.get('BCRYPT_MAX_WAITING', '16'))
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+LOGIN_WINDOW_SECONDS = float(os.environ.get('LOGIN_WINDOW_SECONDS', '900'))
+LOGIN_MAX_FAILURES_PER_USER = int(os.environ.get('LOGIN_MAX_FAILURES_PER_USER', '5'))
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_IP', '30'))
+ADMIN_TOKEN_TTL_SECONDS = int(os.environ.get('ADMIN_TOKEN_TTL_SECONDS', str(12 * 3600)))
+ADMIN_TOKEN_ALGORITHM = "HS256"
+ADMIN_JWT_SECRET = os.environ.get('ADMIN_JWT_SECRET')
+if not ADMIN_JWT_SECRET:
+    # Tokens then only verify in this process and die with it; set the secret for multiple workers
+    ADMIN_JWT_SECRET = secrets.token_urlsafe(32)
+    logging.warning("ADMIN_JWT_SECRET is not set; admin sessions will not survive a restart or span workers")
+
+class PasswordHasher:
+    """bcrypt on a small dedicated thread pool
+
+    bcrypt releases the GIL, so hashing off the event loop keeps other
+    requests flowing. At most BCRYPT_THREADS hashes run at once; beyond
+    BCRYPT_MAX_WAITING queued callers are turned away with 503 rather than
+    letting a login burst pile up work.
+    """
+
+    def __init__(self, threads: int, max_waiting: int, rounds: int):
+        self.threads = threads
+        self.max_waiting = max_waiting
+        self.rounds = rounds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="bcrypt")
+            self._slots = asyncio.Semaphore(self.threads)
+        if self.waiting >= self.max_waiting:
+            raise HTTPException(status_code=503, detail="Too many password checks in progress, please retry", headers={"Retry-After": "1"})
+        self.waiting += 1
+        try:
+            async with self._slots:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.waiting -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)))
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+class LoginRateLimiter:
+    """Sliding-window limits on login attempts, per process
+
+    Failed attempts are counted per username and all attempts per client
+    address; either limit being reached answers 429 before any bcrypt work.
+    """
+
+    def __init__(self, window_seconds: float, max_failures_per_user: int, max_attempts_per_ip: int):
+        self.window_seconds = window_seconds
+        self.max_failures_per_user = max_failures_per_user
+        self.max_attempts_per_ip = max_attempts_per_ip
+        self._events: Dict[str, deque] = {}
+        self.rejected = 0
+
+    def _recent(self, key: str, now: float) -> deque:
+        events = self._events.setdefault(key, deque())
+        while events and events[0] <= now - self.window_seconds:
+            events.popleft()
+        return events
+
+    def check(self, username: str, address: str):
+        now = time.monotonic()
+        if len(self._events) > 10000:
+            self._events = {key: events for key, events in self._events.items() if events and events[-1] > now - self.window_seconds}
+        user_failures = self._recent(f"user:{username.lower()}", now)
+        ip_attempts = self._recent(f"ip:{address}", now)
+        blocked = [events for events, limit in ((user_failures, self.max_failures_per_user), (ip_attempts, self.max_attempts_per_ip)) if len(events) >= limit]
+        if blocked:
+            self.rejected += 1
+            retry_after = max(1, int(max(events[0] for events in blocked) + self.window_seconds - now) + 1)
+            raise HTTPException(status_code=429, detail="Too many login attempts, please try again later", headers={"Retry-After": str(retry_after)})
+        ip_attempts.append(now)
+
+    def failed(self, username: str):
+        self._recent(f"user:{username.lower()}", time.monotonic()).append(time.monotonic())
+
+    def succeeded(self, username: str):
+        self._events.pop(f"user:{username.lower()}", None)
+
+password_hasher = PasswordHasher(BCRYPT_THREADS, BCRYPT_MAX_WAITING, BCRYPT_ROUNDS)
+login_limiter = LoginRateLimiter(LOGIN_WINDOW_SECONDS, LOGIN_MAX_FAILURES_PER_USER, LOGIN_MAX_ATTEMPTS_PER_IP)
+admin_bearer = HTTPBearer(auto_error=False)
+
+def create_admin_token(admin: Dict[str, Any]) -> Tuple[str, datetime]:
+    """Signed session token; verifying it is one HMAC, no database or bcrypt"""
+    issued = datetime.now(timezone.utc)
+    expires = issued + timedelta(seconds=ADMIN_TOKEN_TTL_SECONDS)
+    claims = {"sub": admin['id'], "username": admin['username'], "iat": issued, "exp": expires}
+    return jwt.encode(claims, ADMIN_JWT_SECRET, algorithm=ADMIN_TOKEN_ALGORITHM), expires
+
+async def require_admin(credentials: Optional[HTTPAuthorizationCredentials] = Depends(admin_bearer)) -> Dict[str, Any]:
+    """Dependency for admin routes: the claims of a valid Bearer session token"""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Admin login required", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return jwt.decode(credentials.credentials, ADMIN_JWT_SECRET, algorithms=[ADMIN_TOKEN_ALGORITHM], options={"require": ["exp", "sub"]})
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Admin session expired", headers={"WWW-Authenticate": "Bearer"})
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid admin session", headers={"WWW-Authenticate": "Bearer"})
+
+ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME')
+ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD')
+
+async def ensure_bootstrap_admin():
+    """Create the ADMIN_USERNAME account if it does not exist yet
+    
+    Registration requires an admin session, so this is how the first admin
+    is created. ADMIN_PASSWORD may be a plain password or a bcrypt hash; an
+    existing account's password is never changed.
+    """
+    if not ADMIN_USERNAME or not ADMIN_PASSWORD:
+        return
+    if await db.admin_users.find_one({"username": ADMIN_USERNAME}, {"_id": 1}):
+        return
+    is_hash = ADMIN_PASSWORD.startswith(("$2a$", "$2b$", "$2y$"))
+    admin = AdminUser(
+        username=ADMIN_USERNAME,
+        email=f"{ADMIN_USERNAME}@mastersolis.com",
+        password_hash=ADMIN_PASSWORD if is_hash else await password_hasher.hash(ADMIN_PASSWORD)
+    )
+    try:
+        await db.admin_users.insert_one(admin.model_dump())
+    except DuplicateKeyError:
+        # Another worker created it first
+        return
+    logging.info(f"Created admin account '{ADMIN_USERNAME}' from ADMIN_USERNAME/ADMIN_PASSWORD")
 
-class TestimonialCreate(BaseModel):
-    client_name: str
-    company: str
-    position: Optional[str] = None
-    content: str
-    rating: int = 5
-    avatar: Optional[str] = None
+# ==================== Analytics ====================
+ANALYTICS_CONTACT_DAYS = int(os.environ.get('ANALYTICS_CONTACT_DAYS', '30'))
+ANALYTICS_TOP_JOBS = int(os.environ.get('ANALYTICS_TOP_JOBS', '20'))
+ANALYTICS_SUMMARY_CHANGE_RATIO = float(os.environ.get('ANALYTICS_SUMMARY_CHANGE_RATIO', '0.1'))
+ACCURACY_BUCKETS = [0, 20, 40, 60, 80, 101]
+ACCURACY_BUCKET_LABELS = {lower: f"{lower}-{min(upper - 1, 100)}" for lower, upper in zip(ACCURACY_BUCKETS, ACCURACY_BUCKETS[1:])}
 
-class Project(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    title: str
-    description: str
-    technologies: List[str]
-    category: str
-    image: Optional[str] = None
-    client: Optional[str] = None
-    completion_date: Optional[str] = None
-    featured: bool = False
-    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+_analytics_summary_lock = asyncio.Lock()
 
-class ProjectCreate(BaseModel):
-    title: str
-    description: str
-    technologies: List[str]
-    category: str
-    image: Optional[str] = None
-    client: Optional[str] = None
-    completion_date: Optional[str] = None
+async def application_breakdowns() -> Dict[str, Any]:
+    """Applications per job, per status and by ATS accuracy band in one $facet pass"""
+    pipeline = [
+        {"$project": {"job_id": 1, "job_title": 1, "status": 1, "accuracy": "$ai_analysis.accuracy"}},
+        {"$facet": {
+            "by_status": [
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}}
+            ],
+            "by_job": [
+                {"$group": {
+                    "_id": "$job_id",
+                    "job_title": {"$first": "$job_title"},
+                    "count": {"$sum": 1},
+                    "avg_accuracy": {"$avg": "$accuracy"}
+                }},
+                {"$sort": {"count": -1}},
+                {"$limit": ANALYTICS_TOP_JOBS}
+            ],
+            "accuracy": [
+                {"$bucket": {"groupBy": "$accuracy", "boundaries": ACCURACY_BUCKETS, "default": "unscored", "output": {"count": {"$sum": 1}}}}
+            ]
+        }}
+    ]
+    result = await db.job_applications.aggregate(pipeline).to_list(1)
+    facets = result[0] if result else {"by_status": [], "by_job": [], "accuracy": []}
+    return {
+        "applications_by_status": {row['_id'] or "unknown": row['count'] for row in facets['by_status']},
+        "applications_by_job": [
+            {
+                "job_id": row['_id'],
+                "job_title": row.get('job_title'),
+                "count": row['count'],
+                "avg_accuracy": round(row['avg_accuracy'], 1) if row.get('avg_accuracy') is not None else None
+            }
+            for row in facets['by_job']
+        ],
+        "accuracy_distribution": {
+            ACCURACY_BUCKET_LABELS.get(row['_id'], "unscored"): row['count']
+            for row in facets['accuracy']
+        }
+    }
 
-class CaseStudy(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    title: str
-    client: str
-    challenge: str
-    solution: str
-    results: str
-    ai_summary: Optional[str] = None
-    technologies: List[str]
-    image: Optional[str] = None
-    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+async def contacts_per_day(days: int) -> List[Dict[str, Any]]:
+    since = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": since}}},
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}, "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}}
+    ]
+    rows = await db.contact_submissions.aggregate(pipeline).to_list(days + 1)
+    return [{"date": row['_id'], "count": row['count']} for row in rows]
 
-class CaseStudyCreate(BaseModel):
-    title: str
-    client: str
-    challenge: str
-    solution: str
-    results: str
-    technologies: List[str]
-    image: Optional[str] = None
+def summary_is_stale(previous: Optional[Dict[str, int]], counts: Dict[str, int]) -> bool:
+    """True when any headline count moved by more than ANALYTICS_SUMMARY_CHANGE_RATIO"""
+    if not previous:
+        return True
+    for key, value in counts.items():
+        old = previous.get(key)
+        if old is None or abs(value - old) > max(old, 1) * ANALYTICS_SUMMARY_CHANGE_RATIO:
+            return True
+    return False
 
-class AdminUser(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    username: str
-    email: EmailStr
-    password_hash: str
-    created_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+async def analytics_summary(counts: Dict[str, int], by_status: Dict[str, int]) -> Dict[str, Any]:
+    """Return the stored AI summary, regenerating it only after a material change in the counts"""
+    cached = await db.analytics_summaries.find_one({"_id": "dashboard"})
+    if cached and not summary_is_stale(cached.get('counts'), counts):
+        return cached
+    async with _analytics_summary_lock:
+        cached = await db.analytics_summaries.find_one({"_id": "dashboard"})
+        if cached and not summary_is_stale(cached.get('counts'), counts):
+            return cached
+        statuses = ", ".join(f"{count} {status}" for status, count in by_status.items()) or "none"
+        summary_prompt = f"""Generate a brief analytics summary:
+    - {counts['total_contacts']} contact submissions
+    - {counts['total_applications']} job applications ({statuses})
+    - {counts['total_jobs']} active job postings
+    - {counts['total_blogs']} published blogs
+    - {counts['total_projects']} projects
+    
+    Provide 2-3 insights about business health."""
+        try:
+            summary = await generate_ai_content(summary_prompt, 150)
+        except AIUnavailableError:
+            # Keep serving the last good summary; retry on the next load
+            return cached or {"summary": AI_UNAVAILABLE_MESSAGE, "generated_date": None}
+        doc = {"_id": "dashboard", "counts": counts, "summary": summary, "generated_date": datetime.now(timezone.utc)}
+        await db.analytics_summaries.replace_one({"_id": "dashboard"}, doc, upsert=True)
+        return doc
 
-class AdminLogin(BaseModel):
-    username: str
-    password: str
+# ==================== AI Field Fill ====================
+def blog_prompts(blog: Dict[str, Any]) -> Dict[str, Tuple[str, int]]:
+    """Prompt and token budget for each AI-written blog field"""
+    return {
+        "excerpt": (f"""Write a compelling 2-sentence excerpt (max 150 characters) for this blog post:
+        Title: {blog['title']}
+        Content: {blog['content'][:500]}
+        
+        Return only the excerpt text, no additional formatting.""", 100),
+        "summary": (f"""Write a comprehensive 3-4 sentence summary of this blog post:
+        Title: {blog['title']}
+        Content: {blog['content'][:1000]}
+        
+        The summary should:
+        - Capture the main points and key takeaways
+        - Be informative and engaging
+        - Be 3-4 sentences long
+        - Help readers understand what the post is about
+        
+        Return only the summary text, no additional formatting.""", 200),
+        "seo_description": (f"""Write an SEO-optimized meta description (max 160 characters) for:
+        Title: {blog['title']}
+        Content: {blog['content'][:300]}
+        
+        Return only the SEO description, no additional formatting.""", 50)
+    }
 
-class ChatMessage(BaseModel):
-    message: str
+def case_study_prompts(case: Dict[str, Any]) -> Dict[str, Tuple[str, int]]:
+    return {
+        "ai_summary": (f"""Summarize this case study in 2-3 sentences:
+    Challenge: {case['challenge']}
+    Solution: {case['solution']}
+    Results: {case['results']}""", 150)
+    }
 
-class AIRequest(BaseModel):
-    prompt: str
-    context: Optional[str] = None
+AI_FILL_PROMPTS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Tuple[str, int]]]] = {
+    "blog_posts": blog_prompts,
+    "case_studies": case_study_prompts
+}
+
+async def generate_fields(prompts: Dict[str, Tuple[str, int]]) -> Tuple[Dict[str, Optional[str]], Dict[str, AIUnavailableError]]:
+    """Generate several fields concurrently; fields that failed are None in the values and listed in the errors"""
+    results = await asyncio.gather(
+        *(generate_ai_content(prompt, max_tokens) for prompt, max_tokens in prompts.values()),
+        return_exceptions=True
+    )
+    values, errors = {}, {}
+    for field, result in zip(prompts, results):
+        if isinstance(result, AIUnavailableError):
+            values[field] = None
+            errors[field] = result
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            values[field] = result
+    return values, errors
+
+async def schedule_ai_fill(collection: str, doc_id: str, fields: List[str]):
+    """Generate fields left empty because the model was unavailable, once it is back"""
+    if not fields:
+        return
+    try:
+        await task_queue.enqueue("ai_fill", {"collection": collection, "id": doc_id, "fields": sorted(fields)})
+    except QueueFullError as e:
+        # The document is already stored; its empty fields can be backfilled later
+        logging.warning(f"AI fill not queued for {collection} {doc_id} ({', '.join(sorted(fields))}): {str(e)}")
+
+async def fill_ai_fields(payload: Dict[str, Any]):
+    """Task handler: generate the still-empty AI fields of a stored document
+    
+    Prompts are built from the document as it is now; each field is written
+    only if it is still empty, so edits made meanwhile win.
+    """
+    collection = payload['collection']
+    doc = await db[collection].find_one({"id": payload['id']}, {"_id": 0})
+    if not doc:
+        return
+    prompts = AI_FILL_PROMPTS[collection](doc)
+    pending = {field: prompts[field] for field in payload['fields'] if field in prompts and not doc.get(field)}
+    if not pending:
+        return
+    values, errors = await generate_fields(pending)
+    written = 0
+    for field, value in values.items():
+        if value is None:
+            continue
+        result = await db[collection].update_one(
+            {"id": doc['id'], field: {"$in": [None, ""]}},
+            {"$set": {field: value}}
+        )
+        written += result.modified_count
+    if written:
+        await catalog_changed(collection)
+    if errors:
+        # Retry the rest later; the queue waits at least as long as the error suggests
+        raise next(iter(errors.values()))
+
+task_queue.handler("ai_fill")(fill_ai_fields)
 
 # ==================== Routes ====================
 @api_router.get("/")
@@ -281,41 +3892,32 @@ async def submit_contact(input: ContactSubmissionCreate):
     contact_obj = ContactSubmission(**contact_dict)
     
     doc = contact_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    
-    await db.contact_submissions.insert_one(doc)
     
-    # Generate AI response email
-    email_prompt = f"""Write a professional acknowledgment email for a contact form submission.
-    Name: {contact_obj.name}
-    Subject: {contact_obj.subject or 'General Inquiry'}
-    Message: {contact_obj.message[:200]}
-    
-    Keep it brief, professional, and assure them we'll respond within 24-48 hours."""
-    
-    ai_response = await generate_ai_content(email_prompt, 200)
+    # The acknowledgment email is sent by the background sender
+    acknowledgment = email_outbox.message("contact_ack", contact_obj.email, {
+        "name": contact_obj.name,
+        "subject": contact_obj.subject or 'General Inquiry'
+    })
+    await email_outbox.insert_with(db.contact_submissions, doc, acknowledgment)
     
     return contact_obj
 
-@api_router.get("/contact", response_model=List[ContactSubmission])
-async def get_contacts():
-    contacts = await db.contact_submissions.find({}, {"_id": 0}).to_list(1000)
-    for contact in contacts:
-        if isinstance(contact['timestamp'], str):
-            contact['timestamp'] = datetime.fromisoformat(contact['timestamp'])
-    return contacts
+@api_router.get("/contact", response_model=List[ContactSubmission], dependencies=[Depends(require_admin)])
+async def get_contacts(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None):
+    contacts = await paginate(db.contact_submissions, {}, model_projection(ContactSubmission), "timestamp", response, limit, cursor)
+    return fast_json(contacts, response)
 
 # Job Posting Routes
-@api_router.post("/jobs", response_model=JobPosting)
+@api_router.post("/jobs", response_model=JobPosting, dependencies=[Depends(require_admin)])
 async def create_job(input: JobPostingCreate):
     try:
         job_dict = input.model_dump()
         job_obj = JobPosting(**job_dict)
         
         doc = job_obj.model_dump()
-        doc['posted_date'] = doc['posted_date'].isoformat()
         
         result = await db.job_postings.insert_one(doc)
+        await catalog_changed("job_postings")
         logging.info(f"Job created successfully: {job_obj.id}, MongoDB ID: {result.inserted_id}")
         return job_obj
     except Exception as e:
@@ -323,29 +3925,32 @@ async def create_job(input: JobPostingCreate):
         raise HTTPException(status_code=500, detail=f"Failed to create job: {str(e)}")
 
 @api_router.get("/jobs", response_model=List[JobPosting])
-async def get_jobs(status: Optional[str] = None):
+async def get_jobs(request: Request, response: Response, status: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None):
     try:
+        not_modified = await conditional_get(request, response, "job_postings")
+        if not_modified:
+            return not_modified
         query = {"status": status} if status else {}
-        jobs = await db.job_postings.find(query, {"_id": 0}).to_list(1000)
-        for job in jobs:
-            if isinstance(job['posted_date'], str):
-                job['posted_date'] = datetime.fromisoformat(job['posted_date'])
-        logging.info(f"Retrieved {len(jobs)} jobs from database")
-        return jobs
+        return await cached_json(request, response, "job_postings", lambda page: paginate(db.job_postings, query, model_projection(JobPosting), "posted_date", page, limit, cursor))
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error retrieving jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve jobs: {str(e)}")
 
 @api_router.get("/jobs/{job_id}", response_model=JobPosting)
-async def get_job(job_id: str):
-    job = await db.job_postings.find_one({"id": job_id}, {"_id": 0})
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if isinstance(job['posted_date'], str):
-        job['posted_date'] = datetime.fromisoformat(job['posted_date'])
-    return job
+async def get_job(job_id: str, request: Request, response: Response):
+    not_modified = await conditional_get(request, response, "job_postings")
+    if not_modified:
+        return not_modified
+    async def load_job(page: Response):
+        job = await db.job_postings.find_one({"id": job_id}, model_projection(JobPosting))
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    return await cached_json(request, response, "job_postings", load_job)
 
-@api_router.put("/jobs/{job_id}", response_model=JobPosting)
+@api_router.put("/jobs/{job_id}", response_model=JobPosting, dependencies=[Depends(require_admin)])
 async def update_job(job_id: str, input: JobPostingCreate):
     try:
         job = await db.job_postings.find_one({"id": job_id})
@@ -368,440 +3973,375 @@ async def update_job(job_id: str, input: JobPostingCreate):
             "requirements": update_data.get("requirements", []),
             "responsibilities": update_data.get("responsibilities", [])
         }
+        ats_config_changed = False
+        if input.ats_config is not None:
+            update_fields["ats_config"] = input.ats_config.model_dump()
+            ats_config_changed = update_fields["ats_config"] != job.get("ats_config")
         
         # Update the job in MongoDB
         result = await db.job_postings.update_one(
             {"id": job_id},
             {"$set": update_fields}
         )
+        await catalog_changed("job_postings")
         
         if result.modified_count == 0:
             logging.warning(f"No changes detected for job {job_id}")
         
-        # Fetch and return the updated job
-        updated_job = await db.job_postings.find_one({"id": job_id}, {"_id": 0})
-        if not updated_job:
-            raise HTTPException(status_code=404, detail="Job not found after update")
-            
-        if isinstance(updated_job['posted_date'], str):
-            updated_job['posted_date'] = datetime.fromisoformat(updated_job['posted_date'])
-        
-        logging.info(f"Job updated successfully: {job_id}, Modified: {result.modified_count}")
-        return updated_job
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Error updating job: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to update job: {str(e)}")
-
-@api_router.put("/jobs/{job_id}/status")
-async def update_job_status(job_id: str, status: str):
-    """Update only the status of a job"""
-    try:
-        job = await db.job_postings.find_one({"id": job_id})
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        
-        if status not in ['active', 'closed']:
-            raise HTTPException(status_code=400, detail="Status must be 'active' or 'closed'")
-        
-        await db.job_postings.update_one({"id": job_id}, {"$set": {"status": status}})
-        logging.info(f"Job status updated: {job_id} -> {status}")
-        return {"message": "Job status updated successfully", "job_id": job_id, "status": status}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Error updating job status: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to update job status: {str(e)}")
-
-@api_router.delete("/jobs/{job_id}")
-async def delete_job(job_id: str):
-    try:
-        result = await db.job_postings.delete_one({"id": job_id})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Job not found")
-        logging.info(f"Job deleted successfully: {job_id}")
-        return {"message": "Job deleted successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Error deleting job: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to delete job: {str(e)}")
-
-# Job Application Routes
-@api_router.post("/applications")
-async def submit_application(
-    job_id: str = Form(...),
-    job_title: str = Form(...),
-    name: str = Form(...),
-    email: str = Form(...),
-    phone: str = Form(...),
-    cover_letter: Optional[str] = Form(None),
-    resume: UploadFile = File(...)
-):
-    # Read and parse resume
-    resume_content = await resume.read()
-    resume_text = ""
-    
-    if resume.filename.lower().endswith('.pdf'):
-        resume_text = extract_text_from_pdf(resume_content)
-        content_type = "application/pdf"
-    elif resume.filename.lower().endswith(('.docx', '.doc')):
-        resume_text = extract_text_from_docx(resume_content)
-        content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    else:
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
-    
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Could not extract text from resume")
-    
-    # Store resume file as base64 encoded string in MongoDB
-    resume_file_base64 = base64.b64encode(resume_content).decode('utf-8')
-    
-    # Get job posting details for ATS analysis
-    job_posting = await db.job_postings.find_one({"id": job_id}, {"_id": 0})
-    job_requirements = ""
-    job_qualification = ""
-    job_description = ""
-    ats_config = None
-    
-    if job_posting:
-        job_requirements = ", ".join(job_posting.get('requirements', []))
-        job_qualification = job_posting.get('qualification', '')
-        job_description = job_posting.get('description', '')
-        # Get ATS configuration if available
-        ats_config_data = job_posting.get('ats_config')
-        if ats_config_data:
-            try:
-                ats_config = ATSConfig(**ats_config_data)
-            except Exception as e:
-                logging.warning(f"Error parsing ATS config: {str(e)}, using defaults")
-                ats_config = ATSConfig()
-        else:
-            # Use default ATS configuration
-            ats_config = ATSConfig()
-    
-    # Build ATS evaluation criteria
-    ats_criteria = ""
-    if ats_config:
-        ats_criteria = f"""
-    ATS EVALUATION CRITERIA:
-    - Minimum Accuracy Threshold: {ats_config.min_accuracy_threshold}%
-    - Skill Weight: {ats_config.skill_weight * 100}%
-    - Experience Weight: {ats_config.experience_weight * 100}%
-    - Education Weight: {ats_config.education_weight * 100}%
-    - Qualification Weight: {ats_config.qualification_weight * 100}%
-    - Overall Fit Weight: {ats_config.overall_fit_weight * 100}%
-    - Required Skills (Must Have): {', '.join(ats_config.required_skills) if ats_config.required_skills else 'None specified'}
-    - Preferred Skills (Nice to Have): {', '.join(ats_config.preferred_skills) if ats_config.preferred_skills else 'None specified'}
-    - Minimum Experience Years: {ats_config.min_experience_years if ats_config.min_experience_years else 'Not specified'}
-    - Required Education: {ats_config.required_education if ats_config.required_education else 'Not specified'}
-    - Custom Evaluation Instructions: {ats_config.evaluation_criteria if ats_config.evaluation_criteria else 'Standard evaluation'}
-    """
-    
-    # Enhanced ATS Analysis with job-specific configuration
-    analysis_prompt = f"""You are a highly sophisticated ATS (Applicant Tracking System) analyzer. Analyze this resume against the job position using the specified evaluation criteria.
-    
-    JOB POSITION: {job_title}
-    JOB REQUIREMENTS: {job_requirements}
-    JOB QUALIFICATION: {job_qualification}
-    JOB DESCRIPTION: {job_description[:500]}
-    {ats_criteria}
-    
-    RESUME CONTENT: {resume_text[:2500]}
-    
-    Perform a comprehensive analysis and calculate a WEIGHTED ACCURACY PERCENTAGE (0-100) based on the specified weights:
-    
-    1. SKILLS MATCH ({ats_config.skill_weight * 100}% weight):
-       - Check if required skills are present: {', '.join(ats_config.required_skills) if ats_config.required_skills else 'All job requirements'}
-       - Check preferred skills: {', '.join(ats_config.preferred_skills) if ats_config.preferred_skills else 'None'}
-       - Calculate skills match percentage
-    
-    2. EXPERIENCE RELEVANCE ({ats_config.experience_weight * 100}% weight):
-       - Extract years of experience from resume
-       - Compare with minimum requirement: {ats_config.min_experience_years if ats_config.min_experience_years else 'Not specified'}
-       - Evaluate relevance of experience to job role
-    
-    3. EDUCATION MATCH ({ats_config.education_weight * 100}% weight):
-       - Check education level in resume
-       - Compare with required education: {ats_config.required_education if ats_config.required_education else 'Not specified'}
-       - Evaluate qualification match
-    
-    4. QUALIFICATION MATCH ({ats_config.qualification_weight * 100}% weight):
-       - Check if resume meets qualification requirements: {job_qualification[:200]}
-       - Evaluate qualification relevance
-    
-    5. OVERALL FIT ({ats_config.overall_fit_weight * 100}% weight):
-       - General fit for the position
-       - Cultural fit indicators
-       - Career progression alignment
-    
-    IMPORTANT: Calculate a WEIGHTED ACCURACY SCORE using the specified weights. The final accuracy must be between 0-100.
-    
-    Return ONLY a valid JSON object with these exact fields:
-    {{
-        "skills": ["skill1", "skill2", ...],
-        "required_skills_match": number (0-100),
-        "preferred_skills_match": number (0-100),
-        "experience_years": number,
-        "experience_match": number (0-100),
-        "education": "education level",
-        "education_match": number (0-100),
-        "qualification_match": number (0-100),
-        "overall_fit": number (0-100),
-        "weighted_accuracy": number (0-100),
-        "match_score": number (1-10),
-        "summary": "2-sentence summary",
-        "strengths": ["strength1", "strength2"],
-        "weaknesses": ["weakness1", "weakness2"],
-        "recommendation": "selected" or "rejected"
-    }}
-    
-    Calculate weighted_accuracy using the formula:
-    weighted_accuracy = (skills_match * {ats_config.skill_weight}) + 
-                        (experience_match * {ats_config.experience_weight}) + 
-                        (education_match * {ats_config.education_weight}) + 
-                        (qualification_match * {ats_config.qualification_weight}) + 
-                        (overall_fit * {ats_config.overall_fit_weight})
+        # Fetch and return the updated job
+        updated_job = await db.job_postings.find_one({"id": job_id}, {"_id": 0})
+        if not updated_job:
+            raise HTTPException(status_code=404, detail="Job not found after update")
+            
+        
+        # Applications scored under the old weights/threshold are re-evaluated in the background
+        if ats_config_changed:
+            await start_rescore(job_id)
+        
+        logging.info(f"Job updated successfully: {job_id}, Modified: {result.modified_count}")
+        return updated_job
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error updating job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to update job: {str(e)}")
+
+@api_router.post("/jobs/{job_id}/rescore", status_code=202, dependencies=[Depends(require_admin)])
+async def rescore_job(job_id: str, ats_config: Optional[ATSConfig] = None):
+    """Optionally replace the job's ATS configuration, then re-score its applications in bulk"""
+    job = await db.job_postings.find_one({"id": job_id}, {"_id": 0, "id": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if ats_config is not None:
+        await db.job_postings.update_one({"id": job_id}, {"$set": {"ats_config": ats_config.model_dump()}})
+        await catalog_changed("job_postings")
+    return await start_rescore(job_id)
+
+@api_router.get("/jobs/{job_id}/rescore/{run_id}", dependencies=[Depends(require_admin)])
+async def get_rescore_progress(job_id: str, run_id: str):
+    run = await db.rescore_runs.find_one({"id": run_id, "job_id": job_id}, {"_id": 0})
+    if not run:
+        raise HTTPException(status_code=404, detail="Re-score run not found")
+    if run.get('total'):
+        run['percent'] = round(run['processed'] / run['total'] * 100, 1)
+    return run
+
+@api_router.put("/jobs/{job_id}/status", dependencies=[Depends(require_admin)])
+async def update_job_status(job_id: str, status: str):
+    """Update only the status of a job"""
+    try:
+        job = await db.job_postings.find_one({"id": job_id})
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        if status not in ['active', 'closed']:
+            raise HTTPException(status_code=400, detail="Status must be 'active' or 'closed'")
+        
+        await db.job_postings.update_one({"id": job_id}, {"$set": {"status": status}})
+        await catalog_changed("job_postings")
+        logging.info(f"Job status updated: {job_id} -> {status}")
+        return {"message": "Job status updated successfully", "job_id": job_id, "status": status}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error updating job status: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to update job status: {str(e)}")
+
+@api_router.delete("/jobs/{job_id}", dependencies=[Depends(require_admin)])
+async def delete_job(job_id: str):
+    try:
+        result = await db.job_postings.delete_one({"id": job_id})
+        if result.deleted_count == 0:
+            raise HTTPException(status_code=404, detail="Job not found")
+        await catalog_changed("job_postings")
+        logging.info(f"Job deleted successfully: {job_id}")
+        return {"message": "Job deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error deleting job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to delete job: {str(e)}")
+
+# Job Application Routes
+@api_router.post("/applications")
+async def submit_application(
+    job_id: str = Form(...),
+    job_title: str = Form(...),
+    name: str = Form(...),
+    email: str = Form(...),
+    phone: str = Form(...),
+    cover_letter: Optional[str] = Form(None),
+    resume: UploadFile = File(...)
+):
+    # Read and parse resume
+    if resume.filename.lower().endswith('.pdf'):
+        content_type = "application/pdf"
+    elif resume.filename.lower().endswith(('.docx', '.doc')):
+        content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    else:
+        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
     
-    If weighted_accuracy >= {ats_config.min_accuracy_threshold}, recommendation should be "selected", else "rejected".
-    Return ONLY the JSON, no other text."""
+    # Stream the upload into the resume store while keeping the bytes for text extraction
+    chunks = []
+    async def tee_upload():
+        async for chunk in iter_upload(resume, MAX_RESUME_BYTES):
+            chunks.append(chunk)
+            yield chunk
     
-    ai_analysis_raw = await generate_ai_content(analysis_prompt, 600)
+    app_id = str(uuid.uuid4())
+    blob = await resume_store.save(app_id, tee_upload(), resume.filename, content_type)
+    resume_content = b''.join(chunks)
     
-    # Parse weighted accuracy from AI response
-    accuracy = 0
-    ats_analysis = {}
     try:
-        # Try to extract JSON from the response
-        json_match = re.search(r'\{.*?"weighted_accuracy".*?\}', ai_analysis_raw, re.DOTALL)
-        if json_match:
-            analysis_json = json.loads(json_match.group())
-            accuracy = int(analysis_json.get('weighted_accuracy', 0))
-            ats_analysis = analysis_json
-        else:
-            # Fallback: try to find weighted_accuracy or accuracy in text
-            weighted_match = re.search(r'"weighted_accuracy":\s*(\d+)', ai_analysis_raw)
-            if weighted_match:
-                accuracy = int(weighted_match.group(1))
-            else:
-                accuracy_match = re.search(r'"accuracy":\s*(\d+)', ai_analysis_raw)
-                if accuracy_match:
-                    accuracy = int(accuracy_match.group(1))
-    except Exception as e:
-        logging.error(f"Error parsing accuracy from AI response: {str(e)}")
-        # Default accuracy calculation based on basic matching
-        resume_lower = resume_text.lower()
-        job_req_lower = job_requirements.lower()
-        matches = sum(1 for word in job_req_lower.split() if len(word) > 3 and word in resume_lower)
-        accuracy = min(100, (matches / max(len(job_req_lower.split()), 1)) * 100)
-    
-    # Auto-assign status based on ATS configuration threshold
-    threshold = ats_config.min_accuracy_threshold if ats_config else 85
-    initial_status = "selected" if accuracy >= threshold else "rejected"
-    
-    ai_analysis = {
-        "raw_analysis": ai_analysis_raw,
-        "resume_length": len(resume_text),
-        "accuracy": accuracy,
-        "parsed_analysis": ai_analysis_raw
-    }
+        resume_text = await extract_document_text(resume.filename, resume_content)
+    except ExtractionError as e:
+        await resume_store.delete(blob['id'])
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if not resume_text:
+        await resume_store.delete(blob['id'])
+        raise HTTPException(status_code=400, detail="Could not extract text from resume")
     
-    # Create application with auto-assigned status
+    # Create application; the ATS analysis runs in the background task queue
     application = JobApplication(
+        id=app_id,
         job_id=job_id,
         job_title=job_title,
         name=name,
         email=email,
         phone=phone,
         resume_text=resume_text,
-        resume_file=resume_file_base64,
+        resume_file_id=blob['id'],
+        resume_sha256=blob['sha256'],
         resume_filename=resume.filename,
-        resume_file_size=len(resume_content),
+        resume_file_size=blob['length'],
         resume_content_type=content_type,
         cover_letter=cover_letter,
-        ai_analysis=ai_analysis,
-        status=initial_status  # Auto-assign based on accuracy
+        status="pending_analysis"
     )
     
-    doc = application.model_dump()
-    doc['applied_date'] = doc['applied_date'].isoformat()
+    doc = application.model_dump(exclude={"resume_file"})
     
-    # Store in MongoDB - the resume file is now stored as base64 in the document
+    # Store in MongoDB - the resume itself lives in resume_store, the document only references it
+    acknowledgment = email_outbox.message("application_ack", email, {"name": name, "job_title": job_title})
     try:
-        result = await db.job_applications.insert_one(doc)
-        logging.info(f"Application stored in MongoDB: ID={application.id}, MongoDB_ID={result.inserted_id}, accuracy={accuracy}%, status={initial_status}, file_size={len(resume_content)} bytes")
+        await email_outbox.insert_with(db.job_applications, doc, acknowledgment)
+        logging.info(f"Application stored in MongoDB: ID={application.id}, file_size={blob['length']} bytes")
     except Exception as e:
         logging.error(f"Error storing application in MongoDB: {str(e)}")
+        await resume_store.delete(blob['id'])
         raise HTTPException(status_code=500, detail=f"Failed to store application: {str(e)}")
     
-    # Generate acknowledgment email
-    email_prompt = f"""Write a professional job application acknowledgment email.
-    Candidate: {name}
-    Position: {job_title}
-    
-    Thank them for applying to MasterSolis InfoTech and inform them we'll review their application."""
-    
-    ai_email = await generate_ai_content(email_prompt, 200)
+    try:
+        await task_queue.enqueue("ats_analysis", {"application_id": application.id})
+    except QueueFullError as e:
+        # Keep the application; an admin can queue it later via /applications/{id}/analyze
+        logging.warning(f"ATS analysis not queued for {application.id}: {str(e)}")
+        await db.job_applications.update_one({"id": application.id}, {"$set": {"status": "pending"}})
+        return {
+            "message": "Application submitted successfully. Analysis is delayed due to high volume.",
+            "application_id": application.id,
+            "status": "pending"
+        }
     
     return {
         "message": "Application submitted successfully",
         "application_id": application.id,
-        "accuracy": accuracy,
-        "status": initial_status
+        "status": "pending_analysis",
+        "status_url": f"/api/applications/{application.id}/status"
     }
 
-@api_router.get("/applications", response_model=List[JobApplication])
-async def get_applications(job_id: Optional[str] = None, status: Optional[str] = None):
+@api_router.get("/applications", response_model=List[ApplicationSummary], dependencies=[Depends(require_admin)])
+async def get_applications(
+    response: Response,
+    job_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
     query = {}
     if job_id:
         query["job_id"] = job_id
     if status:
         query["status"] = status
     
-    applications = await db.job_applications.find(query, {"_id": 0}).to_list(1000)
-    for app in applications:
-        if isinstance(app['applied_date'], str):
-            app['applied_date'] = datetime.fromisoformat(app['applied_date'])
-    return applications
+    applications = await paginate(db.job_applications, query, APPLICATION_SUMMARY_PROJECTION, "applied_date", response, limit, cursor)
+    return fast_json(applications, response)
 
-@api_router.get("/applications/{app_id}", response_model=JobApplication)
+@api_router.get("/applications/{app_id}", response_model=JobApplication, dependencies=[Depends(require_admin)])
 async def get_application(app_id: str):
-    app = await db.job_applications.find_one({"id": app_id}, {"_id": 0})
+    """Full application details (the resume itself is served by /applications/{app_id}/resume)"""
+    app = await db.job_applications.find_one({"id": app_id}, {"_id": 0, "resume_file": 0})
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
-    if isinstance(app['applied_date'], str):
-        app['applied_date'] = datetime.fromisoformat(app['applied_date'])
     return app
 
-@api_router.get("/applications/by-email/{email}")
-async def get_applications_by_email(email: str):
+@api_router.get("/applications/{app_id}/status")
+async def get_application_status(app_id: str):
+    """Lightweight status poll for the background ATS analysis"""
+    app = await db.job_applications.find_one(
+        {"id": app_id},
+        {"_id": 0, "id": 1, "status": 1, "ai_analysis.accuracy": 1, "ai_analysis.error": 1}
+    )
+    if not app:
+        raise HTTPException(status_code=404, detail="Application not found")
+    
+    response = {
+        "application_id": app['id'],
+        "status": app['status'],
+        "accuracy": (app.get('ai_analysis') or {}).get('accuracy'),
+        "error": (app.get('ai_analysis') or {}).get('error')
+    }
+    if app['status'] == "pending_analysis":
+        task = await task_queue.collection.find_one(
+            {"kind": "ats_analysis", "payload.application_id": app_id, "status": {"$in": ["queued", "running"]}},
+            {"_id": 0, "status": 1, "attempts": 1, "available_at": 1}
+        )
+        if task:
+            response["analysis"] = {"state": task['status'], "attempts": task['attempts']}
+            if task['status'] == "queued":
+                response["analysis"]["queue_position"] = await task_queue.collection.count_documents(
+                    {"status": "queued", "available_at": {"$lt": task['available_at']}}
+                ) + 1
+    return response
+
+@api_router.get("/applications/{app_id}/events")
+async def stream_application_status(app_id: str, request: Request):
+    """Server-Sent Events stream that pushes status changes until the analysis finishes"""
+    if not await db.job_applications.find_one({"id": app_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Application not found")
+    
+    async def event_stream():
+        last = None
+        while not await request.is_disconnected():
+            current = await get_application_status(app_id)
+            if current != last:
+                yield f"data: {json.dumps(current, default=str)}\n\n"
+                last = current
+            if current['status'] != "pending_analysis":
+                break
+            await asyncio.sleep(TASK_POLL_INTERVAL)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@api_router.post("/applications/{app_id}/analyze", dependencies=[Depends(require_admin)])
+async def queue_application_analysis(app_id: str):
+    """(Re)queue the ATS analysis for an application"""
+    result = await db.job_applications.update_one({"id": app_id}, {"$set": {"status": "pending_analysis"}})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Application not found")
+    try:
+        task_id = await task_queue.enqueue("ats_analysis", {"application_id": app_id})
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"message": "Analysis queued", "application_id": app_id, "task_id": task_id}
+
+@api_router.get("/applications/by-email/{email}", response_model=List[ApplicationSummary])
+async def get_applications_by_email(email: str, response: Response, limit: Optional[int] = None, cursor: Optional[str] = None):
     """Get all applications for a user by email"""
-    applications = await db.job_applications.find({"email": email}, {"_id": 0}).to_list(1000)
-    for app in applications:
-        if isinstance(app['applied_date'], str):
-            app['applied_date'] = datetime.fromisoformat(app['applied_date'])
-    return applications
+    applications = await paginate(
+        db.job_applications, {"email": email}, APPLICATION_SUMMARY_PROJECTION, "applied_date", response, limit, cursor
+    )
+    return fast_json(applications, response)
 
-@api_router.put("/applications/{app_id}/status")
+@api_router.put("/applications/{app_id}/status", dependencies=[Depends(require_admin)])
 async def update_application_status(app_id: str, status: str):
     result = await db.job_applications.update_one(
         {"id": app_id},
-        {"$set": {"status": status}}
+        {"$set": {"status": status, "status_source": "admin"}}
     )
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Application not found")
     return {"message": "Status updated successfully"}
 
-@api_router.get("/applications/{app_id}/resume")
-async def download_resume(app_id: str):
-    """Download resume file for an application"""
-    app = await db.job_applications.find_one({"id": app_id}, {"_id": 0})
+@api_router.get("/applications/{app_id}/resume", dependencies=[Depends(require_admin)])
+async def download_resume(app_id: str, request: Request):
+    """Download resume file for an application (supports Range and If-None-Match)"""
+    app = await db.job_applications.find_one(
+        {"id": app_id},
+        {"_id": 0, "resume_file_id": 1, "resume_filename": 1, "resume_content_type": 1}
+    )
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    if not app.get('resume_file'):
-        raise HTTPException(status_code=404, detail="Resume file not found")
+    filename = app.get('resume_filename') or 'resume.pdf'
+    disposition = f'attachment; filename="{filename}"'
     
-    # Decode base64 file content
-    file_content = base64.b64decode(app['resume_file'])
-    filename = app.get('resume_filename', 'resume.pdf')
-    content_type = app.get('resume_content_type', 'application/pdf')
+    if app.get('resume_file_id'):
+        info = await resume_store.stat(app['resume_file_id'])
+        if not info:
+            raise HTTPException(status_code=404, detail="Resume file not found")
+        info['content_type'] = app.get('resume_content_type') or info.get('content_type')
+        return blob_response(request, info, resume_store, disposition)
+    
+    # Legacy application that still carries the base64 file inline
+    legacy = await db.job_applications.find_one({"id": app_id}, {"_id": 0, "resume_file": 1})
+    if not legacy or not legacy.get('resume_file'):
+        raise HTTPException(status_code=404, detail="Resume file not found")
     
-    # Return file as streaming response
+    file_content = base64.b64decode(legacy['resume_file'])
     return StreamingResponse(
-        io.BytesIO(file_content),
-        media_type=content_type,
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        iter_bytes(file_content),
+        media_type=app.get('resume_content_type') or 'application/pdf',
+        headers={"Content-Disposition": disposition, "Content-Length": str(len(file_content))}
     )
 
 # Blog Routes
-@api_router.post("/blog", response_model=BlogPost)
+@api_router.post("/blog", response_model=BlogPost, dependencies=[Depends(require_admin)])
 async def create_blog(input: BlogPostCreate):
     try:
-        blog_dict = input.model_dump()
-        
-        # Generate slug from title
-        slug = blog_dict['title'].lower().replace(' ', '-').replace('/', '-')
-        # Remove special characters and ensure unique slug
-        slug = re.sub(r'[^a-z0-9-]', '', slug)
-        # Check if slug exists, append number if needed
-        existing = await db.blog_posts.find_one({"slug": slug})
-        if existing:
-            counter = 1
-            while existing:
-                new_slug = f"{slug}-{counter}"
-                existing = await db.blog_posts.find_one({"slug": new_slug})
-                if not existing:
-                    slug = new_slug
-                    break
-                counter += 1
-        blog_dict['slug'] = slug
-        
-        # Generate excerpt, summary, and SEO description using AI
-        excerpt_prompt = f"""Write a compelling 2-sentence excerpt (max 150 characters) for this blog post:
-        Title: {blog_dict['title']}
-        Content: {blog_dict['content'][:500]}
-        
-        Return only the excerpt text, no additional formatting."""
-        
-        summary_prompt = f"""Write a comprehensive 3-4 sentence summary of this blog post:
-        Title: {blog_dict['title']}
-        Content: {blog_dict['content'][:1000]}
-        
-        The summary should:
-        - Capture the main points and key takeaways
-        - Be informative and engaging
-        - Be 3-4 sentences long
-        - Help readers understand what the post is about
-        
-        Return only the summary text, no additional formatting."""
+        blog_dict = await externalize_media_fields("blog_posts", input.model_dump())
         
-        seo_prompt = f"""Write an SEO-optimized meta description (max 160 characters) for:
-        Title: {blog_dict['title']}
-        Content: {blog_dict['content'][:300]}
-        
-        Return only the SEO description, no additional formatting."""
-        
-        # Generate AI content
-        blog_dict['excerpt'] = await generate_ai_content(excerpt_prompt, 100)
-        blog_dict['summary'] = await generate_ai_content(summary_prompt, 200)
-        blog_dict['seo_description'] = await generate_ai_content(seo_prompt, 50)
-        
-        blog_obj = BlogPost(**blog_dict)
+        # Generate excerpt, summary, and SEO description using AI; fields the
+        # model could not write stay empty and are filled in later
+        generated, missing = await generate_fields(blog_prompts(blog_dict))
+        blog_dict.update(generated)
         
+        # Slug is allocated last, right before the insert that claims it
+        blog_obj = BlogPost(**blog_dict, slug=slugify(blog_dict['title']))
         doc = blog_obj.model_dump()
-        doc['created_date'] = doc['created_date'].isoformat()
-        doc['updated_date'] = doc['updated_date'].isoformat()
-        
-        await db.blog_posts.insert_one(doc)
+        slug = await write_with_free_slug(blog_obj.slug, lambda candidate: db.blog_posts.insert_one({**doc, "slug": candidate}))
+        blog_obj.slug = slug
+        await forget_slug(slug)
+        await catalog_changed("blog_posts")
+        await schedule_ai_fill("blog_posts", blog_obj.id, list(missing))
         logging.info(f"Blog post created: {blog_obj.title}, slug: {slug}")
         return blog_obj
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error creating blog post: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create blog post: {str(e)}")
 
 @api_router.get("/blog", response_model=List[BlogPost])
-async def get_blogs(published: Optional[bool] = None):
+async def get_blogs(request: Request, response: Response, published: Optional[bool] = None, limit: Optional[int] = None, cursor: Optional[str] = None):
+    not_modified = await conditional_get(request, response, "blog_posts")
+    if not_modified:
+        return not_modified
     query = {"published": published} if published is not None else {}
-    blogs = await db.blog_posts.find(query, {"_id": 0}).to_list(1000)
-    for blog in blogs:
-        if isinstance(blog['created_date'], str):
-            blog['created_date'] = datetime.fromisoformat(blog['created_date'])
-        if isinstance(blog['updated_date'], str):
-            blog['updated_date'] = datetime.fromisoformat(blog['updated_date'])
-    return blogs
+    return await cached_json(request, response, "blog_posts", lambda page: paginate(db.blog_posts, query, model_projection(BlogPost), "created_date", page, limit, cursor))
 
 @api_router.get("/blog/{slug}", response_model=BlogPost)
-async def get_blog(slug: str):
-    blog = await db.blog_posts.find_one({"slug": slug}, {"_id": 0})
-    if not blog:
-        raise HTTPException(status_code=404, detail="Blog post not found")
-    if isinstance(blog['created_date'], str):
-        blog['created_date'] = datetime.fromisoformat(blog['created_date'])
-    if isinstance(blog['updated_date'], str):
-        blog['updated_date'] = datetime.fromisoformat(blog['updated_date'])
-    return blog
+async def get_blog(slug: str, request: Request, response: Response):
+    not_modified = await conditional_get(request, response, "blog_posts")
+    if not_modified:
+        return not_modified
+    async def load_blog(page: Response):
+        blog = await db.blog_posts.find_one({"slug": slug}, model_projection(BlogPost))
+        if not blog:
+            raise HTTPException(status_code=404, detail="Blog post not found")
+        return blog
+    try:
+        return await cached_json(request, response, "blog_posts", load_blog)
+    except HTTPException as e:
+        current_slug = await moved_slug(slug) if e.status_code == 404 else None
+        if not current_slug:
+            raise
+        # Renamed post: send old links to the current slug
+        location = f"{request.url.path.rsplit('/', 1)[0]}/{current_slug}"
+        if request.url.query:
+            location += f"?{request.url.query}"
+        return Response(status_code=301, headers={"Location": location, "Cache-Control": PUBLIC_CACHE_CONTROL})
 
 @api_router.post("/blog/{slug}/summarize")
 async def summarize_blog(slug: str):
@@ -814,22 +4354,23 @@ async def summarize_blog(slug: str):
         if blog.get('summary'):
             return {"summary": blog['summary']}
         
-        summary_prompt = f"""Write a comprehensive 3-4 sentence summary of this blog post:
-        Title: {blog['title']}
-        Content: {blog['content'][:1000]}
-        
-        The summary should:
-        - Capture the main points and key takeaways
-        - Be informative and engaging
-        - Be 3-4 sentences long
-        - Help readers understand what the post is about
-        
-        Return only the summary text, no additional formatting."""
+        summary_prompt, max_tokens = blog_prompts(blog)['summary']
         
-        summary = await generate_ai_content(summary_prompt, 200)
+        # Concurrent requests for the same post share this generation (see ai_flights)
+        try:
+            summary = await generate_ai_content(summary_prompt, max_tokens)
+        except AIUnavailableError as e:
+            raise ai_unavailable(e)
         
-        # Update blog post with summary
-        await db.blog_posts.update_one({"slug": slug}, {"$set": {"summary": summary}})
+        # Only the first writer stores its summary; later ones return the stored one
+        result = await db.blog_posts.update_one(
+            {"slug": slug, "summary": {"$in": [None, ""]}},
+            {"$set": {"summary": summary}}
+        )
+        if result.modified_count == 0:
+            current = await db.blog_posts.find_one({"slug": slug}, {"_id": 0, "summary": 1})
+            return {"summary": (current or {}).get('summary') or summary}
+        await catalog_changed("blog_posts")
         
         logging.info(f"Summary generated for blog post: {slug}")
         return {"summary": summary}
@@ -839,59 +4380,41 @@ async def summarize_blog(slug: str):
         logging.error(f"Error generating summary: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate summary: {str(e)}")
 
-@api_router.put("/blog/{slug}", response_model=BlogPost)
+@api_router.put("/blog/{slug}", response_model=BlogPost, dependencies=[Depends(require_admin)])
 async def update_blog(slug: str, input: BlogPostCreate):
     try:
         blog = await db.blog_posts.find_one({"slug": slug})
         if not blog:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        blog_dict = input.model_dump()
+        blog_dict = await externalize_media_fields("blog_posts", input.model_dump())
         
-        # Regenerate excerpt, summary, and SEO description if content changed
+        # Regenerate excerpt, summary, and SEO description if content changed;
+        # fields the model could not rewrite are cleared and filled in later
+        missing = {}
         if blog_dict.get('content') != blog.get('content') or blog_dict.get('title') != blog.get('title'):
-            excerpt_prompt = f"""Write a compelling 2-sentence excerpt (max 150 characters) for this blog post:
-            Title: {blog_dict['title']}
-            Content: {blog_dict['content'][:500]}
-            
-            Return only the excerpt text, no additional formatting."""
-            
-            summary_prompt = f"""Write a comprehensive 3-4 sentence summary of this blog post:
-            Title: {blog_dict['title']}
-            Content: {blog_dict['content'][:1000]}
-            
-            The summary should:
-            - Capture the main points and key takeaways
-            - Be informative and engaging
-            - Be 3-4 sentences long
-            - Help readers understand what the post is about
-            
-            Return only the summary text, no additional formatting."""
-            
-            seo_prompt = f"""Write an SEO-optimized meta description (max 160 characters) for:
-            Title: {blog_dict['title']}
-            Content: {blog_dict['content'][:300]}
-            
-            Return only the SEO description, no additional formatting."""
-            
-            blog_dict['excerpt'] = await generate_ai_content(excerpt_prompt, 100)
-            blog_dict['summary'] = await generate_ai_content(summary_prompt, 200)
-            blog_dict['seo_description'] = await generate_ai_content(seo_prompt, 50)
+            generated, missing = await generate_fields(blog_prompts(blog_dict))
+            blog_dict.update(generated)
         
-        # Preserve slug and dates
-        blog_dict['slug'] = slug
+        # Preserve dates; a new title moves the post to a new slug and the old one redirects
         blog_dict['created_date'] = blog.get('created_date')
         blog_dict['updated_date'] = datetime.now(timezone.utc)
         
-        await db.blog_posts.update_one({"slug": slug}, {"$set": blog_dict})
+        async def save(new_slug: str):
+            await db.blog_posts.update_one({"id": blog['id']}, {"$set": {**blog_dict, "slug": new_slug}})
         
-        updated_blog = await db.blog_posts.find_one({"slug": slug}, {"_id": 0})
-        if isinstance(updated_blog['created_date'], str):
-            updated_blog['created_date'] = datetime.fromisoformat(updated_blog['created_date'])
-        if isinstance(updated_blog['updated_date'], str):
-            updated_blog['updated_date'] = datetime.fromisoformat(updated_blog['updated_date'])
+        new_slug = slug
+        if slugify(blog_dict['title']) != slugify(blog['title']):
+            new_slug = await write_with_free_slug(slugify(blog_dict['title']), save)
+            await record_slug_change(blog['id'], slug, new_slug)
+        else:
+            await save(slug)
+        await catalog_changed("blog_posts")
+        await schedule_ai_fill("blog_posts", blog['id'], list(missing))
+        
+        updated_blog = await db.blog_posts.find_one({"id": blog['id']}, {"_id": 0})
         
-        logging.info(f"Blog post updated: {slug}")
+        logging.info(f"Blog post updated: {slug}" + (f" -> {new_slug}" if new_slug != slug else ""))
         return updated_blog
     except HTTPException:
         raise
@@ -902,7 +4425,7 @@ async def update_blog(slug: str, input: BlogPostCreate):
 # Resume Builder Routes
 class ResumeData(BaseModel):
     id: Optional[str] = None
-    photo: Optional[str] = None  # Base64 encoded image
+    photo: Optional[str] = None  # Base64/data URL on input, stored as a media URL
     fullName: str
     email: str
     technicalSkills: List[str]
@@ -915,34 +4438,38 @@ class ResumeData(BaseModel):
     languages: List[str]
     certifications: List[str]
     aiQuestion: Optional[str] = None
-    created_at: Optional[str] = None
-    updated_at: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 @api_router.post("/resumes")
 async def create_resume(resume: ResumeData):
     try:
-        resume_dict = resume.model_dump()
+        resume_dict = await externalize_media_fields("resumes", resume.model_dump())
         if not resume_dict.get('id'):
             resume_dict['id'] = str(uuid.uuid4())
         if not resume_dict.get('created_at'):
-            resume_dict['created_at'] = datetime.now(timezone.utc).isoformat()
+            resume_dict['created_at'] = datetime.now(timezone.utc)
         if not resume_dict.get('updated_at'):
-            resume_dict['updated_at'] = datetime.now(timezone.utc).isoformat()
+            resume_dict['updated_at'] = datetime.now(timezone.utc)
         
-        await db.resumes.insert_one(resume_dict)
+        await db.resumes.insert_one(dict(resume_dict))
         logging.info(f"Resume saved to MongoDB: {resume_dict['id']}, Email: {resume_dict.get('email')}")
         return resume_dict
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error saving resume: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to save resume: {str(e)}")
 
-@api_router.get("/resumes")
-async def get_resumes(email: Optional[str] = None):
+@api_router.get("/resumes", dependencies=[Depends(require_admin)])
+async def get_resumes(response: Response, email: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None):
     try:
         query = {"email": email} if email else {}
-        resumes = await db.resumes.find(query, {"_id": 0}).to_list(1000)
+        resumes = await paginate(db.resumes, query, {"_id": 0}, "created_at", response, limit, cursor)
         logging.info(f"Retrieved {len(resumes)} resumes from database")
-        return resumes
+        return fast_json(resumes, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error retrieving resumes: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve resumes: {str(e)}")
@@ -960,12 +4487,14 @@ async def get_resume(resume_id: str):
         logging.error(f"Error retrieving resume: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve resume: {str(e)}")
 
-@api_router.delete("/blog/{slug}")
+@api_router.delete("/blog/{slug}", dependencies=[Depends(require_admin)])
 async def delete_blog(slug: str):
     try:
-        result = await db.blog_posts.delete_one({"slug": slug})
-        if result.deleted_count == 0:
+        blog = await db.blog_posts.find_one_and_delete({"slug": slug}, {"_id": 0, "id": 1})
+        if not blog:
             raise HTTPException(status_code=404, detail="Blog post not found")
+        await db.blog_slug_history.delete_many({"post_id": blog['id']})
+        await catalog_changed("blog_posts")
         logging.info(f"Blog post deleted: {slug}")
         return {"message": "Blog post deleted successfully"}
     except HTTPException:
@@ -974,27 +4503,63 @@ async def delete_blog(slug: str):
         logging.error(f"Error deleting blog post: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to delete blog post: {str(e)}")
 
+# Media Routes
+@api_router.post("/media", dependencies=[Depends(require_admin)])
+async def upload_media(file: UploadFile = File(...)):
+    """Store an image by content hash; returns its URL and the available variant widths"""
+    content = b"".join([chunk async for chunk in iter_upload(file, MEDIA_MAX_BYTES)])
+    try:
+        media = await store_media(content, file.filename or "image")
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "url": media['url'],
+        "sha256": media['sha256'],
+        "content_type": media['content_type'],
+        "width": media['width'],
+        "height": media['height'],
+        "variant_widths": [variant['width'] for variant in media['variants']]
+    }
+
+@api_router.get("/media/{sha256}")
+async def get_media(sha256: str, request: Request, w: Optional[int] = None):
+    """Serve an image, or with ?w= the smallest WebP variant at least that wide
+    
+    URLs are content addressed, so responses are cacheable forever.
+    """
+    media = await db.media.find_one({"sha256": sha256}, {"_id": 0, "variants": 1})
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    blob_id = sha256
+    if w and media['variants']:
+        wide_enough = [variant for variant in media['variants'] if variant['width'] >= w]
+        if wide_enough:
+            blob_id = min(wide_enough, key=lambda variant: variant['width'])['id']
+    info = await media_store.stat(blob_id)
+    if not info:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return blob_response(request, info, media_store, cache_control=MEDIA_CACHE_CONTROL)
+
 # Testimonial Routes
-@api_router.post("/testimonials", response_model=Testimonial)
+@api_router.post("/testimonials", response_model=Testimonial, dependencies=[Depends(require_admin)])
 async def create_testimonial(input: TestimonialCreate):
-    testimonial_obj = Testimonial(**input.model_dump())
+    testimonial_obj = Testimonial(**await externalize_media_fields("testimonials", input.model_dump()))
     
     doc = testimonial_obj.model_dump()
-    doc['created_date'] = doc['created_date'].isoformat()
     
     await db.testimonials.insert_one(doc)
+    await catalog_changed("testimonials")
     return testimonial_obj
 
 @api_router.get("/testimonials", response_model=List[Testimonial])
-async def get_testimonials(featured: Optional[bool] = None):
+async def get_testimonials(request: Request, response: Response, featured: Optional[bool] = None, limit: Optional[int] = None, cursor: Optional[str] = None):
+    not_modified = await conditional_get(request, response, "testimonials")
+    if not_modified:
+        return not_modified
     query = {"featured": featured} if featured is not None else {}
-    testimonials = await db.testimonials.find(query, {"_id": 0}).to_list(1000)
-    for testimonial in testimonials:
-        if isinstance(testimonial['created_date'], str):
-            testimonial['created_date'] = datetime.fromisoformat(testimonial['created_date'])
-    return testimonials
+    return await cached_json(request, response, "testimonials", lambda page: paginate(db.testimonials, query, model_projection(Testimonial), "created_date", page, limit, cursor))
 
-@api_router.post("/testimonials/generate")
+@api_router.post("/testimonials/generate", dependencies=[Depends(require_admin)])
 async def generate_testimonial(input: AIRequest):
     """Generate or rephrase testimonial using AI"""
     prompt = f"""Based on this client feedback data, write a professional testimonial:
@@ -1003,92 +4568,185 @@ async def generate_testimonial(input: AIRequest):
     
     Make it authentic, specific, and impactful. Max 3 sentences."""
     
-    testimonial = await generate_ai_content(prompt, 150)
+    try:
+        testimonial = await generate_ai_content(prompt, 150)
+    except AIUnavailableError as e:
+        raise ai_unavailable(e)
     return {"generated_testimonial": testimonial}
 
 # Project Routes
-@api_router.post("/projects", response_model=Project)
+@api_router.post("/projects", response_model=Project, dependencies=[Depends(require_admin)])
 async def create_project(input: ProjectCreate):
-    project_obj = Project(**input.model_dump())
+    project_obj = Project(**await externalize_media_fields("projects", input.model_dump()))
     
     doc = project_obj.model_dump()
-    doc['created_date'] = doc['created_date'].isoformat()
     
     await db.projects.insert_one(doc)
+    await catalog_changed("projects")
     return project_obj
 
 @api_router.get("/projects", response_model=List[Project])
-async def get_projects(category: Optional[str] = None):
+async def get_projects(request: Request, response: Response, category: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None):
+    not_modified = await conditional_get(request, response, "projects")
+    if not_modified:
+        return not_modified
     query = {"category": category} if category else {}
-    projects = await db.projects.find(query, {"_id": 0}).to_list(1000)
-    for project in projects:
-        if isinstance(project['created_date'], str):
-            project['created_date'] = datetime.fromisoformat(project['created_date'])
-    return projects
+    return await cached_json(request, response, "projects", lambda page: paginate(db.projects, query, model_projection(Project), "created_date", page, limit, cursor))
 
 @api_router.get("/projects/search")
-async def search_projects(tech: Optional[str] = None):
+async def search_projects(request: Request, response: Response, tech: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None):
+    not_modified = await conditional_get(request, response, "projects")
+    if not_modified:
+        return not_modified
     query = {}
     if tech:
         query["technologies"] = {"$in": [tech]}
-    projects = await db.projects.find(query, {"_id": 0}).to_list(1000)
-    for project in projects:
-        if isinstance(project['created_date'], str):
-            project['created_date'] = datetime.fromisoformat(project['created_date'])
-    return projects
+    return await cached_json(request, response, "projects", lambda page: paginate(db.projects, query, model_projection(Project), "created_date", page, limit, cursor))
 
 # Case Study Routes
-@api_router.post("/case-studies", response_model=CaseStudy)
+@api_router.post("/case-studies", response_model=CaseStudy, dependencies=[Depends(require_admin)])
 async def create_case_study(input: CaseStudyCreate):
-    case_dict = input.model_dump()
+    case_dict = await externalize_media_fields("case_studies", input.model_dump())
     
-    # Generate AI summary
-    summary_prompt = f"""Summarize this case study in 2-3 sentences:
-    Challenge: {case_dict['challenge']}
-    Solution: {case_dict['solution']}
-    Results: {case_dict['results']}"""
-    
-    case_dict['ai_summary'] = await generate_ai_content(summary_prompt, 150)
+    # Generate AI summary; left empty and filled in later if the model is unavailable
+    generated, missing = await generate_fields(case_study_prompts(case_dict))
+    case_dict.update(generated)
     
     case_obj = CaseStudy(**case_dict)
     
     doc = case_obj.model_dump()
-    doc['created_date'] = doc['created_date'].isoformat()
     
     await db.case_studies.insert_one(doc)
+    await catalog_changed("case_studies")
+    await schedule_ai_fill("case_studies", case_obj.id, list(missing))
     return case_obj
 
 @api_router.get("/case-studies", response_model=List[CaseStudy])
-async def get_case_studies():
-    cases = await db.case_studies.find({}, {"_id": 0}).to_list(1000)
-    for case in cases:
-        if isinstance(case['created_date'], str):
-            case['created_date'] = datetime.fromisoformat(case['created_date'])
-    return cases
+async def get_case_studies(request: Request, response: Response, limit: Optional[int] = None, cursor: Optional[str] = None):
+    not_modified = await conditional_get(request, response, "case_studies")
+    if not_modified:
+        return not_modified
+    return await cached_json(request, response, "case_studies", lambda page: paginate(db.case_studies, {}, model_projection(CaseStudy), "created_date", page, limit, cursor))
+
+# Search Routes
+@api_router.get("/search")
+async def search(
+    request: Request,
+    response: Response,
+    q: str = "",
+    kind: Optional[str] = Query(None, alias="type"),
+    limit: Optional[int] = None,
+    offset: int = 0,
+    prefix: bool = True
+):
+    """Ranked search over published blog posts, projects, case studies and active jobs"""
+    if kind is not None and kind not in SEARCH_SOURCES:
+        raise HTTPException(status_code=400, detail=f"type must be one of: {', '.join(SEARCH_SOURCES)}")
+    not_modified = await conditional_get(request, response, *SEARCH_COLLECTIONS)
+    if not_modified:
+        return not_modified
+    await search_index.refresh()
+    page_size = min(max(limit or SEARCH_PAGE_SIZE_DEFAULT, 1), SEARCH_PAGE_SIZE_MAX)
+    return fast_json(search_index.search(q, kind, page_size, max(offset, 0), prefix), response)
 
 # AI Chatbot
-@api_router.post("/chat")
-async def chat(input: ChatMessage):
-    prompt = f"""You are a helpful assistant for MasterSolis InfoTech, an IT consulting company.
+CHAT_MAX_TOKENS = 250
+
+def build_chat_prompt(message: str) -> str:
+    return f"""You are a helpful assistant for MasterSolis InfoTech, an IT consulting company.
     Services: Cloud Solutions, IT Services, Web Development, Full Stack Training, Projects, Internships.
     
-    User question: {input.message}
+    User question: {message}
     
     Provide a helpful, professional response."""
-    
-    response = await generate_ai_content(prompt, 250)
+
+@api_router.post("/chat")
+async def chat(input: ChatMessage):
+    if CHAT_CACHE_ENABLED:
+        cached = chat_cache.lookup(input.message)
+        if cached is not None:
+            return {"response": cached}
+    try:
+        response = await generate_ai_content(build_chat_prompt(input.message), CHAT_MAX_TOKENS)
+    except AIUnavailableError:
+        return {"response": AI_UNAVAILABLE_MESSAGE}
+    if CHAT_CACHE_ENABLED:
+        chat_cache.remember(input.message, response)
     return {"response": response}
 
+@api_router.post("/chat/stream")
+async def chat_stream(input: ChatMessage):
+    """Stream the chat answer token by token as Server-Sent Events
+    
+    Emits `token` events ({"text"}), then one `done` event with timing stats
+    (ttft_ms, total_ms, tokens, cached) or an `error` event. Each frame is
+    yielded only after the previous one was sent, so a slow client throttles
+    the upstream read; a disconnect cancels the generator and with it the
+    upstream generation.
+    """
+    prompt = build_chat_prompt(input.message)
+    parameters = generation_parameters(CHAT_MAX_TOKENS)
+    cache_key = AIResponseCache.make_key(HF_MODEL, prompt, parameters) if AI_CACHE_ENABLED else None
+    
+    async def event_stream():
+        started = time.monotonic()
+        first_token_at = None
+        parts = []
+        cached = chat_cache.lookup(input.message) if CHAT_CACHE_ENABLED else None
+        if cached is None and cache_key:
+            cached = await ai_cache.get(cache_key)
+        try:
+            if cached is not None:
+                first_token_at = time.monotonic()
+                parts.append(cached)
+                yield sse_event("token", {"text": cached})
+            else:
+                async for token in stream_ai_tokens(prompt, CHAT_MAX_TOKENS):
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                    parts.append(token)
+                    yield sse_event("token", {"text": token})
+        except asyncio.CancelledError:
+            logging.info(f"Chat stream cancelled by client after {len(parts)} tokens")
+            raise
+        except Exception as e:
+            logging.error(f"AI streaming error: {str(e)}")
+            yield sse_event("error", {
+                "message": AI_UNAVAILABLE_MESSAGE,
+                "reason": getattr(e, 'reason', "upstream_error"),
+                "retry_after": getattr(e, 'retry_after', None)
+            })
+            return
+        
+        content = "".join(parts).strip()
+        if cached is None and content:
+            if cache_key:
+                await ai_cache.set(cache_key, content)
+            if CHAT_CACHE_ENABLED:
+                chat_cache.remember(input.message, content)
+        yield sse_event("done", {
+            "ttft_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+            "total_ms": round((time.monotonic() - started) * 1000, 1),
+            "tokens": len(parts) if cached is None else None,
+            "cached": cached is not None
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Admin Authentication
-@api_router.post("/admin/register")
+@api_router.post("/admin/register", dependencies=[Depends(require_admin)])
 async def register_admin(input: AdminLogin):
+    """Create another admin account; only a signed-in admin can do this"""
     # Check if admin exists
     existing = await db.admin_users.find_one({"username": input.username})
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
     
-    # Hash password
-    password_hash = bcrypt.hashpw(input.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    password_hash = await password_hasher.hash(input.password)
     
     admin = AdminUser(
         username=input.username,
@@ -1097,53 +4755,268 @@ async def register_admin(input: AdminLogin):
     )
     
     doc = admin.model_dump()
-    doc['created_date'] = doc['created_date'].isoformat()
     
-    await db.admin_users.insert_one(doc)
+    try:
+        await db.admin_users.insert_one(doc)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration (username is uniquely indexed)
+        raise HTTPException(status_code=400, detail="Username already exists")
     return {"message": "Admin registered successfully", "admin_id": admin.id}
 
 @api_router.post("/admin/login")
-async def login_admin(input: AdminLogin):
+async def login_admin(input: AdminLogin, request: Request):
+    login_limiter.check(input.username, request.client.host if request.client else "unknown")
     admin = await db.admin_users.find_one({"username": input.username})
-    if not admin:
+    if not admin or not await password_hasher.verify(input.password, admin['password_hash']):
+        login_limiter.failed(input.username)
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_limiter.succeeded(input.username)
     
-    # Verify password
-    if not bcrypt.checkpw(input.password.encode('utf-8'), admin['password_hash'].encode('utf-8')):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    return {"message": "Login successful", "admin_id": admin['id'], "username": admin['username']}
+    token, expires = create_admin_token(admin)
+    return {
+        "message": "Login successful",
+        "admin_id": admin['id'],
+        "username": admin['username'],
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_at": expires
+    }
 
 # Analytics
-@api_router.get("/admin/analytics")
+@api_router.get("/admin/analytics", dependencies=[Depends(require_admin)])
 async def get_analytics():
-    total_contacts = await db.contact_submissions.count_documents({})
-    total_applications = await db.job_applications.count_documents({})
-    total_jobs = await db.job_postings.count_documents({"status": "active"})
-    total_blogs = await db.blog_posts.count_documents({"published": True})
-    total_projects = await db.projects.count_documents({})
-    
-    # AI-generated summary
-    summary_prompt = f"""Generate a brief analytics summary:
-    - {total_contacts} contact submissions
-    - {total_applications} job applications
-    - {total_jobs} active job postings
-    - {total_blogs} published blogs
-    - {total_projects} projects
-    
-    Provide 2-3 insights about business health."""
-    
-    ai_summary = await generate_ai_content(summary_prompt, 150)
-    
-    return {
+    (
+        total_contacts, total_applications, total_jobs, total_blogs, total_projects,
+        breakdowns, contacts_daily
+    ) = await asyncio.gather(
+        db.contact_submissions.count_documents({}),
+        db.job_applications.count_documents({}),
+        db.job_postings.count_documents({"status": "active"}),
+        db.blog_posts.count_documents({"published": True}),
+        db.projects.count_documents({}),
+        application_breakdowns(),
+        contacts_per_day(ANALYTICS_CONTACT_DAYS)
+    )
+    counts = {
         "total_contacts": total_contacts,
         "total_applications": total_applications,
         "total_jobs": total_jobs,
         "total_blogs": total_blogs,
-        "total_projects": total_projects,
-        "ai_summary": ai_summary
+        "total_projects": total_projects
+    }
+    
+    # AI-generated summary, reused until the numbers change materially
+    summary = await analytics_summary(counts, breakdowns['applications_by_status'])
+    
+    return {
+        **counts,
+        **breakdowns,
+        "contacts_per_day": contacts_daily,
+        "ai_summary": summary['summary'],
+        "ai_summary_generated_date": summary.get('generated_date')
     }
 
+@api_router.get("/admin/ai-cache", dependencies=[Depends(require_admin)])
+async def get_ai_cache_stats():
+    """Hit/miss counters for the prompt-result cache, and calls coalesced in flight"""
+    return {**ai_cache.stats(), "single_flight": ai_flights.stats()}
+
+@api_router.get("/admin/inference", dependencies=[Depends(require_admin)])
+async def get_inference_stats():
+    """Current concurrency limit and circuit state of the inference guard"""
+    return {"limiter": inference_limiter.stats(), "breaker": inference_breaker.stats()}
+
+@api_router.delete("/admin/ai-cache", dependencies=[Depends(require_admin)])
+async def clear_ai_cache():
+    await ai_cache.clear()
+    return {"message": "AI cache cleared"}
+
+@api_router.get("/admin/catalog-cache", dependencies=[Depends(require_admin)])
+async def get_catalog_cache_stats():
+    """Hit rate and size of this worker's catalog read cache"""
+    return catalog_cache.stats()
+
+@api_router.delete("/admin/catalog-cache", dependencies=[Depends(require_admin)])
+async def clear_catalog_cache():
+    catalog_cache.clear()
+    return {"message": "Catalog cache cleared"}
+
+@api_router.get("/admin/search", dependencies=[Depends(require_admin)])
+async def get_search_stats():
+    """Documents and terms in this worker's search index"""
+    return search_index.stats()
+
+@api_router.get("/admin/chat-cache", dependencies=[Depends(require_admin)])
+async def get_chat_cache_stats():
+    """Hit rate, evictions and lookup latency of the chatbot answer cache"""
+    return chat_cache.stats()
+
+@api_router.delete("/admin/chat-cache", dependencies=[Depends(require_admin)])
+async def clear_chat_cache():
+    chat_cache.clear()
+    return {"message": "Chat cache cleared (pinned answers kept)"}
+
+@api_router.get("/admin/chat-cache/pins", dependencies=[Depends(require_admin)])
+async def get_chat_pins():
+    return chat_cache.pins()
+
+@api_router.post("/admin/chat-cache/pins", response_model=ChatPin, dependencies=[Depends(require_admin)])
+async def create_chat_pin(input: ChatPinCreate):
+    """Pin a curated answer; similar questions are answered with it instead of the model"""
+    pin = ChatPin(**input.model_dump())
+    await chat_cache.pin(pin.model_dump())
+    return pin
+
+@api_router.delete("/admin/chat-cache/pins/{pin_id}", dependencies=[Depends(require_admin)])
+async def delete_chat_pin(pin_id: str):
+    if not await chat_cache.unpin(pin_id):
+        raise HTTPException(status_code=404, detail="Pin not found")
+    return {"message": "Pin removed"}
+
+async def migrate_resume_blobs() -> Dict[str, int]:
+    """One-shot migration: move inline base64 resumes into resume_store"""
+    migrated = 0
+    failed = 0
+    cursor = db.job_applications.find(
+        {"resume_file": {"$exists": True, "$nin": [None, ""]}},
+        {"_id": 0, "id": 1, "resume_file": 1, "resume_filename": 1, "resume_content_type": 1}
+    )
+    async for app in cursor:
+        try:
+            content = base64.b64decode(app['resume_file'])
+            blob = await resume_store.save(
+                app['id'],
+                iter_bytes(content),
+                app.get('resume_filename') or 'resume.pdf',
+                app.get('resume_content_type') or 'application/pdf'
+            )
+            await db.job_applications.update_one(
+                {"id": app['id']},
+                {
+                    "$set": {"resume_file_id": blob['id'], "resume_sha256": blob['sha256'], "resume_file_size": blob['length']},
+                    "$unset": {"resume_file": ""}
+                }
+            )
+            migrated += 1
+        except Exception as e:
+            failed += 1
+            logging.error(f"Could not migrate resume for application {app.get('id')}: {str(e)}")
+    logging.info(f"Resume blob migration finished: migrated={migrated}, failed={failed}")
+    return {"migrated": migrated, "failed": failed}
+
+async def migrate_media() -> Dict[str, int]:
+    """One-shot migration: move inline base64 images into media_store, leaving URLs behind"""
+    migrated = 0
+    failed = 0
+    for collection, fields in MEDIA_FIELDS.items():
+        names = [field.removesuffix('[]') for field in fields]
+        inline = [
+            {name: {"$elemMatch": {"$not": {"$regex": "^(/api/media/|https?://)"}}}} if field.endswith('[]')
+            else {name: {"$type": "string", "$not": {"$regex": "^(/api/media/|https?://|$)"}}}
+            for name, field in zip(names, fields)
+        ]
+        cursor = db[collection].find({"$or": inline}, {"_id": 1, **{name: 1 for name in names}})
+        async for doc in cursor:
+            try:
+                original = {name: doc[name] for name in names if name in doc}
+                updates = await externalize_media_fields(collection, dict(original))
+                if updates != original:
+                    await db[collection].update_one({"_id": doc['_id']}, {"$set": updates})
+                    migrated += 1
+            except Exception as e:
+                failed += 1
+                logging.error(f"Could not migrate images for {collection} {doc['_id']}: {getattr(e, 'detail', str(e))}")
+    await catalog_changed(*MEDIA_FIELDS)
+    logging.info(f"Media migration finished: migrated={migrated}, failed={failed}")
+    return {"migrated": migrated, "failed": failed}
+
+# Convert leftover string dates before serving, so cursors and analytics only ever see datetimes
+MIGRATE_DATES_ON_STARTUP = env_flag('MIGRATE_DATES_ON_STARTUP', True)
+
+# Date fields stored as ISO-8601 strings before dates were stored natively
+DATE_FIELDS: Dict[str, List[str]] = {
+    "contact_submissions": ["timestamp"],
+    "job_postings": ["posted_date"],
+    "job_applications": ["applied_date", "analyzed_date", "ai_analysis.rescored_date"],
+    "blog_posts": ["created_date", "updated_date"],
+    "testimonials": ["created_date"],
+    "projects": ["created_date"],
+    "case_studies": ["created_date"],
+    "resumes": ["created_at", "updated_at"],
+    "admin_users": ["created_date"],
+    "rescore_runs": ["started_date", "finished_date"],
+    "media": ["created_date"],
+    "chat_pins": ["created_date"],
+    "analytics_summaries": ["generated_date"]
+}
+
+async def migrate_native_dates() -> Dict[str, int]:
+    """One-shot migration: convert ISO-8601 string dates to BSON datetimes (UTC)"""
+    converted = 0
+    failed = 0
+    for collection, fields in DATE_FIELDS.items():
+        cursor = db[collection].find(
+            {"$or": [{field: {"$type": "string"}} for field in fields]},
+            {"_id": 1, **{field: 1 for field in fields}}
+        )
+        batch = []
+        async for doc in cursor:
+            updates = {}
+            for field in fields:
+                value = doc
+                for part in field.split('.'):
+                    value = value.get(part) if isinstance(value, dict) else None
+                if not isinstance(value, str):
+                    continue
+                try:
+                    parsed = datetime.fromisoformat(value)
+                except ValueError:
+                    failed += 1
+                    logging.error(f"Unparseable date {collection}.{field} on {doc['_id']}: {value!r}")
+                    continue
+                updates[field] = parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+            if updates:
+                batch.append(UpdateOne({"_id": doc['_id']}, {"$set": updates}))
+            if len(batch) >= RESCORE_BATCH_SIZE:
+                await db[collection].bulk_write(batch, ordered=False)
+                converted += len(batch)
+                batch = []
+        if batch:
+            await db[collection].bulk_write(batch, ordered=False)
+            converted += len(batch)
+    if converted:
+        await catalog_changed(*DATE_FIELDS)
+    logging.info(f"Date migration finished: converted={converted}, failed={failed}")
+    return {"converted": converted, "failed": failed}
+
+@api_router.post("/admin/migrations/dates", dependencies=[Depends(require_admin)])
+async def run_date_migration():
+    return await migrate_native_dates()
+
+@api_router.post("/admin/migrations/media", dependencies=[Depends(require_admin)])
+async def run_media_migration():
+    return await migrate_media()
+
+@api_router.post("/admin/migrations/resume-blobs", dependencies=[Depends(require_admin)])
+async def run_resume_blob_migration():
+    return await migrate_resume_blobs()
+
+@api_router.get("/admin/query-plans", dependencies=[Depends(require_admin)])
+async def get_query_plans():
+    """explain() every route's query shape; any COLLSCAN means an index is missing"""
+    report = await verify_query_plans()
+    return {"ok": all(entry['ok'] for entry in report), "queries": report}
+
+@api_router.get("/admin/task-queue", dependencies=[Depends(require_admin)])
+async def get_task_queue_stats():
+    """Queue depth, throughput and worker utilisation for background tasks"""
+    return await task_queue.stats()
+
+@api_router.get("/admin/email-outbox", dependencies=[Depends(require_admin)])
+async def get_email_outbox_stats():
+    """Pending and failed acknowledgment emails, and this worker's send counters"""
+    return await email_outbox.stats()
+
 app.include_router(api_router)
 
 app.add_middleware(
@@ -1152,6 +5025,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 logging.basicConfig(
@@ -1160,6 +5034,111 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_http_client():
+    get_http_client()
+    logger.info(f"Inference client ready: http2={HF_HTTP2}, max_connections={HF_MAX_CONNECTIONS}, keepalive={HF_MAX_KEEPALIVE_CONNECTIONS}")
+
+@app.on_event("startup")
+async def startup_indexes():
+    if ENSURE_INDEXES_ON_STARTUP:
+        await ensure_indexes()
+
+@app.on_event("startup")
+async def startup_date_migration():
+    if MIGRATE_DATES_ON_STARTUP:
+        try:
+            await migrate_native_dates()
+        except Exception as e:
+            logging.error(f"Date migration failed: {str(e)}")
+
+@app.on_event("startup")
+async def startup_bootstrap_admin():
+    try:
+        await ensure_bootstrap_admin()
+    except Exception as e:
+        logging.error(f"Creating the bootstrap admin failed: {str(e)}")
+
+@app.on_event("startup")
+async def startup_chat_cache():
+    if CHAT_CACHE_ENABLED:
+        try:
+            await chat_cache.load_pins()
+        except Exception as e:
+            logger.error(f"Could not load pinned chat answers: {str(e)}")
+
+@app.on_event("startup")
+async def startup_catalog_watcher():
+    global catalog_watcher
+    if CATALOG_CACHE_ENABLED and CATALOG_CACHE_CHANGE_STREAMS:
+        catalog_watcher = asyncio.create_task(watch_catalog_changes())
+
+@app.on_event("startup")
+async def startup_task_queue():
+    task_queue.start()
+
+@app.on_event("startup")
+async def startup_email_outbox():
+    email_outbox.start()
+
+@app.on_event("startup")
+async def startup_extraction_pool():
+    get_extraction_pool()
+
+@app.on_event("shutdown")
+async def shutdown_extraction_pool():
+    if extraction_pool is not None:
+        extraction_pool.executor.shutdown(wait=False, cancel_futures=True)
+
+@app.on_event("shutdown")
+async def shutdown_catalog_watcher():
+    global catalog_watcher
+    if catalog_watcher is not None:
+        catalog_watcher.cancel()
+        await asyncio.gather(catalog_watcher, return_exceptions=True)
+        catalog_watcher = None
+
+@app.on_event("shutdown")
+async def shutdown_password_hasher():
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_email_outbox():
+    await email_outbox.stop()
+
+@app.on_event("shutdown")
+async def shutdown_task_queue():
+    await task_queue.stop()
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="MasterSolis backend maintenance commands")
+    parser.add_argument("command", choices=["migrate-resumes", "migrate-media", "migrate-dates", "ensure-indexes", "check-indexes"])
+    args = parser.parse_args()
+    
+    if args.command == "migrate-resumes":
+        print(json.dumps(asyncio.run(migrate_resume_blobs())))
+    elif args.command == "migrate-media":
+        print(json.dumps(asyncio.run(migrate_media())))
+    elif args.command == "migrate-dates":
+        print(json.dumps(asyncio.run(migrate_native_dates())))
+    elif args.command == "ensure-indexes":
+        print(json.dumps(asyncio.run(ensure_indexes()), indent=2))
+    elif args.command == "check-indexes":
+        report = asyncio.run(verify_query_plans())
+        for entry in report:
+            flag = "OK " if entry['ok'] else "BAD"
+            print(f"{flag} {entry['route']:<40} {entry['collection']:<20} {' <- '.join(entry.get('stages', [])) or entry.get('error')}")
+        raise SystemExit(0 if all(entry['ok'] for entry in report) else 1)
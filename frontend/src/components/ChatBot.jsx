@@ -16,6 +16,56 @@ const ChatBot = () => {
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
 
+  const appendToLastBotMessage = (text) => {
+    setMessages(prev => {
+      const last = prev[prev.length - 1];
+      return [...prev.slice(0, -1), { ...last, text: last.text + text }];
+    });
+  };
+
+  // Reads the /chat/stream SSE response and appends tokens as they arrive.
+  // Returns false if the stream failed before producing any text.
+  const streamReply = async (userMessage) => {
+    const response = await fetch(`${API}/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify({ message: userMessage })
+    });
+    if (!response.ok || !response.body) return false;
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let received = false;
+    let started = false;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop();
+      for (const frame of frames) {
+        const event = (frame.match(/^event: (.*)$/m) || [])[1];
+        const data = (frame.match(/^data: (.*)$/m) || [])[1];
+        if (!data) continue;
+        const payload = JSON.parse(data);
+        if (event === 'token') {
+          if (!started) {
+            setLoading(false);
+            setMessages(prev => [...prev, { type: 'bot', text: '' }]);
+            started = true;
+          }
+          appendToLastBotMessage(payload.text);
+          received = true;
+        } else if (event === 'error') {
+          return received;
+        }
+      }
+    }
+    return received;
+  };
+
   const sendMessage = async () => {
     if (!input.trim()) return;
 
@@ -25,8 +75,11 @@ const ChatBot = () => {
     setLoading(true);
 
     try {
-      const response = await axios.post(`${API}/chat`, { message: userMessage });
-      setMessages(prev => [...prev, { type: 'bot', text: response.data.response }]);
+      const streamed = await streamReply(userMessage).catch(() => false);
+      if (!streamed) {
+        const response = await axios.post(`${API}/chat`, { message: userMessage });
+        setMessages(prev => [...prev, { type: 'bot', text: response.data.response }]);
+      }
     } catch (error) {
       console.error('Chat error:', error);
       toast.error('Failed to get response. Please try again.');
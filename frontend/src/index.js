@@ -2,6 +2,9 @@ import React from "react";
 import ReactDOM from "react-dom/client";
 import "@/index.css";
 import App from "@/App";
+import { installAuthInterceptors } from "@/lib/auth";
+
+installAuthInterceptors();
 
 const root = ReactDOM.createRoot(document.getElementById("root"));
 root.render(
@@ -0,0 +1,48 @@
+import axios from 'axios';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
+const STORAGE_KEY = 'admin';
+
+// The admin session saved by AdminLogin: the login response, including the
+// signed access_token and its expires_at. Expired or token-less sessions
+// (saved before tokens existed) count as logged out.
+export function getAdminSession() {
+  try {
+    const session = JSON.parse(localStorage.getItem(STORAGE_KEY));
+    if (!session?.access_token) return null;
+    if (session.expires_at && new Date(session.expires_at) <= new Date()) return null;
+    return session;
+  } catch {
+    return null;
+  }
+}
+
+export function saveAdminSession(session) {
+  localStorage.setItem(STORAGE_KEY, JSON.stringify(session));
+}
+
+export function clearAdminSession() {
+  localStorage.removeItem(STORAGE_KEY);
+}
+
+// Send the session token with every backend request, and return to the login
+// page when an admin page is told the session is no longer valid.
+export function installAuthInterceptors() {
+  axios.interceptors.request.use((config) => {
+    const session = getAdminSession();
+    if (session && config.url?.startsWith(BACKEND_URL) && !config.headers.Authorization) {
+      config.headers.Authorization = `Bearer ${session.access_token}`;
+    }
+    return config;
+  });
+  axios.interceptors.response.use(
+    (response) => response,
+    (error) => {
+      if (error.response?.status === 401 && getAdminSession() && window.location.pathname.startsWith('/admin')) {
+        clearAdminSession();
+        window.location.assign('/admin/login');
+      }
+      return Promise.reject(error);
+    }
+  );
+}
@@ -0,0 +1,13 @@
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
+
+// Resolve a stored image value to an <img> src. Media URLs (/api/media/<sha256>)
+// are served by the backend; pass a width to get a downscaled WebP variant.
+// Data URLs and bare base64 from older records are still accepted.
+export function mediaSrc(value, width) {
+  if (!value) return value;
+  if (value.startsWith('/api/media/')) {
+    return `${BACKEND_URL}${value}${width ? `?w=${width}` : ''}`;
+  }
+  if (value.startsWith('data:') || value.startsWith('http')) return value;
+  return `data:image/jpeg;base64,${value}`;
+}
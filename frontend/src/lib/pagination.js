@@ -0,0 +1,20 @@
+import axios from 'axios';
+
+const PAGE_SIZE = 500;
+
+// GET every page of a list endpoint. The backend returns one page at a time
+// and sets X-Next-Cursor while more items follow; keep requesting until it
+// stops. Resolves to { data } like axios.get, with all items concatenated.
+export async function getAllPages(url, config = {}) {
+  const data = [];
+  let cursor;
+  do {
+    const response = await axios.get(url, {
+      ...config,
+      params: { limit: PAGE_SIZE, ...config.params, ...(cursor ? { cursor } : {}) }
+    });
+    data.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { data };
+}
@@ -5,12 +5,21 @@ import { Button } from '@/components/ui/button';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { Badge } from '@/components/ui/badge';
 import axios from 'axios';
+import { getAllPages } from '@/lib/pagination';
 import { toast } from 'sonner';
+import { mediaSrc } from '@/lib/media';
+import { getAdminSession, clearAdminSession } from '@/lib/auth';
 import { BarChart3, FileText, Briefcase, Users, LogOut, TrendingUp, Download, Plus, CheckCircle, XCircle, Edit, Trash2, BookOpen } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
 const API = `${BACKEND_URL}/api`;
 
+// Statuses set by the analysis pipeline; others are shown as stored
+const STATUS_LABELS = {
+  pending_analysis: 'Analyzing',
+  analysis_failed: 'Analysis failed',
+};
+
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const location = useLocation();
@@ -23,12 +32,13 @@ const AdminDashboard = () => {
   const [blogs, setBlogs] = useState([]);
 
   useEffect(() => {
-    const adminData = localStorage.getItem('admin');
-    if (!adminData) {
+    const session = getAdminSession();
+    if (!session) {
+      clearAdminSession();
       navigate('/admin/login');
       return;
     }
-    setAdmin(JSON.parse(adminData));
+    setAdmin(session);
     loadDashboardData();
   }, []);
 
@@ -64,10 +74,10 @@ const AdminDashboard = () => {
     try {
       const [analyticsRes, applicationsRes, contactsRes, jobsRes, blogsRes] = await Promise.all([
         axios.get(`${API}/admin/analytics`),
-        axios.get(`${API}/applications`),
-        axios.get(`${API}/contact`),
-        axios.get(`${API}/jobs`),
-        axios.get(`${API}/blog`)
+        getAllPages(`${API}/applications`),
+        getAllPages(`${API}/contact`),
+        getAllPages(`${API}/jobs`),
+        getAllPages(`${API}/blog`)
       ]);
 
       setAnalytics(analyticsRes.data);
@@ -91,7 +101,7 @@ const AdminDashboard = () => {
   };
 
   const handleLogout = () => {
-    localStorage.removeItem('admin');
+    clearAdminSession();
     toast.success('Logged out successfully');
     navigate('/admin/login');
   };
@@ -107,6 +117,19 @@ const AdminDashboard = () => {
     }
   };
 
+  // The resume route needs the session token, which window.open cannot send
+  const downloadResume = async (appId) => {
+    try {
+      const response = await axios.get(`${API}/applications/${appId}/resume`, { responseType: 'blob' });
+      const url = URL.createObjectURL(response.data);
+      window.open(url, '_blank');
+      setTimeout(() => URL.revokeObjectURL(url), 60000);
+    } catch (error) {
+      console.error('Error downloading resume:', error);
+      toast.error('Failed to download resume');
+    }
+  };
+
   const deleteJob = async (jobId) => {
     if (!window.confirm('Are you sure you want to delete this job posting? This action cannot be undone.')) {
       return;
@@ -325,12 +348,14 @@ const AdminDashboard = () => {
                             <div className="flex flex-col space-y-2">
                               <Badge className={`
                                 ${app.status === 'pending' ? 'bg-yellow-100 text-yellow-800' : ''}
+                                ${app.status === 'pending_analysis' ? 'bg-sky-100 text-sky-800' : ''}
+                                ${app.status === 'analysis_failed' ? 'bg-orange-100 text-orange-800' : ''}
                                 ${app.status === 'reviewing' ? 'bg-blue-100 text-blue-800' : ''}
                                 ${app.status === 'shortlisted' ? 'bg-green-100 text-green-800' : ''}
                                 ${app.status === 'selected' ? 'bg-green-100 text-green-800' : ''}
                                 ${app.status === 'rejected' ? 'bg-red-100 text-red-800' : ''}
                               `}>
-                                {app.status}
+                                {STATUS_LABELS[app.status] || app.status}
                               </Badge>
                               <Button
                                 size="sm"
@@ -354,7 +379,7 @@ const AdminDashboard = () => {
                                   size="sm"
                                   variant="outline"
                                   className="text-blue-600"
-                                  onClick={() => window.open(`${API}/applications/${app.id}/resume`, '_blank')}
+                                  onClick={() => downloadResume(app.id)}
                                 >
                                   <Download className="mr-1" size={14} />
                                   Download Resume
@@ -403,7 +428,7 @@ const AdminDashboard = () => {
                                   size="sm"
                                   variant="outline"
                                   className="text-blue-600"
-                                  onClick={() => window.open(`${API}/applications/${app.id}/resume`, '_blank')}
+                                  onClick={() => downloadResume(app.id)}
                                 >
                                   <Download className="mr-1" size={14} />
                                   Download Resume
@@ -452,7 +477,7 @@ const AdminDashboard = () => {
                                   size="sm"
                                   variant="outline"
                                   className="text-blue-600"
-                                  onClick={() => window.open(`${API}/applications/${app.id}/resume`, '_blank')}
+                                  onClick={() => downloadResume(app.id)}
                                 >
                                   <Download className="mr-1" size={14} />
                                   Download Resume
@@ -674,7 +699,7 @@ const AdminDashboard = () => {
                           {blog.featured_image && (
                             <div className="mb-3 rounded-lg overflow-hidden">
                               <img
-                                src={blog.featured_image.startsWith('data:') ? blog.featured_image : `data:image/jpeg;base64,${blog.featured_image}`}
+                                src={mediaSrc(blog.featured_image, 640)}
                                 alt={blog.title}
                                 className="w-full h-48 object-cover"
                               />
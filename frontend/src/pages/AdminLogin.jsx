@@ -8,6 +8,7 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import axios from 'axios';
 import { toast } from 'sonner';
 import { Shield } from 'lucide-react';
+import { saveAdminSession } from '@/lib/auth';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
 const API = `${BACKEND_URL}/api`;
@@ -24,12 +25,16 @@ const AdminLogin = () => {
 
     try {
       const response = await axios.post(`${API}/admin/login`, loginData);
-      localStorage.setItem('admin', JSON.stringify(response.data));
+      saveAdminSession(response.data);
       toast.success('Login successful!');
       navigate('/admin/dashboard');
     } catch (error) {
       console.error('Login error:', error);
-      toast.error('Invalid credentials');
+      if (error.response?.status === 429) {
+        toast.error('Too many login attempts. Please wait a few minutes and try again.');
+      } else {
+        toast.error('Invalid credentials');
+      }
     } finally {
       setLoading(false);
     }
@@ -45,7 +50,11 @@ const AdminLogin = () => {
       setRegisterData({ username: '', password: '' });
     } catch (error) {
       console.error('Register error:', error);
-      toast.error('Failed to register. Username may already exist.');
+      if (error.response?.status === 401) {
+        toast.error('Only a signed-in admin can register new admins. Log in first.');
+      } else {
+        toast.error('Failed to register. Username may already exist.');
+      }
     } finally {
       setLoading(false);
     }
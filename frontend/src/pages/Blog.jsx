@@ -4,7 +4,8 @@ import { Card, CardContent } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
-import axios from 'axios';
+import { getAllPages } from '@/lib/pagination';
+import { mediaSrc } from '@/lib/media';
 import { Calendar, User, ArrowRight } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
@@ -19,7 +20,7 @@ const Blog = () => {
 
   const loadPosts = async () => {
     try {
-      const response = await axios.get(`${API}/blog?published=true`);
+      const response = await getAllPages(`${API}/blog`, { params: { published: true } });
       setPosts(response.data);
     } catch (error) {
       console.error('Error loading blog posts:', error);
@@ -68,7 +69,7 @@ const Blog = () => {
                   {post.featured_image && (
                     <div className="h-48 overflow-hidden">
                       <img
-                        src={post.featured_image.startsWith('data:') ? post.featured_image : `data:image/jpeg;base64,${post.featured_image}`}
+                        src={mediaSrc(post.featured_image, 640)}
                         alt={post.title}
                         className="w-full h-full object-cover transition-transform duration-300 hover:scale-105"
                       />
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { useParams, Link } from 'react-router-dom';
+import { useParams, Link, useNavigate } from 'react-router-dom';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import { Card, CardContent } from '@/components/ui/card';
@@ -8,12 +8,14 @@ import Footer from '@/components/Footer';
 import axios from 'axios';
 import { Calendar, User, ArrowLeft, Sparkles } from 'lucide-react';
 import { toast } from 'sonner';
+import { mediaSrc } from '@/lib/media';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
 const API = `${BACKEND_URL}/api`;
 
 const BlogPost = () => {
   const { slug } = useParams();
+  const navigate = useNavigate();
   const [post, setPost] = useState(null);
   const [summary, setSummary] = useState('');
   const [loadingSummary, setLoadingSummary] = useState(false);
@@ -26,6 +28,10 @@ const BlogPost = () => {
     try {
       const response = await axios.get(`${API}/blog/${slug}`);
       const postData = response.data;
+      // Renamed posts are redirected by the API; keep the address bar on the current slug
+      if (postData.slug && postData.slug !== slug) {
+        navigate(`/blog/${postData.slug}`, { replace: true });
+      }
       setPost(postData);
       // If summary exists, set it
       if (postData.summary) {
@@ -111,7 +117,7 @@ const BlogPost = () => {
           {post.featured_image && (
             <div className="mb-12 rounded-2xl overflow-hidden shadow-xl">
               <img
-                src={post.featured_image.startsWith('data:') ? post.featured_image : `data:image/jpeg;base64,${post.featured_image}`}
+                src={mediaSrc(post.featured_image, 960)}
                 alt={post.title}
                 className="w-full h-96 object-cover"
               />
@@ -174,7 +180,7 @@ const BlogPost = () => {
                 {post.images.map((img, index) => (
                   <div key={index} className="rounded-lg overflow-hidden shadow-md">
                     <img
-                      src={img.startsWith('data:') ? img : `data:image/jpeg;base64,${img}`}
+                      src={mediaSrc(img, 960)}
                       alt={`Content ${index + 1}`}
                       className="w-full h-64 object-cover"
                     />
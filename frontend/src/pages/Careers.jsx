@@ -9,6 +9,7 @@ import { Badge } from '@/components/ui/badge';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import axios from 'axios';
+import { getAllPages } from '@/lib/pagination';
 import { toast } from 'sonner';
 import { MapPin, Briefcase, Clock, Upload, CheckCircle, XCircle, FileSearch } from 'lucide-react';
 
@@ -38,7 +39,7 @@ const Careers = () => {
 
   const loadJobs = async () => {
     try {
-      const response = await axios.get(`${API}/jobs?status=active`);
+      const response = await getAllPages(`${API}/jobs`, { params: { status: 'active' } });
       setJobs(response.data);
     } catch (error) {
       console.error('Error loading jobs:', error);
@@ -106,7 +107,7 @@ const Careers = () => {
     try {
       const encodedEmail = encodeURIComponent(statusEmail);
       console.log('Checking status for email:', statusEmail);
-      const response = await axios.get(`${API}/applications/by-email/${encodedEmail}`);
+      const response = await getAllPages(`${API}/applications/by-email/${encodedEmail}`);
       console.log('Applications found:', response.data);
       setUserApplications(response.data);
       setShowStatusDialog(true);
@@ -137,6 +138,13 @@ const Careers = () => {
           <span className="font-semibold">Rejected (Accuracy: {accuracy}%)</span>
         </div>
       );
+    } else if (status === 'pending_analysis') {
+      return (
+        <div className="flex items-center gap-2 text-blue-600">
+          <FileSearch size={16} />
+          <span className="font-semibold">Analyzing Resume</span>
+        </div>
+      );
     } else if (status === 'reviewing') {
       return (
         <div className="flex items-center gap-2 text-blue-600">
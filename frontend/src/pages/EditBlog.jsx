@@ -8,6 +8,7 @@ import { Textarea } from '@/components/ui/textarea';
 import { Badge } from '@/components/ui/badge';
 import axios from 'axios';
 import { toast } from 'sonner';
+import { mediaSrc } from '@/lib/media';
 import { ArrowLeft, Plus, X, Save, Image as ImageIcon } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
@@ -49,17 +50,14 @@ const EditBlog = () => {
       
       if (blog.featured_image) {
         setExistingFeaturedImage(blog.featured_image);
-        setFeaturedImagePreview(
-          blog.featured_image.startsWith('data:') 
-            ? blog.featured_image 
-            : `data:image/jpeg;base64,${blog.featured_image}`
-        );
+        setFeaturedImagePreview(mediaSrc(blog.featured_image, 640));
       }
       
       if (blog.images && blog.images.length > 0) {
+        // Media URLs are kept as-is; legacy base64 is shown as a data URL
         setContentImages(
           blog.images.map(img => 
-            img.startsWith('data:') ? img : `data:image/jpeg;base64,${img}`
+            img.startsWith('/api/media/') || img.startsWith('data:') ? img : `data:image/jpeg;base64,${img}`
           )
         );
       }
@@ -176,7 +174,7 @@ const EditBlog = () => {
         author: formData.author,
         tags: formData.tags,
         featured_image: featuredImageBase64,
-        images: contentImages.map(img => img.split(',')[1]), // Remove data:image/...;base64, prefix
+        images: contentImages.map(img => img.startsWith('data:') ? img.split(',')[1] : img), // Remove data:image/...;base64, prefix
         published: formData.published
       };
 
@@ -318,7 +316,7 @@ const EditBlog = () => {
                     {contentImages.map((img, index) => (
                       <div key={index} className="relative group">
                         <img
-                          src={img}
+                          src={mediaSrc(img, 320)}
                           alt={`Content ${index + 1}`}
                           className="w-full h-32 object-cover rounded-lg border"
                         />
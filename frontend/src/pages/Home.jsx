@@ -6,7 +6,7 @@ import { Card, CardContent } from '@/components/ui/card';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import ChatBot from '@/components/ChatBot';
-import axios from 'axios';
+import { getAllPages } from '@/lib/pagination';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
 const API = `${BACKEND_URL}/api`;
@@ -20,7 +20,7 @@ const Home = () => {
 
   const loadTestimonials = async () => {
     try {
-      const response = await axios.get(`${API}/testimonials?featured=true`);
+      const response = await getAllPages(`${API}/testimonials`, { params: { featured: true } });
       setTestimonials(response.data.slice(0, 3));
     } catch (error) {
       console.error('Error loading testimonials:', error);
@@ -5,7 +5,8 @@ import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
-import axios from 'axios';
+import { getAllPages } from '@/lib/pagination';
+import { mediaSrc } from '@/lib/media';
 import { Search } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
@@ -28,7 +29,7 @@ const Projects = () => {
 
   const loadProjects = async () => {
     try {
-      const response = await axios.get(`${API}/projects`);
+      const response = await getAllPages(`${API}/projects`);
       setProjects(response.data);
       
       // Extract unique categories
@@ -131,7 +132,7 @@ const Projects = () => {
                   {project.image && (
                     <div className="h-48 overflow-hidden bg-gradient-to-br from-sky-100 to-orange-100">
                       <img
-                        src={project.image}
+                        src={mediaSrc(project.image, 640)}
                         alt={project.title}
                         className="w-full h-full object-cover"
                       />
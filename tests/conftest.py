@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# server.py reads its configuration at import time; keep unit tests off any real services
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "ats_unit_tests")
+os.environ.setdefault("HUGGINGFACE_API_KEY", "test")
+os.environ.setdefault("ADMIN_JWT_SECRET", "test-secret")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
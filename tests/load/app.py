@@ -0,0 +1,49 @@
+"""Run the backend for a load test, optionally on an in-memory MongoDB
+
+    python -m tests.load.app --port 8001 --mongo mongomock
+    python -m tests.load.app --port 8001 --mongo mongodb://localhost:27017 --reset
+
+Configuration otherwise comes from the environment as in production; set
+HUGGINGFACE_API_URL to a fake inference server (see fake_inference.py).
+With --mongo mongomock the whole app runs in this single process against
+mongomock-motor, which is convenient but slower than a real server.
+--reset drops the database named by DB_NAME before serving.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--mongo", default="mongomock", help="'mongomock' or a MongoDB connection string")
+    parser.add_argument("--reset", action="store_true", help="drop the DB_NAME database first")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DB_NAME", "ats_loadtest")
+    if args.mongo != "mongomock":
+        os.environ["MONGO_URL"] = args.mongo
+        if args.reset:
+            from pymongo import MongoClient
+            with MongoClient(args.mongo) as sync_client:
+                sync_client.drop_database(os.environ["DB_NAME"])
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+
+    if args.mongo == "mongomock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--mongo mongomock needs the dev requirements (pip install -r backend/requirements-dev.txt)")
+        server.client = AsyncMongoMockClient(tz_aware=True)
+        server.db = server.client[os.environ["DB_NAME"]]
+
+    import uvicorn
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
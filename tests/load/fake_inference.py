@@ -0,0 +1,121 @@
+"""Stand-in for the HuggingFace inference API used by the load tests
+
+Serves POST /models/{model} like the hosted endpoint: a JSON list with
+`generated_text`, or Server-Sent Events of `{"token": {...}}` when the
+payload sets "stream". Latency, token rate and failures are configurable:
+
+    python -m tests.load.fake_inference --port 8100 --latency-ms 400 --tokens-per-second 40 --error-rate 0.02
+
+Point the backend at it with HUGGINGFACE_API_URL=http://127.0.0.1:8100/models/fake.
+"""
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass, asdict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ATS_RESULT = {
+    "skills": ["python", "fastapi", "mongodb"],
+    "required_skills_match": 78, "preferred_skills_match": 55,
+    "experience_years": 5, "experience_match": 85,
+    "education": "BSc Computer Science", "education_match": 80,
+    "qualification_match": 72, "overall_fit": 76, "weighted_accuracy": 81,
+    "match_score": 8, "summary": "Solid backend engineer with relevant experience.",
+    "strengths": ["API design"], "weaknesses": ["No cloud certification"],
+    "recommendation": "selected"
+}
+
+@dataclass
+class FakeInferenceConfig:
+    latency_ms: float = 300.0        # time before the first byte
+    jitter_ms: float = 100.0         # uniform +/- added to latency_ms
+    tokens_per_second: float = 50.0  # generation speed after the first byte
+    max_tokens: int = 60             # cap on generated words per answer
+    error_rate: float = 0.0          # share of calls answered 500
+    loading_rate: float = 0.0        # share answered 503 "model is currently loading"
+    loading_seconds: float = 2.0     # estimated_time sent with those
+    throttle_rate: float = 0.0       # share answered 429 with Retry-After
+    seed: int = 0
+
+def generated_text(prompt: str, max_tokens: int) -> str:
+    if "ATS" in prompt:
+        return json.dumps(ATS_RESULT)
+    words = prompt.split()[:max_tokens] or ["ok"]
+    return "Generated: " + " ".join(words)
+
+def create_app(config: FakeInferenceConfig) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    counters = {"requests": 0, "ats": 0, "streams": 0, "errors": 0, "loading": 0, "throttled": 0}
+
+    def injected_failure():
+        roll = rng.random()
+        if roll < config.error_rate:
+            counters["errors"] += 1
+            return JSONResponse({"error": "Internal error"}, status_code=500)
+        roll -= config.error_rate
+        if roll < config.loading_rate:
+            counters["loading"] += 1
+            return JSONResponse(
+                {"error": "Model fake is currently loading", "estimated_time": config.loading_seconds},
+                status_code=503
+            )
+        roll -= config.loading_rate
+        if roll < config.throttle_rate:
+            counters["throttled"] += 1
+            return JSONResponse({"error": "Rate limit reached"}, status_code=429, headers={"Retry-After": "1"})
+        return None
+
+    @app.get("/health")
+    async def health():
+        return {"config": asdict(config), **counters}
+
+    @app.post("/models/{model:path}")
+    async def generate(model: str, request: Request):
+        counters["requests"] += 1
+        payload = await request.json()
+        if "ATS" in payload.get("inputs", ""):
+            counters["ats"] += 1
+        await asyncio.sleep(max(config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms), 0) / 1000)
+        failure = injected_failure()
+        if failure is not None:
+            return failure
+        max_new_tokens = (payload.get("parameters") or {}).get("max_new_tokens") or config.max_tokens
+        text = generated_text(payload.get("inputs", ""), min(max_new_tokens, config.max_tokens))
+        tokens = text.split(" ")
+        token_delay = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+
+        if not payload.get("stream"):
+            await asyncio.sleep(token_delay * len(tokens))
+            return [{"generated_text": text}]
+
+        counters["streams"] += 1
+        async def events():
+            for i, token in enumerate(tokens):
+                await asyncio.sleep(token_delay)
+                event = {"token": {"id": i, "text": (" " if i else "") + token, "special": False}}
+                yield f"data:{json.dumps(event)}\n\n"
+            final = {"token": {"id": len(tokens), "text": "</s>", "special": True}, "generated_text": text}
+            yield f"data:{json.dumps(final)}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    defaults = FakeInferenceConfig()
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    config = FakeInferenceConfig(**{field: getattr(args, field) for field in asdict(defaults)})
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""End-to-end load test for the backend
+
+Starts the fake inference server and the backend (on mongomock-motor unless
+--mongo names a real server), seeds jobs and blog posts through the API,
+then drives a weighted mix of user flows from --concurrency virtual users
+for --duration seconds and prints a JSON report: p50/p95/p99 latency, RPS
+and error rate per route, plus the backend's own cache and inference stats.
+
+    python -m tests.load.run --duration 30 --concurrency 32 --output load.json
+    python -m tests.load.run --mix blog_read=8,chat=2 --error-rate 0.05 --baseline load.json
+
+--baseline adds per-route deltas against an earlier report, so runs can be
+compared across commits. --base-url drives an already running backend
+instead (its inference endpoint is then whatever it is configured with).
+Seeding signs in with ADMIN_USERNAME / ADMIN_PASSWORD, which the started
+backend also uses to create its first admin.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "loadtest")
+ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "loadtest-password")
+
+DEFAULT_MIX = "blog_read=40,chat=20,chat_stream=5,search=10,dashboard=10,resume_upload=10,jobs_read=5"
+
+CHAT_QUESTIONS = [
+    "What cloud services do you offer?",
+    "Do you provide full stack training?",
+    "How can I apply for an internship?",
+    "What technologies does your web development team use?",
+    "Can you help migrate our servers to the cloud?",
+    "Do you offer IT support contracts?",
+]
+SEARCH_QUERIES = ["cloud", "python", "react dev", "migration", "engineer", "data"]
+# Cycled over the seeded jobs. The local pre-scorer only decides jobs with
+# required skills (clear matches and misses); the rest go to the LLM.
+JOB_REQUIRED_SKILLS = [[], ["Python", "FastAPI", "MongoDB", "AWS"], ["Rust", "Kubernetes", "Terraform"]]
+TOPICS = ["cloud migration", "react performance", "python services", "data pipelines", "devops culture", "security basics"]
+
+# ==================== Process Management ====================
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_process(args: List[str], env: Dict[str, str], log_path: Path) -> subprocess.Popen:
+    log = open(log_path, "wb")
+    return subprocess.Popen([sys.executable, "-m", *args], cwd=REPO_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+def stop_process(process: Optional[subprocess.Popen]):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+async def wait_ready(url: str, process: subprocess.Popen, log_path: Path, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited during startup:\n{log_path.read_text()[-2000:]}")
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s:\n{log_path.read_text()[-2000:]}")
+
+# ==================== Statistics ====================
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+class Recorder:
+    """Latency and outcome of every request, grouped by route template"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    async def call(self, route: str, request: Callable[[], Any]) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        response, error = None, None
+        try:
+            response = await request()
+            if response.status_code >= 400:
+                error = str(response.status_code)
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        if self.recording:
+            self.latencies[route].append((time.perf_counter() - started) * 1000)
+            if error:
+                self.errors[route][error] += 1
+        return response if error is None else None
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        def stats(latencies: List[float], errors: Dict[str, int]) -> Dict[str, Any]:
+            ordered = sorted(latencies)
+            failed = sum(errors.values())
+            return {
+                "requests": len(ordered),
+                "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+                "errors": failed,
+                "error_rate": round(failed / len(ordered), 4) if ordered else 0.0,
+                "errors_by_kind": dict(errors),
+                "p50_ms": round(percentile(ordered, 50), 2) if ordered else None,
+                "p95_ms": round(percentile(ordered, 95), 2) if ordered else None,
+                "p99_ms": round(percentile(ordered, 99), 2) if ordered else None,
+                "max_ms": round(ordered[-1], 2) if ordered else None,
+            }
+        routes = {route: stats(values, self.errors[route]) for route, values in sorted(self.latencies.items())}
+        overall_errors: Dict[str, int] = defaultdict(int)
+        for errors in self.errors.values():
+            for kind, count in errors.items():
+                overall_errors[kind] += count
+        overall = stats([value for values in self.latencies.values() for value in values], overall_errors)
+        return {"overall": overall, "routes": routes}
+
+# ==================== Scenarios ====================
+def make_resume() -> bytes:
+    """A small DOCX resume, built once per run"""
+    from docx import Document
+    document = Document()
+    document.add_heading("Jordan Lee", 0)
+    document.add_paragraph("Backend engineer with 5 years of experience in Python, FastAPI, MongoDB and AWS.")
+    document.add_heading("Experience", 1)
+    for line in ["Built REST APIs serving 2M requests/day", "Led migration to containerized deployments", "Mentored four junior developers"]:
+        document.add_paragraph(line, style="List Bullet")
+    document.add_heading("Education", 1)
+    document.add_paragraph("BSc Computer Science")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.admin_headers: Dict[str, str] = {}
+        self.jobs: List[Dict[str, Any]] = []
+        self.slugs: List[str] = []
+        self.resume = make_resume()
+
+    async def seed(self, jobs: int, blogs: int):
+        """Sign in as the bootstrap admin and create the catalog the scenarios read"""
+        credentials = {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+        login = await self.client.post("/api/admin/login", json=credentials)
+        login.raise_for_status()
+        self.admin_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        for i in range(jobs):
+            response = await self.client.post("/api/jobs", json={
+                "title": f"Software Engineer {i}", "department": "Engineering", "location": "Remote",
+                "type": "Full-time", "description": "Build and operate Python services on AWS.",
+                "qualification": "BSc Computer Science", "timings": "9-5",
+                "requirements": ["Python", "FastAPI", "MongoDB"], "responsibilities": ["Ship features", "Review code"],
+                "ats_config": {"required_skills": JOB_REQUIRED_SKILLS[i % len(JOB_REQUIRED_SKILLS)]}
+            }, headers=self.admin_headers)
+            response.raise_for_status()
+            self.jobs.append(response.json())
+
+        async def create_blog(i: int):
+            topic = TOPICS[i % len(TOPICS)]
+            response = await self.client.post("/api/blog", json={
+                "title": f"Notes on {topic} #{i}", "author": "Load Test", "published": True,
+                "content": f"A practical look at {topic}. " * 40, "tags": [topic.split()[0]]
+            }, headers=self.admin_headers)
+            response.raise_for_status()
+            self.slugs.append(response.json()["slug"])
+        for start in range(0, blogs, 8):
+            await asyncio.gather(*(create_blog(i) for i in range(start, min(start + 8, blogs))))
+
+    async def blog_read(self):
+        await self.recorder.call("GET /api/blog", lambda: self.client.get("/api/blog", params={"published": "true", "limit": 20}))
+        slug = self.rng.choice(self.slugs)
+        await self.recorder.call("GET /api/blog/{slug}", lambda: self.client.get(f"/api/blog/{slug}"))
+
+    async def jobs_read(self):
+        await self.recorder.call("GET /api/jobs", lambda: self.client.get("/api/jobs", params={"limit": 20}))
+        job = self.rng.choice(self.jobs)
+        await self.recorder.call("GET /api/jobs/{job_id}", lambda: self.client.get(f"/api/jobs/{job['id']}"))
+
+    async def chat(self):
+        question = self.rng.choice(CHAT_QUESTIONS)
+        await self.recorder.call("POST /api/chat", lambda: self.client.post("/api/chat", json={"message": question}))
+
+    async def chat_stream(self):
+        # Unique questions so every stream reaches the inference server
+        question = f"{self.rng.choice(CHAT_QUESTIONS)} ({self.rng.random():.6f})"
+        async def stream():
+            async with self.client.stream("POST", "/api/chat/stream", json={"message": question}) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("event: error"):
+                        return httpx.Response(502, request=response.request)
+                return response
+        await self.recorder.call("POST /api/chat/stream", stream)
+
+    async def search(self):
+        query = self.rng.choice(SEARCH_QUERIES)
+        await self.recorder.call("GET /api/search", lambda: self.client.get("/api/search", params={"q": query, "limit": 10}))
+
+    async def dashboard(self):
+        await asyncio.gather(
+            self.recorder.call("GET /api/admin/analytics", lambda: self.client.get("/api/admin/analytics", headers=self.admin_headers)),
+            self.recorder.call("GET /api/applications", lambda: self.client.get("/api/applications", params={"limit": 50}, headers=self.admin_headers)),
+            self.recorder.call("GET /api/contact", lambda: self.client.get("/api/contact", params={"limit": 50}, headers=self.admin_headers)),
+        )
+
+    async def resume_upload(self):
+        job = self.rng.choice(self.jobs)
+        n = self.rng.randrange(1_000_000)
+        await self.recorder.call("POST /api/applications", lambda: self.client.post("/api/applications", data={
+            "job_id": job["id"], "job_title": job["title"], "name": f"Applicant {n}",
+            "email": f"applicant{n}@example.com", "phone": "555-0100"
+        }, files={"resume": ("resume.docx", self.resume, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}))
+
+    async def user(self, scenarios: List[str], weights: List[float], stop_at: float):
+        while time.monotonic() < stop_at:
+            scenario = self.rng.choices(scenarios, weights)[0]
+            await getattr(self, scenario)()
+
+# ==================== Report ====================
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(LoadTest, name) or name in ("seed", "user"):
+            raise SystemExit(f"Unknown scenario '{name}' in --mix")
+        weights[name] = float(weight or 1)
+    return weights
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-route change against a baseline report (positive = higher now)"""
+    def delta(now: Dict[str, Any], before: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for key in ("rps", "error_rate", "p50_ms", "p95_ms", "p99_ms"):
+            if now.get(key) is not None and before.get(key) is not None:
+                out[f"{key}_delta"] = round(now[key] - before[key], 4)
+                if key.endswith("_ms") and before[key]:
+                    out[f"{key}_change"] = round(now[key] / before[key] - 1, 4)
+        return out
+    routes = {
+        route: delta(stats, baseline["routes"][route])
+        for route, stats in report["routes"].items() if route in baseline.get("routes", {})
+    }
+    return {"commit": baseline.get("meta", {}).get("commit"), "overall": delta(report["overall"], baseline["overall"]), "routes": routes}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    workdir = Path(tempfile.mkdtemp(prefix="ats-load-"))
+    fake, app = None, None
+    base_url = args.base_url
+    try:
+        if not base_url:
+            fake_port, app_port = free_port(), free_port()
+            fake = start_process([
+                "tests.load.fake_inference", "--port", str(fake_port),
+                "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+                "--tokens-per-second", str(args.tokens_per_second), "--error-rate", str(args.error_rate),
+                "--loading-rate", str(args.loading_rate), "--throttle-rate", str(args.throttle_rate),
+                "--seed", str(args.seed)
+            ], dict(os.environ), workdir / "fake_inference.log")
+            await wait_ready(f"http://127.0.0.1:{fake_port}/health", fake, workdir / "fake_inference.log")
+
+            env = {
+                **os.environ,
+                "HUGGINGFACE_API_URL": f"http://127.0.0.1:{fake_port}/models/fake",
+                "HUGGINGFACE_API_KEY": os.environ.get("HUGGINGFACE_API_KEY", "loadtest"),
+                "ADMIN_JWT_SECRET": os.environ.get("ADMIN_JWT_SECRET", "loadtest-secret"),
+                "ADMIN_USERNAME": ADMIN_USERNAME,
+                "ADMIN_PASSWORD": ADMIN_PASSWORD,
+                "EMAIL_TRANSPORT": "log",
+                "LOGIN_MAX_ATTEMPTS_PER_IP": "1000",
+            }
+            if args.mongo == "mongomock":
+                env.update({"BLOB_STORE_BACKEND": "local", "BLOB_STORE_PATH": str(workdir / "blobs")})
+            app_args = ["tests.load.app", "--port", str(app_port), "--mongo", args.mongo]
+            if args.mongo != "mongomock":
+                app_args.append("--reset")
+            app = start_process(app_args, env, workdir / "backend.log")
+            base_url = f"http://127.0.0.1:{app_port}"
+            await wait_ready(f"{base_url}/api/", app, workdir / "backend.log")
+
+        recorder = Recorder()
+        rng = random.Random(args.seed)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            test = LoadTest(client, recorder, rng)
+            await test.seed(args.seed_jobs, args.seed_blogs)
+
+            scenarios, weights = list(mix), list(mix.values())
+            if args.warmup > 0:
+                warmup_stop = time.monotonic() + args.warmup
+                await asyncio.gather(*(test.user(scenarios, weights, warmup_stop) for _ in range(args.concurrency)))
+
+            recorder.recording = True
+            started = time.monotonic()
+            await asyncio.gather(*(test.user(scenarios, weights, started + args.duration) for _ in range(args.concurrency)))
+            elapsed = time.monotonic() - started
+            recorder.recording = False
+
+            server_stats = {}
+            if fake is not None:
+                server_stats["fake-inference"] = (await client.get(f"http://127.0.0.1:{fake_port}/health")).json()
+            for name in ("ai-cache", "inference", "catalog-cache", "chat-cache", "task-queue"):
+                response = await client.get(f"/api/admin/{name}", headers=test.admin_headers)
+                if response.status_code == 200:
+                    server_stats[name] = response.json()
+
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "duration_s": round(elapsed, 2),
+                "concurrency": args.concurrency,
+                "mix": mix,
+                "mongo": "mongomock" if args.mongo == "mongomock" else "mongodb",
+                "base_url": args.base_url,
+                "fake_inference": None if args.base_url else {
+                    "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+                    "tokens_per_second": args.tokens_per_second, "error_rate": args.error_rate,
+                    "loading_rate": args.loading_rate, "throttle_rate": args.throttle_rate
+                },
+                "seed": args.seed,
+            },
+            **recorder.summary(elapsed),
+            "server": server_stats,
+        }
+        if args.baseline:
+            report["baseline"] = compare(report, json.loads(Path(args.baseline).read_text()))
+        return report
+    finally:
+        stop_process(app)
+        stop_process(fake)
+        if args.keep_logs:
+            print(f"Logs kept in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight list")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--seed-jobs", type=int, default=5)
+    parser.add_argument("--seed-blogs", type=int, default=30)
+    parser.add_argument("--mongo", default="mongomock", help="'mongomock' or a MongoDB connection string (its DB_NAME database is dropped)")
+    parser.add_argument("--base-url", help="drive an already running backend instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--loading-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    parser.add_argument("--max-error-rate", type=float, help="exit non-zero when the overall error rate is higher")
+    parser.add_argument("--keep-logs", action="store_true", help="keep the server logs and print where they are")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if args.max_error_rate is not None and report["overall"]["error_rate"] > args.max_error_rate:
+        sys.exit(f"Error rate {report['overall']['error_rate']} exceeds {args.max_error_rate}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import pytest
+
+from server import ChatAnswerCache, normalize_question
+
+QUESTION = "What services do you offer?"
+
+def cache(max_entries=16, threshold=0.8, permutations=64, bands=16):
+    return ChatAnswerCache("chat_pins", max_entries, threshold, 3, permutations, bands)
+
+def shingles(text, n=3):
+    padded = f" {normalize_question(text)} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+def test_normalize_question():
+    assert normalize_question("  What's   NEW, today?! ") == "what s new today"
+
+def test_permutations_must_split_into_bands():
+    with pytest.raises(ValueError):
+        cache(permutations=60, bands=16)
+
+def test_minhash_estimates_jaccard_similarity():
+    answers = cache(permutations=256, bands=16)
+    first, second = "How do I apply for a job", "How can I apply for the job"
+    exact = len(shingles(first) & shingles(second)) / len(shingles(first) | shingles(second))
+    estimate = (answers.signature(normalize_question(first)) == answers.signature(normalize_question(second))).mean()
+    assert abs(estimate - exact) < 0.15
+
+def test_exact_question_hits_regardless_of_case_and_punctuation():
+    answers = cache()
+    answers.remember(QUESTION, "Web development and AI consulting.")
+    assert answers.lookup("what services do you OFFER") == "Web development and AI consulting."
+    assert answers.counters["exact_hits"] == 1
+
+def test_near_duplicate_question_hits():
+    # Enough permutations that the estimate of the true similarity (0.89) stays above 0.8
+    answers = cache(permutations=256, bands=32)
+    answers.remember(QUESTION, "Web development and AI consulting.")
+    assert answers.lookup("What services do you offers?") == "Web development and AI consulting."
+    assert answers.counters["hits"] == 1
+    assert answers.counters["exact_hits"] == 0
+
+def test_unrelated_question_misses():
+    answers = cache()
+    answers.remember(QUESTION, "Web development and AI consulting.")
+    assert answers.lookup("Where is your office located?") is None
+    assert answers.lookup("?!") is None
+    assert answers.counters["misses"] == 1
+
+def test_least_recently_used_learned_answer_is_evicted():
+    answers = cache(max_entries=2)
+    answers.remember("How do I apply for a job", "Use the careers page.")
+    answers.remember("Where is your office located", "Remote first.")
+    answers.lookup("How do I apply for a job")
+    answers.remember("Do you build mobile apps", "Yes.")
+    assert answers.lookup("Where is your office located") is None
+    assert answers.lookup("How do I apply for a job") == "Use the careers page."
+    assert answers.counters["evictions"] == 1
+
+def test_pinned_answers_survive_eviction_clear_and_relearning():
+    answers = cache(max_entries=1)
+    answers._add("pin-1", QUESTION, "Curated answer.", pinned=True)
+    answers.remember(QUESTION, "Generated answer.")
+    answers.remember("How do I apply for a job", "Use the careers page.")
+    answers.remember("Where is your office located", "Remote first.")
+    assert answers.lookup(QUESTION) == "Curated answer."
+    answers.clear()
+    assert answers.stats()["entries"] == 1
+    assert answers.pins()[0]["id"] == "pin-1"
+
+def test_remembering_the_same_question_replaces_the_answer():
+    answers = cache()
+    answers.remember(QUESTION, "Old answer.")
+    answers.remember(QUESTION.lower(), "New answer.")
+    assert answers.lookup(QUESTION) == "New answer."
+    assert answers.stats()["entries"] == 1
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import server
+from server import ExtractionError, ExtractionPool
+
+def pause(seconds, value):
+    time.sleep(seconds)
+    return value
+
+def slow_extract(content, max_pages, time_budget):
+    return pause(5, "late")
+
+def crashing_extract(content, max_pages, time_budget):
+    os._exit(1)
+
+def test_retiring_lets_other_calls_finish_then_kills_the_stuck_worker():
+    async def scenario():
+        pool = ExtractionPool(2)
+        stuck = asyncio.create_task(pool.run(pause, 30, "stuck", timeout=0.3))
+        other = asyncio.create_task(pool.run(pause, 1.0, "other", timeout=10))
+        with pytest.raises(asyncio.TimeoutError):
+            await stuck
+        pool.retire()
+        assert not pool.closed
+        processes = list(pool.executor._processes.values())
+        result = await other
+        await asyncio.sleep(0.2)
+        return pool, result, processes
+
+    pool, result, processes = asyncio.run(scenario())
+    assert result == "other"
+    assert pool.closed
+    assert not any(process.is_alive() for process in processes)
+
+def test_timeout_moves_new_uploads_to_a_fresh_pool(monkeypatch):
+    monkeypatch.setattr(server, "extraction_pool", None)
+    # The caller waits the budget plus a 5s grace period; make that 0.3s
+    monkeypatch.setattr(server, "EXTRACTION_TIMEOUT_SECONDS", -4.7)
+    monkeypatch.setattr(server, "extract_text_from_pdf", slow_extract)
+
+    async def scenario():
+        first = server.get_extraction_pool()
+        with pytest.raises(ExtractionError):
+            await server.extract_document_text("resume.pdf", b"%PDF")
+        return first, server.get_extraction_pool()
+
+    first, second = asyncio.run(scenario())
+    assert first.closed
+    assert second is not first and not second.closed
+    second.retire()
+
+def test_broken_pool_is_retried_once_on_a_fresh_pool(monkeypatch):
+    monkeypatch.setattr(server, "extraction_pool", None)
+    monkeypatch.setattr(server, "extract_text_from_pdf", crashing_extract)
+
+    async def scenario():
+        with pytest.raises(ExtractionError, match="please try again"):
+            await server.extract_document_text("resume.pdf", b"%PDF")
+
+    asyncio.run(scenario())
+    assert server.extraction_pool is None
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+import server
+from server import AdaptiveLimiter, AIUnavailableError, CircuitBreaker, QueueFullError, schedule_ai_fill
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Only server's view of time is faked; asyncio keeps the real clock
+    fake = FakeClock()
+    monkeypatch.setattr(server, "time", fake)
+    return fake
+
+def limiter(initial=4, minimum=1, maximum=8, backoff=0.5, latency_target=1.0, queue_timeout=0.05):
+    return AdaptiveLimiter(initial, minimum, maximum, backoff, latency_target, queue_timeout)
+
+# ==================== AdaptiveLimiter ====================
+def test_limit_grows_by_inverse_limit_when_saturated():
+    guard = limiter(initial=2)
+    asyncio.run(guard.acquire())
+    asyncio.run(guard.acquire())
+    guard.release(latency=0.1)
+    assert guard.limit == 2.5
+    assert guard.counters["increases"] == 1
+
+def test_limit_does_not_grow_below_saturation():
+    guard = limiter(initial=4)
+    asyncio.run(guard.acquire())
+    guard.release(latency=0.1)
+    assert guard.limit == 4
+    assert guard.counters["increases"] == 0
+
+def test_limit_never_exceeds_maximum():
+    guard = limiter(initial=2, maximum=2)
+    asyncio.run(guard.acquire())
+    asyncio.run(guard.acquire())
+    guard.release(latency=0.1)
+    assert guard.limit == 2
+
+@pytest.mark.parametrize("latency, overloaded", [(0.1, True), (5.0, False)])
+def test_overload_or_slow_call_backs_off(clock, latency, overloaded):
+    guard = limiter(initial=8)
+    asyncio.run(guard.acquire())
+    guard.release(latency=latency, overloaded=overloaded)
+    assert guard.limit == 4
+    assert guard.counters["decreases"] == 1
+
+def test_backs_off_once_per_latency_target(clock):
+    guard = limiter(initial=8, latency_target=1.0)
+    for _ in range(3):
+        asyncio.run(guard.acquire())
+    guard.release(latency=0.1, overloaded=True)
+    guard.release(latency=0.1, overloaded=True)
+    assert guard.limit == 4
+    clock.now += 1.0
+    guard.release(latency=0.1, overloaded=True)
+    assert guard.limit == 2
+    assert guard.counters["decreases"] == 2
+
+def test_backoff_stops_at_minimum(clock):
+    guard = limiter(initial=2, minimum=2)
+    asyncio.run(guard.acquire())
+    guard.release(latency=0.1, overloaded=True)
+    assert guard.limit == 2
+
+def test_waiter_gets_the_released_slot():
+    async def scenario():
+        guard = limiter(initial=1, queue_timeout=1.0)
+        await guard.acquire()
+        waiting = asyncio.create_task(guard.acquire())
+        await asyncio.sleep(0)
+        assert guard.stats()["waiting"] == 1
+        guard.release(latency=0.1)
+        await waiting
+        return guard
+    guard = asyncio.run(scenario())
+    assert guard.in_flight == 1
+    assert guard.counters["queued"] == 1
+    assert guard.counters["rejected"] == 0
+
+def test_waiter_is_rejected_after_queue_timeout():
+    async def scenario():
+        guard = limiter(initial=1, queue_timeout=0.01)
+        await guard.acquire()
+        with pytest.raises(AIUnavailableError) as error:
+            await guard.acquire()
+        return guard, error.value
+    guard, error = asyncio.run(scenario())
+    assert error.reason == "overloaded"
+    assert guard.in_flight == 1
+    assert guard.stats()["waiting"] == 0
+    assert guard.counters["rejected"] == 1
+
+# ==================== CircuitBreaker ====================
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10)
+    breaker.failed()
+    breaker.failed()
+    breaker.check()
+    breaker.failed()
+    assert breaker.state == "open"
+    with pytest.raises(AIUnavailableError) as error:
+        breaker.check()
+    assert error.value.reason == "circuit_open"
+    assert error.value.retry_after == 10
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10)
+    breaker.failed()
+    breaker.succeeded()
+    breaker.failed()
+    assert breaker.state == "closed"
+
+def test_open_circuit_is_held_for_longer_upstream_estimate(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.failed(retry_after=30)
+    assert breaker.stats()["retry_after"] == 30
+
+def test_loading_model_trips_for_its_estimate(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_seconds=10)
+    breaker.failed(retry_after=3, trip=True)
+    assert breaker.state == "open"
+    clock.now += 3
+    breaker.check()
+    assert breaker.state == "half_open"
+
+def test_failures_while_open_do_not_extend_the_hold(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.failed()
+    clock.now += 5
+    breaker.failed()
+    assert breaker.counters["opened"] == 1
+    clock.now += 5
+    breaker.check()
+    assert breaker.state == "half_open"
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.failed()
+    clock.now += 10
+    breaker.check()
+    with pytest.raises(AIUnavailableError):
+        breaker.check()
+    breaker.succeeded()
+    assert breaker.state == "closed"
+    breaker.check()
+    assert breaker.counters["probes"] == 1
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10)
+    breaker.failed(trip=True)
+    clock.now += 10
+    breaker.check()
+    breaker.failed()
+    assert breaker.state == "open"
+    assert breaker.counters["opened"] == 2
+
+def test_abandoned_probe_lets_another_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.failed()
+    clock.now += 10
+    breaker.check()
+    breaker.abandon()
+    breaker.check()
+    assert breaker.counters["probes"] == 2
+
+# ==================== AI field fill ====================
+def test_full_queue_does_not_fail_the_write(monkeypatch):
+    async def full(kind, payload):
+        raise QueueFullError("Task queue is full")
+    monkeypatch.setattr(server.task_queue, "enqueue", full)
+    asyncio.run(schedule_ai_fill("blog_posts", "post-1", ["excerpt"]))
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from server import ATS_REQUIRED_FIELDS, JSONObjectScanner, coerce_number, validate_ats_analysis
+
+OBJECT = '{"summary": "Uses {braces} and \\"quotes\\" \\\\", "skills": ["a", "b]"], "nested": {"x": [1, {"y": 2}]}}'
+
+def scan(*chunks):
+    scanner = JSONObjectScanner()
+    done = [scanner.feed(chunk) for chunk in chunks]
+    return scanner, done
+
+def test_whole_object_in_one_chunk():
+    scanner, done = scan(f"Here is the analysis:\n{OBJECT}\nHope this helps! {{}}")
+    assert done == [True]
+    assert scanner.text == OBJECT
+    assert json.loads(scanner.text)["nested"] == {"x": [1, {"y": 2}]}
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_any_chunking_gives_the_same_object(size):
+    text = "```json\n" + OBJECT + "\n```"
+    scanner, done = scan(*(text[i:i + size] for i in range(0, len(text), size)))
+    assert scanner.text == OBJECT
+    assert done.index(True) == (text.index(OBJECT) + len(OBJECT) - 1) // size
+
+def test_braces_and_escapes_inside_strings_do_not_close():
+    scanner, done = scan('{"a": "}", "b": "\\"}"', ', "c": "\\\\"', "}")
+    assert done == [False, False, True]
+    assert json.loads(scanner.text) == {"a": "}", "b": '"}', "c": "\\"}
+
+def test_prose_before_the_object_is_skipped():
+    scanner, done = scan("Sure] here } it is: ", '{"a": 1}')
+    assert done == [False, True]
+    assert scanner.text == '{"a": 1}'
+
+def test_incomplete_object():
+    scanner, done = scan('{"a": [1, 2', ', 3]')
+    assert done == [False, False]
+    assert not scanner.complete
+
+def test_input_after_completion_is_ignored():
+    scanner, _ = scan('{"a": 1}')
+    assert scanner.feed('{"b": 2}')
+    assert scanner.text == '{"a": 1}'
+
+@pytest.mark.parametrize("value, expected", [(85, 85.0), (72.5, 72.5), ("90", 90.0), (" 88.5 % ", 88.5), ("-3", -3.0), (True, None), ("high", None), (None, None)])
+def test_coerce_number(value, expected):
+    assert coerce_number(value) == expected
+
+def test_validate_coerces_and_clamps():
+    analysis, errors = validate_ats_analysis({
+        **{field: "80%" for field in ATS_REQUIRED_FIELDS},
+        "overall_fit": 140, "match_score": 0, "strengths": "Clear writing",
+        "recommendation": " Selected ", "weaknesses": 5
+    })
+    assert errors == []
+    assert analysis["required_skills_match"] == 80.0
+    assert analysis["overall_fit"] == 100.0
+    assert analysis["match_score"] == 1.0
+    assert analysis["strengths"] == ["Clear writing"]
+    assert analysis["recommendation"] == "selected"
+    assert "weaknesses" not in analysis
+
+def test_validate_rejects_missing_or_non_numeric_required_fields():
+    analysis, errors = validate_ats_analysis({field: 50 for field in ATS_REQUIRED_FIELDS[1:]} | {ATS_REQUIRED_FIELDS[1]: "n/a"})
+    assert analysis is None
+    assert errors == [f'"{ATS_REQUIRED_FIELDS[0]}" is missing', f'"{ATS_REQUIRED_FIELDS[1]}" must be a number']
+    assert validate_ats_analysis([1, 2]) == (None, ["output is not a JSON object"])
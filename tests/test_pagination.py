@@ -0,0 +1,61 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+
+from server import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, paginate
+
+@pytest.mark.parametrize("sort_value", [
+    "Senior Engineer",
+    42,
+    None,
+    datetime(2024, 5, 1, 12, 30, 15, 123000, tzinfo=timezone.utc),
+    datetime(2024, 5, 1, 14, 30, tzinfo=timezone(timedelta(hours=2)))
+])
+def test_cursor_round_trip(sort_value):
+    assert decode_cursor(encode_cursor(sort_value, "doc-1")) == (sort_value, "doc-1")
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor("?>>?" * 5, "id/with+chars")
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+def test_cursor_id_is_always_a_string():
+    raw = base64.urlsafe_b64encode(b'{"v":1,"id":7}').decode().rstrip("=")
+    assert decode_cursor(raw) == (1, "7")
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b'{"v":1}').decode(),
+    base64.urlsafe_b64encode(b'[1, 2]').decode(),
+    base64.urlsafe_b64encode(b'{"v":{"$date":"yesterday"},"id":"x"}').decode()
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+def test_paginate_walks_every_document_once():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient(tz_aware=True)["ats_unit_tests"]["items"]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # Pairs of documents share a timestamp, so pages must break ties on id
+    docs = [{"id": f"item-{i:02d}", "created_date": start + timedelta(hours=i // 2)} for i in range(11)]
+
+    async def walk():
+        await collection.insert_many([dict(doc) for doc in docs])
+        seen, cursor, pages = [], None, 0
+        while True:
+            response = Response()
+            page = await paginate(collection, {}, {"_id": 0}, "created_date", response, limit=3, cursor=cursor)
+            seen.extend(doc["id"] for doc in page)
+            pages += 1
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                return seen, pages
+
+    seen, pages = asyncio.run(walk())
+    assert seen == [doc["id"] for doc in reversed(docs)]
+    assert pages == 4
@@ -0,0 +1,74 @@
+import pytest
+
+import server
+from server import ATSConfig, prescore_decision, prescore_resume
+
+JOB = {
+    "title": "Backend Engineer",
+    "description": "Build Python APIs with FastAPI and MongoDB.",
+    "qualification": "Bachelor's degree in Computer Science",
+    "requirements": [
+        "3+ years building production web services in Python",
+        "Experience designing REST APIs with FastAPI",
+        "Working knowledge of MongoDB data modelling"
+    ],
+    "responsibilities": ["Ship features", "Review code"]
+}
+STRONG_RESUME = """Senior backend engineer, 6 years of experience.
+Python, FastAPI, MongoDB, AWS. Built REST APIs for payments.
+BSc Computer Science."""
+WEAK_RESUME = "Python developer, 2 years, Flask."
+
+def scores(accuracy, skills_configured=True):
+    return {"weighted_accuracy": accuracy, "skills_configured": skills_configured}
+
+@pytest.mark.parametrize("accuracy, expected", [
+    (10.0, "rejected"),
+    (34.9, "rejected"),
+    (35.0, None),
+    (60.0, None),
+    (91.9, None),
+    (92.0, "selected"),
+    (99.0, "selected"),
+])
+def test_default_bands(accuracy, expected):
+    assert prescore_decision(scores(accuracy), ATSConfig(required_skills=["Python"])) == expected
+
+def test_job_overrides_bands():
+    config = ATSConfig(required_skills=["Python"], prescore_reject_below=50, prescore_accept_above=80, min_accuracy_threshold=70)
+    assert prescore_decision(scores(49.9), config) == "rejected"
+    assert prescore_decision(scores(50.0), config) is None
+    assert prescore_decision(scores(80.0), config) == "selected"
+
+def test_bands_are_clamped_to_selection_threshold():
+    # A local "rejected" must be below the job's threshold and a local "selected" must clear it
+    config = ATSConfig(required_skills=["Python"], min_accuracy_threshold=60, prescore_reject_below=70, prescore_accept_above=50)
+    assert prescore_decision(scores(59.9), config) == "rejected"
+    assert prescore_decision(scores(60.0), config) == "selected"
+
+def test_disabled(monkeypatch):
+    monkeypatch.setattr(server, "PRESCORE_ENABLED", False)
+    assert prescore_decision(scores(1.0), ATSConfig(required_skills=["Python"])) is None
+
+def test_unconfigured_skills_always_ask_the_llm():
+    config = ATSConfig()
+    for resume in (STRONG_RESUME, WEAK_RESUME):
+        local = prescore_resume(resume, JOB, config)
+        assert local["skills_configured"] is False
+        assert prescore_decision(local, config) is None
+
+def test_sentence_requirements_are_not_matched_as_skills():
+    local = prescore_resume(STRONG_RESUME, JOB, ATSConfig())
+    assert local["missing_required_skills"] == []
+
+def test_short_requirements_are_used_as_skills():
+    job = {**JOB, "requirements": ["Python", "FastAPI", "MongoDB", "Kubernetes"]}
+    local = prescore_resume(STRONG_RESUME, job, ATSConfig())
+    assert local["matched_skills"] == ["Python", "FastAPI", "MongoDB"]
+    assert local["missing_required_skills"] == ["Kubernetes"]
+
+def test_configured_skills_decide_locally():
+    config = ATSConfig(required_skills=["Python", "FastAPI", "MongoDB"])
+    local = prescore_resume(STRONG_RESUME, JOB, config)
+    assert local["required_skills_match"] == 100.0
+    assert prescore_decision(local, config) != "rejected"
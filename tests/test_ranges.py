@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from server import blob_response, parse_range_header
+
+DATA = bytes(range(100))
+INFO = {"id": "blob", "length": len(DATA), "sha256": "abc", "content_type": "application/pdf"}
+
+class MemoryStore:
+    async def iter_range(self, blob_id, start, end):
+        yield DATA[start:end + 1]
+
+def request(**headers):
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]})
+
+def fetch(info=INFO, **headers):
+    async def run():
+        response = blob_response(request(**headers), info, MemoryStore())
+        body = b""
+        if hasattr(response, "body_iterator"):
+            async for chunk in response.body_iterator:
+                body += chunk
+        return response, body
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=50-500", (50, 99)),
+    ("bytes=99-99", (99, 99)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range_header(header, 100) == expected
+
+@pytest.mark.parametrize("header", [None, "", "items=0-9", "bytes=0-9,20-29", "bytes=a-b", "bytes=-", "bytes=9-0"])
+def test_ignored_ranges_mean_whole_file(header):
+    assert parse_range_header(header, 100) is None
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range_header(header, 100)
+
+def test_full_response():
+    response, body = fetch()
+    assert response.status_code == 200
+    assert body == DATA
+    assert response.headers["content-length"] == "100"
+    assert response.headers["accept-ranges"] == "bytes"
+
+def test_partial_response():
+    response, body = fetch(range="bytes=10-19")
+    assert response.status_code == 206
+    assert body == DATA[10:20]
+    assert response.headers["content-range"] == "bytes 10-19/100"
+    assert response.headers["content-length"] == "10"
+
+def test_unsatisfiable_response():
+    response, _ = fetch(range="bytes=200-")
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */100"
+
+def test_if_range_mismatch_sends_whole_file():
+    response, body = fetch(range="bytes=10-19", if_range='"stale"')
+    assert response.status_code == 200
+    assert body == DATA
+    response, _ = fetch(range="bytes=10-19", if_range='"abc"')
+    assert response.status_code == 206
+
+def test_if_none_match_is_not_modified():
+    response, _ = fetch(if_none_match='"other", "abc"')
+    assert response.status_code == 304
+
+def test_empty_blob_ignores_range():
+    response, body = fetch({**INFO, "length": 0}, range="bytes=0-9")
+    assert response.status_code == 200
+    assert body == b""
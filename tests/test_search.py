@@ -0,0 +1,108 @@
+import math
+
+import pytest
+
+import server
+from server import SearchIndex, SearchSource, best_snippet, highlight_text, search_field_text, search_terms
+
+BLOGS = [
+    {"id": "b1", "slug": "python-tips", "title": "Python tips", "tags": ["python"], "content": "Short notes on typing."},
+    {"id": "b2", "slug": "cloud", "title": "Cloud migration", "tags": ["aws"], "content": "We moved a Python monolith to AWS."},
+    {"id": "b3", "slug": "react", "title": "React performance", "tags": ["react"], "content": "Memoization and profiling."}
+]
+JOBS = [
+    {"id": "j1", "title": "Python Engineer", "department": "Engineering", "description": "Build APIs."},
+    {"id": "j2", "title": "Designer", "department": "Design", "description": "Design interfaces for Python tools."}
+]
+
+@pytest.fixture
+def index():
+    search = SearchIndex()
+    search._sources = {"blog": SearchSource("blog", BLOGS), "job": SearchSource("job", JOBS)}
+    return search
+
+def ids(result):
+    return [hit["document"]["id"] for hit in result["results"]]
+
+def test_search_terms_casefold_and_drop_stopwords():
+    assert search_terms("The Straße of_Python and AWS") == ["strasse", "python", "aws"]
+
+def test_field_text_strips_markup_and_joins_lists():
+    assert search_field_text("<p>Hello <b>world</b></p>") == "Hello world"
+    assert search_field_text(["React", "Python"]) == "React Python"
+    assert search_field_text(None) == ""
+
+def test_postings_are_field_weighted():
+    source = SearchSource("blog", BLOGS[:1])
+    # title (3.0) + tags (2.0)
+    assert source.postings["python"] == {0: 5.0}
+    # "on" is a stopword
+    assert source.lengths[0] == 3.0 * 2 + 2.0 * 1 + 1.0 * 3
+
+def test_completions_use_sorted_terms():
+    source = SearchSource("blog", BLOGS)
+    assert source.completions("pro") == ["profiling"]
+    assert source.completions("m") == ["memoization", "migration", "monolith", "moved"]
+    assert source.completions("zzz") == []
+
+def test_bm25_score_matches_formula():
+    source = SearchSource("blog", BLOGS)
+    frequency, length = source.postings["python"][0], source.lengths[0]
+    norm = 1 - server.SEARCH_BM25_B + server.SEARCH_BM25_B * length / source.avg_length
+    expected = 2.0 * frequency * (server.SEARCH_BM25_K1 + 1) / (frequency + server.SEARCH_BM25_K1 * norm)
+    assert source.score("python", 2.0)[0] == pytest.approx(expected)
+    assert source.score("missing", 2.0) == {}
+
+def test_title_matches_outrank_body_matches(index):
+    result = index.search("python", None, 10, 0, prefix=False)
+    assert ids(result)[:2] in (["b1", "j1"], ["j1", "b1"])
+    assert set(ids(result)) == {"b1", "b2", "j1", "j2"}
+
+def test_rare_terms_weigh_more(index):
+    result = index.search("python profiling", None, 10, 0, prefix=False)
+    scores = {hit["document"]["id"]: hit["score"] for hit in result["results"]}
+    assert scores["b3"] > scores["b2"]
+
+def test_scores_use_corpus_wide_idf(index):
+    total, df = 5, 4
+    idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+    result = index.search("python", "job", 10, 0, prefix=False)
+    top = index._sources["job"].score("python", idf)[0]
+    assert result["results"][0]["score"] == round(top, 4)
+
+def test_last_word_matches_as_prefix(index):
+    assert set(ids(index.search("memo", None, 10, 0))) == {"b3"}
+    assert ids(index.search("memo", None, 10, 0, prefix=False)) == []
+    assert ids(index.search("memo ", None, 10, 0)) == []
+
+def test_kind_filter_keeps_facets_for_every_type(index):
+    result = index.search("python", "job", 10, 0, prefix=False)
+    assert {hit["type"] for hit in result["results"]} == {"job"}
+    assert result["facets"] == {"blog": 2, "project": 0, "case_study": 0, "job": 2}
+
+def test_pagination(index):
+    first = index.search("python", None, 3, 0, prefix=False)
+    second = index.search("python", None, 3, 3, prefix=False)
+    assert first["total"] == 4 and first["next_offset"] == 3
+    assert second["next_offset"] is None
+    assert len(set(ids(first)) | set(ids(second))) == 4
+
+def test_results_carry_highlights(index):
+    hit = index.search("cloud aw", "blog", 10, 0)["results"][0]
+    assert hit["title_highlight"] == "<mark>Cloud</mark> migration"
+    # tags come before content, so they win the tie
+    assert hit["snippet"] == "<mark>aws</mark>"
+
+def test_highlight_escapes_html():
+    assert highlight_text("<b>Python</b> & co", lambda token: token == "python") == "&lt;b&gt;<mark>Python</mark>&lt;/b&gt; &amp; co"
+
+def test_snippet_picks_densest_window(monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_SNIPPET_CHARS", 40)
+    text = "python " + "filler " * 20 + "react react react end"
+    snippet = best_snippet({"content": text}, ["content"], lambda token: token == "react")
+    assert snippet.startswith("…")
+    assert snippet.count("<mark>react</mark>") == 3
+
+def test_snippet_falls_back_to_first_text():
+    snippet = best_snippet({"excerpt": "", "content": "Nothing matches here"}, ["excerpt", "content"], lambda token: False)
+    assert snippet == "Nothing matches here"
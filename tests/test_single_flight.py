@@ -0,0 +1,76 @@
+import asyncio
+import gc
+
+import pytest
+
+from server import SingleFlight
+
+def test_concurrent_callers_share_one_execution():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        return flights, results
+
+    flights, results = asyncio.run(scenario())
+    assert results == ["result"] * 5
+    assert calls == [1]
+    assert flights.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+def test_every_caller_gets_the_exception():
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(3)), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(scenario())] == [ValueError] * 3
+
+def test_cancelled_caller_does_not_cancel_the_work():
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.02)
+        finished.append(1)
+        return "result"
+
+    async def scenario():
+        flights = SingleFlight()
+        leader = asyncio.create_task(flights.do("key", work))
+        follower = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "result"
+    assert finished == [1]
+
+def test_failure_nobody_awaits_is_not_reported_as_unretrieved():
+    reported = []
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context))
+        flights = SingleFlight()
+        caller = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.03)
+        del caller, flights
+        gc.collect()
+
+    asyncio.run(scenario())
+    assert reported == []
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from server import TaskQueue
+
+@pytest.fixture
+def queue(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    monkeypatch.setattr(server, "db", mongomock_motor.AsyncMongoMockClient(tz_aware=True)["ats_unit_tests"])
+    monkeypatch.setattr(server, "TASK_MAX_PER_MINUTE", 600)  # one start per 0.1s
+    return TaskQueue("task_queue")
+
+def test_lease_starts_after_the_rate_limit_wait(queue):
+    async def scenario():
+        for n in range(3):
+            await queue.enqueue("noop", {"n": n})
+        claimed = []
+        for _ in range(3):
+            asked = time.time()
+            task = await queue._claim_next()
+            claimed.append((asked, task))
+        return claimed
+
+    claimed = asyncio.run(scenario())
+    for asked, task in claimed[1:]:
+        started = task["started_date"].timestamp()
+        assert started - asked >= 0.05
+    first, second = (task["started_date"] for _, task in claimed[:2])
+    assert (second - first).total_seconds() >= 0.09
+
+def test_empty_poll_does_not_use_a_slot(queue):
+    async def scenario():
+        assert await queue._claim_next() is None
+        await queue.enqueue("noop", {})
+        started = time.monotonic()
+        assert await queue._claim_next() is not None
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.05
+
+def expire_lease(queue, task_id, attempts):
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    return queue.collection.update_one(
+        {"id": task_id},
+        {"$set": {"status": "running", "worker": "dead:1", "lease_until": past, "attempts": attempts}}
+    )
+
+def test_expired_lease_is_reclaimed_while_attempts_remain(queue):
+    async def scenario():
+        task_id = await queue.enqueue("noop", {})
+        await expire_lease(queue, task_id, server.TASK_MAX_ATTEMPTS - 1)
+        return await queue._claim()
+
+    task = asyncio.run(scenario())
+    assert task["attempts"] == server.TASK_MAX_ATTEMPTS
+    assert task["worker"] == server.WORKER_ID
+
+def test_exhausted_expired_lease_fails_and_runs_the_failure_handler(queue):
+    failures = []
+
+    async def on_failure(payload, error):
+        failures.append((payload, error))
+    queue.handler("noop", on_failure=on_failure)(None)
+
+    async def scenario():
+        task_id = await queue.enqueue("noop", {"n": 1})
+        await expire_lease(queue, task_id, server.TASK_MAX_ATTEMPTS)
+        assert await queue._claim() is None
+        await queue._fail_abandoned()
+        return await queue.collection.find_one({"id": task_id})
+
+    task = asyncio.run(scenario())
+    assert task["status"] == "failed"
+    assert failures == [({"n": 1}, task["last_error"])]
+    assert queue.counters["failed"] == 1
+
+def test_stale_worker_cannot_overwrite_the_new_owner(queue):
+    async def handler(payload):
+        return None
+    queue.handler("noop")(handler)
+
+    async def scenario():
+        task_id = await queue.enqueue("noop", {})
+        stale = await queue._claim()
+        # The lease ran out and another worker took the task over
+        await queue.collection.update_one({"id": task_id}, {"$set": {"worker": "other:2"}, "$inc": {"attempts": 1}})
+        await queue._run(stale)
+        return await queue.collection.find_one({"id": task_id})
+
+    task = asyncio.run(scenario())
+    assert task["status"] == "running"
+    assert queue.counters["completed"] == 0